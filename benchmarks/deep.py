@@ -0,0 +1,131 @@
+"""Times traversals that follow long chains through a recording, on a
+synthetic recording with a DOM nested `--depth` levels deep (100,000 by
+default), and a chain of as many scripts, each executed by an element
+the previous script created.
+
+The workloads are: summarizing the top frame (which visits every nested
+element and script), building the report of the last script in the
+chain (which includes the report of every script before it), and
+finding the DOM root of the most deeply nested element. Python's default
+recursion limit is kept, so a workload that recurses once per level
+fails, and is reported as failing.
+
+The recording is written to a temporary directory, unless a recording is
+given. Each run happens in a fresh child process. With `--against PATH`,
+the same workloads are also run using the `pagegraph` package from
+another checkout, for comparison.
+
+Usage (from the repository root):
+
+    python -m benchmarks.deep [path/to/recording.graphml] \\
+        [--depth 100000] [--against path/to/other/checkout]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+from typing import Any, Callable
+
+from benchmarks.synthetic import write_graph
+import pagegraph.graph
+from pagegraph.graph import PageGraph
+from pagegraph.serialize import ScriptReport
+
+
+def workload_summary(pg: PageGraph) -> int:
+    domroot = pg.toplevel_domroot_nodes()[0]
+    return len(domroot.summarize_frame().created_nodes)
+
+
+def workload_script_report(pg: PageGraph) -> int:
+    script = max(pg.script_nodes(), key=lambda node: node.int_id())
+    report = script.to_report()
+    length = 0
+    while isinstance(report.executor, ScriptReport):
+        length += 1
+        report = report.executor
+    return length
+
+
+def workload_domroot(pg: PageGraph) -> int:
+    divs = [node for node in pg.html_nodes() if node.tag_name() == "DIV"]
+    deepest_div = max(divs, key=lambda node: node.int_id())
+    return deepest_div.domroot().int_id()
+
+
+WORKLOADS: dict[str, Callable[[PageGraph], int]] = {
+    "summary": workload_summary,
+    "script report": workload_script_report,
+    "domroot": workload_domroot,
+}
+
+
+def measure(input_path: str) -> dict[str, Any]:
+    pg = pagegraph.graph.from_path(input_path)
+    results: dict[str, Any] = {}
+    for name, workload in WORKLOADS.items():
+        start = perf_counter()
+        try:
+            workload(pg)
+            results[name] = perf_counter() - start
+        except RecursionError:
+            results[name] = None
+    return results
+
+
+def run_child(input_path: str, checkout: str | None) -> dict[str, Any]:
+    # As in `benchmarks.scripts`, the child is run as a script, so that the
+    # other checkout's own `benchmarks` package doesn't shadow this one.
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([checkout or repo_root, repo_root])
+    cmd = [sys.executable, os.path.abspath(__file__), "--child",
+           os.path.abspath(input_path)]
+    output = subprocess.run(cmd, check=True, capture_output=True, text=True,
+                            env=env)
+    return json.loads(output.stdout)
+
+
+def run(input_path: str, against: str | None) -> None:
+    runs = {"this checkout": run_child(input_path, None)}
+    if against:
+        runs[against] = run_child(input_path, against)
+    print(f"{'workload':<14}" + "".join(f"{name[-24:]:>26}" for name in runs))
+    for name in WORKLOADS:
+        print(f"{name:<14}" + "".join(
+            f"{'RecursionError':>26}" if result[name] is None
+            else f"{result[name]:>25.2f}s" for result in runs.values()))
+
+
+if __name__ == "__main__":
+    PARSER = argparse.ArgumentParser(
+        description="Benchmark traversing deeply nested recordings.")
+    PARSER.add_argument("input", nargs="?", default=None,
+                        help="Path to PageGraph recording (by default, a "
+                             "synthetic recording is written).")
+    PARSER.add_argument("--depth", type=int, default=100000,
+                        help="Nesting depth of the synthetic recording's "
+                             "DOM, and length of its chain of scripts.")
+    PARSER.add_argument("--against", default=None,
+                        help="Path to another checkout to compare with.")
+    PARSER.add_argument("--child", action="store_true",
+                        help=argparse.SUPPRESS)
+    ARGS = PARSER.parse_args()
+
+    if ARGS.child:
+        print(json.dumps(measure(ARGS.input)))
+        sys.exit(0)
+
+    if ARGS.input:
+        run(ARGS.input, ARGS.against)
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as TEMP_DIR:
+        INPUT = os.path.join(TEMP_DIR, "deep.graphml")
+        with open(INPUT, "w", encoding="utf8") as HANDLE:
+            write_graph(HANDLE, scripts=10, elements=10, frames=0,
+                        depth=ARGS.depth, script_chain=ARGS.depth)
+        run(INPUT, ARGS.against)
@@ -0,0 +1,54 @@
+"""Measures the memory allocated for each materialized Node and Edge
+object, by creating every node and edge of a loaded recording under
+`tracemalloc`.
+
+The cost of the graph's own lookup tables (which map each index to its
+element) is included, since every materialized element needs an entry
+there. With `--data`, each element's attributes are also read, to
+include the cost of the cached attribute dicts.
+
+Usage (from the repository root):
+
+    python -m benchmarks.elements path/to/recording.graphml [--data]
+"""
+import argparse
+import gc
+import tracemalloc
+from typing import Any
+
+import pagegraph.graph
+
+
+def measure(input_path: str, read_data: bool) -> dict[str, Any]:
+    pg = pagegraph.graph.from_path(input_path)
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    nodes = pg.nodes()
+    edges = pg.edges()
+    if read_data:
+        for element in [*nodes, *edges]:
+            element.data()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    num_elements = len(nodes) + len(list(edges))
+    return {
+        "elements": num_elements,
+        "total_mb": (after - before) / (1 << 20),
+        "bytes_per_element": (after - before) / num_elements,
+    }
+
+
+if __name__ == "__main__":
+    PARSER = argparse.ArgumentParser(
+        description="Benchmark memory used per Node and Edge object.")
+    PARSER.add_argument("input", help="Path to PageGraph recording.")
+    PARSER.add_argument("--data", action="store_true",
+                        help="Also read (and so cache) each element's "
+                             "attributes.")
+    ARGS = PARSER.parse_args()
+    RESULT = measure(ARGS.input, ARGS.data)
+    print(f"elements:            {RESULT['elements']}")
+    print(f"total:               {RESULT['total_mb']:.1f} MB")
+    print(f"bytes per element:   {RESULT['bytes_per_element']:.0f}")
@@ -0,0 +1,102 @@
+"""Compares the time and peak memory needed to load a PageGraph recording
+with the streaming GraphML reader, against first building a networkx
+graph with `networkx.read_graphml`, and against reading a snapshot of the
+recording (the snapshot is built first, if needed, outside of the timed
+section).
+
+Each approach is measured in a fresh child process, so that peak memory
+measurements are not affected by earlier runs.
+
+Usage (from the repository root):
+
+    python -m benchmarks.load path/to/recording.graphml
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+from time import perf_counter
+from typing import Any, Callable
+
+import networkx as NWX  # type: ignore
+
+import pagegraph.graph
+from pagegraph.graph import PageGraph
+
+
+def load_networkx(input_path: str) -> PageGraph:
+    return PageGraph(NWX.read_graphml(input_path))
+
+
+def load_streaming(input_path: str) -> PageGraph:
+    return PageGraph(pagegraph.graph.read_graphml(input_path))
+
+
+def load_snapshot(input_path: str) -> PageGraph:
+    return pagegraph.graph.from_path(input_path)
+
+
+LOADERS: dict[str, Callable[[str], PageGraph]] = {
+    "networkx": load_networkx,
+    "streaming": load_streaming,
+    "snapshot": load_snapshot,
+}
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss is reported in KB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(loader_name: str, input_path: str) -> dict[str, Any]:
+    start_rss = max_rss_mb()
+    start = perf_counter()
+    pg = LOADERS[loader_name](input_path)
+    elapsed = perf_counter() - start
+    return {
+        "loader": loader_name,
+        "seconds": elapsed,
+        "peak_rss_mb": max_rss_mb(),
+        "peak_rss_delta_mb": max_rss_mb() - start_rss,
+        "nodes": len(pg.nodes()),
+        "edges": len(list(pg.edges())),
+    }
+
+
+def run_child(module: str, args: list[str]) -> dict[str, Any]:
+    cmd = [sys.executable, "-m", module, "--child"] + args
+    output = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    return json.loads(output.stdout)
+
+
+def print_results(results: list[dict[str, Any]]) -> None:
+    print(f"{'loader':<12}{'seconds':>10}{'peak MB':>10}{'delta MB':>10}"
+          f"{'nodes':>10}{'edges':>10}")
+    for result in results:
+        print(f"{result['loader']:<12}{result['seconds']:>10.2f}"
+              f"{result['peak_rss_mb']:>10.1f}"
+              f"{result['peak_rss_delta_mb']:>10.1f}"
+              f"{result['nodes']:>10}{result['edges']:>10}")
+
+
+if __name__ == "__main__":
+    PARSER = argparse.ArgumentParser(
+        description="Benchmark loading a PageGraph recording.")
+    PARSER.add_argument("input", help="Path to PageGraph recording.")
+    PARSER.add_argument("--loaders", nargs="+", default=list(LOADERS),
+                        choices=list(LOADERS))
+    PARSER.add_argument("--child", action="store_true",
+                        help=argparse.SUPPRESS)
+    ARGS = PARSER.parse_args()
+
+    if ARGS.child:
+        print(json.dumps(measure(ARGS.loaders[0], ARGS.input)))
+    else:
+        if "snapshot" in ARGS.loaders:
+            pagegraph.graph.build_snapshot(ARGS.input)
+        RESULTS = []
+        for LOADER in ARGS.loaders:
+            RESULTS.append(run_child("benchmarks.load",
+                                     [ARGS.input, "--loaders", LOADER]))
+        print_results(RESULTS)
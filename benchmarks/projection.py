@@ -0,0 +1,115 @@
+"""Compares the time and peak memory needed to load a PageGraph recording
+in full, against loading only the projection each command uses (see
+`pagegraph.graph.projection`), and then running the command.
+
+Each measurement is made in a fresh child process, so that peak memory
+measurements are not affected by earlier runs. Any snapshot of the
+recording is ignored, since snapshots always hold the full graph.
+
+Usage (from the repository root):
+
+    python -m benchmarks.projection path/to/recording.graphml
+"""
+import argparse
+import json
+import sys
+from time import perf_counter
+from typing import Any, Callable
+
+from benchmarks.load import max_rss_mb, run_child
+import pagegraph.commands
+from pagegraph.commands import JS_CALLS_PROJECTION, REQUESTS_PROJECTION
+from pagegraph.commands import SCRIPTS_PROJECTION, SUBFRAMES_PROJECTION
+from pagegraph.graph import PageGraph, read_graphml
+from pagegraph.graph.projection import Projection
+
+
+def run_subframes(pg: PageGraph) -> int:
+    return len(pg.iframe_nodes())
+
+
+def run_requests(pg: PageGraph) -> int:
+    return len(list(pagegraph.commands.requests_for_graph(pg, None)))
+
+
+def run_scripts(pg: PageGraph) -> int:
+    return len([node.to_report() for node in pg.script_nodes()])
+
+
+def run_js_calls(pg: PageGraph) -> int:
+    count = 0
+    for js_node in pg.js_structure_nodes():
+        for call_result in js_node.call_results():
+            call_result.call_context()
+            call_result.receiver_context()
+            count += 1
+    return count
+
+
+COMMANDS: dict[str, tuple[Projection, Callable[[PageGraph], int]]] = {
+    "subframes": (SUBFRAMES_PROJECTION, run_subframes),
+    "requests": (REQUESTS_PROJECTION, run_requests),
+    "scripts": (SCRIPTS_PROJECTION, run_scripts),
+    "js-calls": (JS_CALLS_PROJECTION, run_js_calls),
+}
+
+
+def measure(command: str, projected: bool,
+            input_path: str) -> dict[str, Any]:
+    projection, run = COMMANDS[command]
+    start_rss = max_rss_mb()
+    start = perf_counter()
+    store = read_graphml(input_path, projection=(
+        projection if projected else None))
+    pg = PageGraph(store)
+    load_seconds = perf_counter() - start
+    results = run(pg)
+    return {
+        "command": command,
+        "projected": projected,
+        "load_seconds": load_seconds,
+        "total_seconds": perf_counter() - start,
+        "peak_rss_delta_mb": max_rss_mb() - start_rss,
+        "nodes": store.num_nodes(),
+        "edges": store.num_edges(),
+        "results": results,
+    }
+
+
+def print_results(results: list[dict[str, Any]]) -> None:
+    print(f"{'command':<12}{'graph':<8}{'load s':>8}{'total s':>9}"
+          f"{'delta MB':>10}{'nodes':>9}{'edges':>9}")
+    for result in results:
+        graph = "proj" if result["projected"] else "full"
+        print(f"{result['command']:<12}{graph:<8}"
+              f"{result['load_seconds']:>8.2f}"
+              f"{result['total_seconds']:>9.2f}"
+              f"{result['peak_rss_delta_mb']:>10.1f}"
+              f"{result['nodes']:>9}{result['edges']:>9}")
+
+
+if __name__ == "__main__":
+    PARSER = argparse.ArgumentParser(
+        description="Benchmark loading per-command projections of a "
+                    "PageGraph recording.")
+    PARSER.add_argument("input", help="Path to PageGraph recording.")
+    PARSER.add_argument("--commands", nargs="+", default=list(COMMANDS),
+                        choices=list(COMMANDS))
+    PARSER.add_argument("--child", action="store_true",
+                        help=argparse.SUPPRESS)
+    PARSER.add_argument("--projected", action="store_true",
+                        help=argparse.SUPPRESS)
+    ARGS = PARSER.parse_args()
+
+    if ARGS.child:
+        print(json.dumps(measure(ARGS.commands[0], ARGS.projected,
+                                 ARGS.input)))
+        sys.exit(0)
+
+    RESULTS = []
+    for COMMAND in ARGS.commands:
+        for FLAGS in ([], ["--projected"]):
+            RESULTS.append(run_child(
+                "benchmarks.projection",
+                [ARGS.input, "--commands", COMMAND, *FLAGS]))
+    print_results(RESULTS)
@@ -0,0 +1,95 @@
+"""Times the `scripts` command (building a report for every script node)
+on a synthetic recording with many scripts, where looking up each
+script's execute and creation edges dominates.
+
+The recording is written by `benchmarks.synthetic` (with `--scripts`
+scripts) to a temporary directory, unless a recording is given. Loading
+the recording is timed separately from building the reports. Each run
+happens in a fresh child process. With `--against PATH`, the same
+workload is also run using the `pagegraph` package from another checkout,
+for comparison.
+
+Usage (from the repository root):
+
+    python -m benchmarks.scripts [path/to/recording.graphml] \\
+        [--scripts 50000] [--against path/to/other/checkout]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+from typing import Any
+
+from benchmarks.synthetic import write_graph
+import pagegraph.graph
+
+
+def measure(input_path: str) -> dict[str, Any]:
+    start = perf_counter()
+    pg = pagegraph.graph.from_path(input_path)
+    load_seconds = perf_counter() - start
+    start = perf_counter()
+    reports = [node.to_report() for node in pg.script_nodes()]
+    return {
+        "load": load_seconds,
+        "scripts": perf_counter() - start,
+        "reports": len(reports),
+    }
+
+
+def run_child(input_path: str, checkout: str | None) -> dict[str, Any]:
+    # The child is run as a script (not with `-m`), so that the other
+    # checkout's own `benchmarks` package (if any) doesn't shadow this one.
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([checkout or repo_root, repo_root])
+    cmd = [sys.executable, os.path.abspath(__file__), "--child",
+           os.path.abspath(input_path)]
+    output = subprocess.run(cmd, check=True, capture_output=True, text=True,
+                            env=env)
+    return json.loads(output.stdout)
+
+
+def run(input_path: str, against: str | None) -> None:
+    runs = {"this checkout": run_child(input_path, None)}
+    if against:
+        runs[against] = run_child(input_path, against)
+    print(f"{'':<12}" + "".join(f"{name[-24:]:>26}" for name in runs))
+    for name in ("load", "scripts"):
+        print(f"{name:<12}" + "".join(
+            f"{result[name]:>25.2f}s" for result in runs.values()))
+    print(f"{'reports':<12}" + "".join(
+        f"{result['reports']:>26}" for result in runs.values()))
+
+
+if __name__ == "__main__":
+    PARSER = argparse.ArgumentParser(
+        description="Benchmark the scripts command on a recording with "
+                    "many scripts.")
+    PARSER.add_argument("input", nargs="?", default=None,
+                        help="Path to PageGraph recording (by default, a "
+                             "synthetic recording is written).")
+    PARSER.add_argument("--scripts", type=int, default=50000,
+                        help="Number of scripts in the synthetic recording.")
+    PARSER.add_argument("--against", default=None,
+                        help="Path to another checkout to compare with.")
+    PARSER.add_argument("--child", action="store_true",
+                        help=argparse.SUPPRESS)
+    ARGS = PARSER.parse_args()
+
+    if ARGS.child:
+        print(json.dumps(measure(ARGS.input)))
+        sys.exit(0)
+
+    if ARGS.input:
+        run(ARGS.input, ARGS.against)
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as TEMP_DIR:
+        INPUT = os.path.join(TEMP_DIR, "scripts.graphml")
+        with open(INPUT, "w", encoding="utf8") as HANDLE:
+            write_graph(HANDLE, scripts=ARGS.scripts, source_size=256)
+        run(INPUT, ARGS.against)
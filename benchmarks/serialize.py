@@ -0,0 +1,112 @@
+"""Times converting the `js-calls` command's reports to JSON, on a
+synthetic recording with many JS calls (`--scripts` scripts, each making
+four calls), where converting reports with `to_jsonable` dominates.
+
+The reports are built before timing starts. `to_jsonable` and writing
+the JSON text with `json.dumps` are timed separately, as is writing the
+text with `orjson` (the optional backend used by
+`pagegraph.serialize.dumps(..., fast=True)`), when it's installed.
+
+The recording is written to a temporary directory, unless a recording is
+given. Each run happens in a fresh child process. With `--against PATH`,
+the same workload is also run using the `pagegraph` package from another
+checkout, for comparison.
+
+Usage (from the repository root):
+
+    python -m benchmarks.serialize [path/to/recording.graphml] \\
+        [--scripts 25000] [--against path/to/other/checkout]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+from typing import Any
+
+from benchmarks.synthetic import write_graph
+import pagegraph.commands
+import pagegraph.graph
+import pagegraph.serialize
+
+
+def measure(input_path: str) -> dict[str, Any]:
+    pg = pagegraph.graph.from_path(input_path)
+    reports = list(pagegraph.commands.js_calls_for_graph(
+        pg, None, False, None, None))
+    start = perf_counter()
+    jsonable = pagegraph.serialize.to_jsonable(reports)
+    results: dict[str, Any] = {
+        "to_jsonable": perf_counter() - start,
+        "reports": len(reports),
+    }
+    start = perf_counter()
+    json.dumps(jsonable)
+    results["json.dumps"] = perf_counter() - start
+    results["orjson"] = None
+    try:
+        import orjson  # type: ignore
+        start = perf_counter()
+        orjson.dumps(jsonable)
+        results["orjson"] = perf_counter() - start
+    except ImportError:
+        pass
+    return results
+
+
+def run_child(input_path: str, checkout: str | None) -> dict[str, Any]:
+    # As in `benchmarks.scripts`, the child is run as a script, so that the
+    # other checkout's own `benchmarks` package doesn't shadow this one.
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([checkout or repo_root, repo_root])
+    cmd = [sys.executable, os.path.abspath(__file__), "--child",
+           os.path.abspath(input_path)]
+    output = subprocess.run(cmd, check=True, capture_output=True, text=True,
+                            env=env)
+    return json.loads(output.stdout)
+
+
+def run(input_path: str, against: str | None) -> None:
+    runs = {"this checkout": run_child(input_path, None)}
+    if against:
+        runs[against] = run_child(input_path, against)
+    print(f"{'':<12}" + "".join(f"{name[-24:]:>26}" for name in runs))
+    for name in ("to_jsonable", "json.dumps", "orjson"):
+        print(f"{name:<12}" + "".join(
+            f"{'unavailable':>26}" if result[name] is None
+            else f"{result[name]:>25.2f}s" for result in runs.values()))
+    print(f"{'reports':<12}" + "".join(
+        f"{result['reports']:>26}" for result in runs.values()))
+
+
+if __name__ == "__main__":
+    PARSER = argparse.ArgumentParser(
+        description="Benchmark serializing the reports of the js-calls "
+                    "command.")
+    PARSER.add_argument("input", nargs="?", default=None,
+                        help="Path to PageGraph recording (by default, a "
+                             "synthetic recording is written).")
+    PARSER.add_argument("--scripts", type=int, default=25000,
+                        help="Number of scripts in the synthetic recording.")
+    PARSER.add_argument("--against", default=None,
+                        help="Path to another checkout to compare with.")
+    PARSER.add_argument("--child", action="store_true",
+                        help=argparse.SUPPRESS)
+    ARGS = PARSER.parse_args()
+
+    if ARGS.child:
+        print(json.dumps(measure(ARGS.input)))
+        sys.exit(0)
+
+    if ARGS.input:
+        run(ARGS.input, ARGS.against)
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as TEMP_DIR:
+        INPUT = os.path.join(TEMP_DIR, "serialize.graphml")
+        with open(INPUT, "w", encoding="utf8") as HANDLE:
+            write_graph(HANDLE, scripts=ARGS.scripts, source_size=64)
+        run(INPUT, ARGS.against)
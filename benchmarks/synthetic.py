@@ -0,0 +1,391 @@
+"""Writes synthetic PageGraph recordings, for use by the benchmarks.
+
+The generated graphs are not a recording of any real page, but they follow
+the same structure PageGraph emits (parsers creating DOM roots, elements
+inserted into the document, scripts executed by elements, requests, JS
+calls, child frames, etc.), and are valid when loaded in `--debug` mode.
+
+Usage (from the repository root):
+
+    python -m benchmarks.synthetic out.graphml --scripts 5000 --frames 20
+"""
+import argparse
+from base64 import b64encode
+import hashlib
+import json
+import shutil
+import tempfile
+from typing import Any, TextIO
+from xml.sax.saxutils import escape, quoteattr
+
+from pagegraph import VERSION
+
+
+NODE_KEYS = [
+    ("node type", "string"),
+    ("timestamp", "long"),
+    ("node id", "string"),
+    ("frame id", "string"),
+    ("tag name", "string"),
+    ("url", "string"),
+    ("script type", "string"),
+    ("source", "string"),
+    ("method", "string"),
+]
+
+EDGE_KEYS = [
+    ("edge type", "string"),
+    ("timestamp", "long"),
+    ("frame id", "string"),
+    ("parent", "string"),
+    ("before", "string"),
+    ("request id", "int"),
+    ("resource type", "string"),
+    ("response hash", "string"),
+    ("headers", "string"),
+    ("size", "string"),
+    ("args", "string"),
+    ("value", "string"),
+    ("key", "string"),
+    ("attr name", "string"),
+]
+
+WEB_APIS = [
+    "Document.cookie",
+    "Document.createElement",
+    "Element.setAttribute",
+    "HTMLCanvasElement.toDataURL",
+    "Navigator.userAgent",
+    "Storage.getItem",
+    "Window.fetch",
+    "XMLHttpRequest.open",
+]
+
+JS_BUILTINS = [
+    "Date.now",
+    "JSON.parse",
+    "Math.random",
+]
+
+
+class GraphWriter:
+
+    def __init__(self, handle: TextIO, edge_handle: TextIO):
+        self.handle = handle
+        self.edge_handle = edge_handle
+        self.node_count = 0
+        self.edge_count = 0
+        self.blink_count = 0
+        self.request_count = 0
+        self.clock = 1_700_000_000_000
+        self.node_keys = {name: f"n{i}" for i, (name, _) in
+                          enumerate(NODE_KEYS)}
+        self.edge_keys = {name: f"e{i}" for i, (name, _) in
+                          enumerate(EDGE_KEYS)}
+
+    def header(self) -> None:
+        self.handle.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self.handle.write(
+            '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        self.handle.write(
+            "<desc>\n"
+            f"<version>{VERSION}</version>\n"
+            "<about>Synthetic PageGraph recording</about>\n"
+            "<url>https://example.test/</url>\n"
+            "</desc>\n")
+        for name, attr_type in NODE_KEYS:
+            key_id = self.node_keys[name]
+            self.handle.write(
+                f'<key id="{key_id}" for="node" attr.name="{name}" '
+                f'attr.type="{attr_type}"/>\n')
+        for name, attr_type in EDGE_KEYS:
+            key_id = self.edge_keys[name]
+            self.handle.write(
+                f'<key id="{key_id}" for="edge" attr.name="{name}" '
+                f'attr.type="{attr_type}"/>\n')
+        self.handle.write('<graph id="G" edgedefault="directed">\n')
+
+    def footer(self) -> None:
+        self.handle.write("</graph>\n</graphml>\n")
+
+    def tick(self) -> int:
+        self.clock += 1
+        return self.clock
+
+    def blink_id(self) -> str:
+        self.blink_count += 1
+        return str(self.blink_count)
+
+    def request_id(self) -> int:
+        self.request_count += 1
+        return self.request_count
+
+    @staticmethod
+    def data(keys: dict[str, str], attrs: dict[str, Any]) -> str:
+        parts = []
+        for name, value in attrs.items():
+            if value is None:
+                continue
+            parts.append(
+                f'<data key="{keys[name]}">{escape(str(value))}</data>')
+        return "".join(parts)
+
+    def node(self, node_type: str, **attrs: Any) -> str:
+        node_id = f"n{self.node_count}"
+        self.node_count += 1
+        attrs = {"node type": node_type, "timestamp": self.tick(), **attrs}
+        self.handle.write(
+            f'<node id="{node_id}">{self.data(self.node_keys, attrs)}'
+            '</node>\n')
+        return node_id
+
+    def edge(self, edge_type: str, source: str, target: str,
+             **attrs: Any) -> str:
+        edge_id = f"e{self.edge_count}"
+        self.edge_count += 1
+        attrs = {"edge type": edge_type, "timestamp": self.tick(), **attrs}
+        self.edge_handle.write(
+            f'<edge id="{edge_id}" source={quoteattr(source)} '
+            f'target={quoteattr(target)}>'
+            f'{self.data(self.edge_keys, attrs)}</edge>\n')
+        return edge_id
+
+
+class Frame:
+
+    def __init__(self, writer: GraphWriter, url: str,
+                 frame_owner: str | None = None):
+        self.writer = writer
+        self.parser = writer.node("parser")
+        if frame_owner:
+            writer.edge("cross DOM", frame_owner, self.parser)
+        self.frame_id = writer.blink_id()
+        self.domroot = writer.node(
+            "DOM root", **{
+                "node id": self.frame_id,
+                "frame id": self.frame_id,
+                "tag name": "#document",
+                "url": url,
+            })
+        writer.edge("create node", self.parser, self.domroot,
+                    **{"frame id": self.frame_id})
+        writer.edge("structure", self.parser, self.domroot)
+        self.blink_ids = {self.domroot: self.frame_id}
+        html = self.element(self.parser, "HTML", self.domroot)
+        self.body = self.element(self.parser, "BODY", html)
+
+    def element(self, creator: str, tag: str, parent: str | None,
+                node_type: str = "HTML element") -> str:
+        blink_id = self.writer.blink_id()
+        node_id = self.writer.node(
+            node_type, **{"node id": blink_id, "tag name": tag})
+        self.blink_ids[node_id] = blink_id
+        self.writer.edge("create node", creator, node_id,
+                         **{"frame id": self.frame_id})
+        if parent is not None:
+            self.insert(creator, node_id, parent)
+        return node_id
+
+    def text(self, creator: str, parent: str) -> str:
+        blink_id = self.writer.blink_id()
+        node_id = self.writer.node("text node", **{"node id": blink_id})
+        self.blink_ids[node_id] = blink_id
+        self.writer.edge("create node", creator, node_id,
+                         **{"frame id": self.frame_id})
+        self.insert(creator, node_id, parent)
+        return node_id
+
+    def insert(self, actor: str, node_id: str, parent: str) -> None:
+        self.writer.edge("insert node", actor, node_id, **{
+            "frame id": self.frame_id,
+            "parent": self.blink_ids[parent],
+        })
+
+    def request(self, requester: str, url: str, resource_type: str,
+                body: str = "", redirects: int = 0,
+                failed: bool = False) -> None:
+        writer = self.writer
+        request_id = writer.request_id()
+        resource = writer.node("resource", url=url)
+        writer.edge("request start", requester, resource, **{
+            "frame id": self.frame_id,
+            "request id": request_id,
+            "resource type": resource_type,
+        })
+        for i in range(redirects):
+            next_resource = writer.node("resource", url=f"{url}?r={i}")
+            writer.edge("request redirect", resource, next_resource, **{
+                "frame id": self.frame_id,
+                "request id": request_id,
+            })
+            resource = next_resource
+        if failed:
+            writer.edge("request error", resource, requester, **{
+                "frame id": self.frame_id,
+                "request id": request_id,
+                "headers": "HTTP/1.1 404 Not Found",
+            })
+            return
+        writer.edge("request complete", resource, requester, **{
+            "frame id": self.frame_id,
+            "request id": request_id,
+            "response hash": source_hash(body),
+            "size": len(body.encode("utf8")),
+            "headers": "HTTP/1.1 200 OK\ncontent-type: text/javascript",
+        })
+
+
+def source_hash(source: str) -> str:
+    digest = hashlib.sha256(source.encode("utf8")).digest()
+    return b64encode(digest).decode("utf8")
+
+
+def script_source(index: int, size: int) -> str:
+    line = f"window.__synthetic_{index} = function () {{ return {index}; }};\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def populate_frame(frame: Frame, apis: dict[str, str], scripts: int,
+                   elements: int, calls: int, source_size: int,
+                   cross_frame_id: str | None, script_offset: int) -> None:
+    writer = frame.writer
+    for i in range(elements):
+        div = frame.element(frame.parser, "DIV", frame.body)
+        frame.text(frame.parser, div)
+        writer.edge("set attribute", frame.parser, div, **{
+            "frame id": frame.frame_id,
+            "key": "class",
+            "value": f"item-{i}",
+        })
+        if i % 10 == 0:
+            img = frame.element(frame.parser, "IMG", div)
+            frame.request(img, f"https://cdn.example.test/{i}.png", "Image",
+                          failed=(i % 20 == 0))
+
+    last_script = None
+    for i in range(scripts):
+        index = script_offset + i
+        source = script_source(index, source_size)
+        kind = i % 3
+        if kind == 2 and last_script is not None:
+            script = writer.node("script", **{
+                "script type": "eval", "source": source})
+            writer.edge("execute", last_script, script)
+        else:
+            elm = frame.element(frame.parser, "SCRIPT", frame.body)
+            script_type = "inline"
+            if kind == 1:
+                script_type = "external file"
+                frame.request(
+                    elm, f"https://scripts.example.test/{index}.js",
+                    "Script", body=source, redirects=(i % 4 == 1))
+            script = writer.node("script", **{
+                "script type": script_type, "source": source})
+            writer.edge("execute", elm, script)
+        last_script = script
+
+        for call in range(calls):
+            api_name = WEB_APIS[(index + call) % len(WEB_APIS)]
+            if call % 4 == 3:
+                api_name = JS_BUILTINS[(index + call) % len(JS_BUILTINS)]
+            receiver = frame.frame_id
+            if cross_frame_id is not None and call == 0:
+                receiver = cross_frame_id
+            writer.edge("js call", script, apis[api_name], **{
+                "frame id": receiver,
+                "args": json.dumps([index, call, "arg"]),
+            })
+            writer.edge("js result", apis[api_name], script, **{
+                "frame id": receiver,
+                "value": json.dumps({"call": call}),
+            })
+
+        if i % 5 == 0:
+            created = frame.element(script, "SPAN", None)
+            frame.insert(script, created, frame.body)
+            if i % 10 == 0:
+                writer.edge("remove node", script, created, **{
+                    "frame id": frame.frame_id,
+                })
+            writer.edge("storage set", script, apis["local storage"], **{
+                "frame id": frame.frame_id,
+                "key": f"key-{index}",
+                "value": "1",
+            })
+
+
+def write_graph(output: TextIO, scripts: int = 1000, elements: int = 1000,
+                frames: int = 4, calls: int = 4, depth: int = 0,
+                source_size: int = 2048, script_chain: int = 0) -> None:
+    with tempfile.TemporaryFile("w+", encoding="utf8") as edge_handle:
+        writer = GraphWriter(output, edge_handle)
+        writer.header()
+
+        apis = {}
+        for name in WEB_APIS:
+            apis[name] = writer.node("web API", method=name)
+        for name in JS_BUILTINS:
+            apis[name] = writer.node("JS builtin", method=name)
+        storage = writer.node("storage")
+        apis["local storage"] = writer.node("local storage")
+        writer.edge("storage bucket", storage, apis["local storage"])
+
+        top_frame = Frame(writer, "https://example.test/")
+        per_frame_scripts = scripts // (frames + 1)
+        per_frame_elements = elements // (frames + 1)
+        populate_frame(top_frame, apis, scripts - frames * per_frame_scripts,
+                       elements - frames * per_frame_elements, calls,
+                       source_size, None, 0)
+
+        parent = top_frame.body
+        for _ in range(depth):
+            parent = top_frame.element(top_frame.parser, "DIV", parent)
+
+        creator = top_frame.parser
+        for i in range(script_chain):
+            elm = top_frame.element(creator, "SCRIPT", top_frame.body)
+            script = writer.node("script", **{
+                "script type": "inline",
+                "source": script_source(scripts + i, 64)})
+            writer.edge("execute", elm, script)
+            creator = script
+
+        for i in range(frames):
+            iframe = top_frame.element(top_frame.parser, "IFRAME",
+                                       top_frame.body, "frame owner")
+            if i % 2 == 0:
+                url = "about:blank"
+            else:
+                url = f"https://ads{i}.example.test/frame.html"
+            child_frame = Frame(writer, url, iframe)
+            populate_frame(child_frame, apis, per_frame_scripts,
+                           per_frame_elements, calls, source_size,
+                           top_frame.frame_id,
+                           scripts + i * per_frame_scripts)
+
+        edge_handle.seek(0)
+        shutil.copyfileobj(edge_handle, output)
+        writer.footer()
+
+
+if __name__ == "__main__":
+    PARSER = argparse.ArgumentParser(
+        description="Write a synthetic PageGraph recording.")
+    PARSER.add_argument("output", help="Path to write the GraphML file to.")
+    PARSER.add_argument("--scripts", type=int, default=1000)
+    PARSER.add_argument("--elements", type=int, default=1000)
+    PARSER.add_argument("--frames", type=int, default=4)
+    PARSER.add_argument("--calls", type=int, default=4,
+                        help="Number of JS calls made by each script.")
+    PARSER.add_argument("--depth", type=int, default=0,
+                        help="Length of a chain of nested DIV elements.")
+    PARSER.add_argument("--source-size", type=int, default=2048,
+                        help="Size, in bytes, of each script's source.")
+    PARSER.add_argument("--script-chain", type=int, default=0,
+                        help="Length of a chain of scripts, each executed "
+                             "by an element the previous one created.")
+    ARGS = PARSER.parse_args()
+    with open(ARGS.output, "w", encoding="utf8") as handle:
+        write_graph(handle, ARGS.scripts, ARGS.elements, ARGS.frames,
+                    ARGS.calls, ARGS.depth, ARGS.source_size,
+                    ARGS.script_chain)
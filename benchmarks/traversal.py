@@ -0,0 +1,111 @@
+"""Times traversal heavy workloads over a loaded PageGraph recording:
+building script reports (as the `scripts` command does), recursive
+element reports (as `elm -d N` does), and visiting the neighbors of every
+node (as the feature extractor does).
+
+Loading the recording is not included in the times. Each run happens in a
+fresh child process. With `--against PATH`, the same workloads are also
+run using the `pagegraph` package from another checkout (e.g., a
+`git worktree` of an older commit), for comparison.
+
+Usage (from the repository root):
+
+    python -m benchmarks.traversal path/to/recording.graphml \\
+        [--against path/to/other/checkout]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from time import perf_counter
+from typing import Any
+
+import pagegraph.graph
+from pagegraph.graph import PageGraph
+
+
+def workload_scripts(pg: PageGraph, depth: int) -> int:
+    return len([node.to_report() for node in pg.script_nodes()])
+
+
+def workload_elm(pg: PageGraph, depth: int) -> int:
+    # Report on every 25th node, as `elm -d depth` would.
+    nodes = pg.nodes()
+    for node in nodes[::25]:
+        node.to_node_report(depth)
+    return len(nodes[::25])
+
+
+def workload_neighbors(pg: PageGraph, depth: int) -> int:
+    count = 0
+    for node in pg.nodes():
+        count += len(list(node.parent_nodes()))
+        count += len(list(node.child_nodes()))
+        for edge in node.outgoing_edges():
+            edge.outgoing_node()
+            count += 1
+        for edge in node.incoming_edges():
+            edge.incoming_node()
+            count += 1
+    return count
+
+
+WORKLOADS = {
+    "scripts": workload_scripts,
+    "elm": workload_elm,
+    "neighbors": workload_neighbors,
+}
+
+
+def measure(input_path: str, depth: int) -> dict[str, Any]:
+    sys.setrecursionlimit(100000)
+    pg = pagegraph.graph.from_path(input_path)
+    results: dict[str, Any] = {}
+    for name, workload in WORKLOADS.items():
+        start = perf_counter()
+        workload(pg, depth)
+        results[name] = perf_counter() - start
+    return results
+
+
+def run_child(input_path: str, depth: int,
+              checkout: str | None) -> dict[str, Any]:
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    cwd = repo_root
+    if checkout:
+        # Run from the other checkout, so its `pagegraph` is imported,
+        # but keep this checkout's `benchmarks` importable.
+        cwd = checkout
+        env["PYTHONPATH"] = os.pathsep.join([checkout, repo_root])
+    cmd = [sys.executable, "-m", "benchmarks.traversal", "--child",
+           os.path.abspath(input_path), "--depth", str(depth)]
+    output = subprocess.run(cmd, check=True, capture_output=True, text=True,
+                            cwd=cwd, env=env)
+    return json.loads(output.stdout)
+
+
+if __name__ == "__main__":
+    PARSER = argparse.ArgumentParser(
+        description="Benchmark traversing a PageGraph recording.")
+    PARSER.add_argument("input", help="Path to PageGraph recording.")
+    PARSER.add_argument("--depth", type=int, default=3,
+                        help="Depth of the `elm` workload's reports.")
+    PARSER.add_argument("--against", default=None,
+                        help="Path to another checkout to compare with.")
+    PARSER.add_argument("--child", action="store_true",
+                        help=argparse.SUPPRESS)
+    ARGS = PARSER.parse_args()
+
+    if ARGS.child:
+        print(json.dumps(measure(ARGS.input, ARGS.depth)))
+        sys.exit(0)
+
+    RUNS = {"this checkout": run_child(ARGS.input, ARGS.depth, None)}
+    if ARGS.against:
+        RUNS[ARGS.against] = run_child(ARGS.input, ARGS.depth, ARGS.against)
+    print(f"{'workload':<12}" + "".join(f"{name[-24:]:>26}" for name in RUNS))
+    for WORKLOAD in WORKLOADS:
+        print(f"{WORKLOAD:<12}" + "".join(
+            f"{run[WORKLOAD]:>25.2f}s" for run in RUNS.values()))
@@ -8,6 +8,8 @@ from time import time
 
 import networkx as nx
 import pagegraph.commands
+import pagegraph.graph
+from pagegraph.compression import recording_name
 import tldextract
 from six.moves.urllib.parse import urlparse
 from six.moves.urllib.parse import urlunparse
@@ -38,7 +40,7 @@ def read_file(fpath):
 
 def write_features(features, graph_path):
   os.makedirs(feature_dir, exist_ok=True)
-  feature_name = os.path.basename(graph_path)[:-8] + '.json'
+  feature_name = recording_name(os.path.basename(graph_path)) + '.json'
   feature_path = os.path.join(feature_dir, feature_name)
   features = json.dumps(features, indent=4)
   with open(feature_path, 'w') as f:
@@ -49,9 +51,10 @@ def get_graph_path(graph_dir):
   graph_paths = []
   for domain in os.listdir(graph_dir):
     for fname in os.listdir(os.path.join(graph_dir, domain)):
-      if fname.endswith('.graphml'):
+      graph_name = recording_name(fname)
+      if graph_name is not None:
         graph_path = os.path.join(graph_dir, domain, fname)
-        feature_name = os.path.basename(graph_path)[:-8] + '.json'
+        feature_name = graph_name + '.json'
         feature_path = os.path.join(feature_dir, feature_name)
         if (
           os.path.getsize(graph_path) != 0 and
@@ -66,7 +69,7 @@ def get_target_url(graph_path):
   for l in read_file(mapping_path):
     target_url = l.split(',')[1]
     html_name = os.path.basename(l.split(',')[0])[:-5]
-    graph_name = os.path.basename(graph_path)[:-8]
+    graph_name = recording_name(os.path.basename(graph_path))
     if html_name == graph_name:
       return target_url
 
@@ -288,7 +291,10 @@ def extract_request_features(graph_path):
   if is_modified:
     target_url = remove_url_idx(target_url)
 
-  pg, requests = pagegraph.commands.requests(graph_path, None, False)
+  # Features are drawn from across the whole graph, so the full graph is
+  # loaded, rather than just the parts the `requests` command needs.
+  pg = pagegraph.graph.from_path(graph_path)
+  requests = pagegraph.commands.requests_for_graph(pg, None)
   request_features = []
   for request_report in requests:
     features = extract_features(pg, target_url, request_report, graph_path)
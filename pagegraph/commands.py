@@ -1,7 +1,11 @@
 from dataclasses import dataclass
-from typing import cast, Any, TYPE_CHECKING, Union
+from typing import cast, Any, Iterator, TYPE_CHECKING, Union
 
 import pagegraph.graph
+from pagegraph.graph import PageGraph
+from pagegraph.graph.edge import Edge, RequestStartEdge
+from pagegraph.graph.node import Node, JSStructureNode
+from pagegraph.graph.projection import Projection
 from pagegraph.types import PageGraphId
 from pagegraph.serialize import FrameReport, RequestReport, ScriptReport
 from pagegraph.serialize import DOMElementReport, JSStructureReport
@@ -9,6 +13,67 @@ from pagegraph.serialize import JSInvokeReport, Report, RequestChainReport
 from pagegraph.serialize import NodeReport, EdgeReport
 
 
+# The parts of the graph each command needs. Every command that reports on
+# a frame needs to find DOM roots from the nodes that created, or executed,
+# the elements and scripts it reports on.
+EXECUTION_NODE_TYPES = [
+    Node.Types.DOM_ROOT,
+    Node.Types.FRAME_OWNER,
+    Node.Types.HTML_NODE,
+    Node.Types.PARSER,
+    Node.Types.SCRIPT,
+    Node.Types.TEXT_NODE,
+]
+EXECUTION_EDGE_TYPES = [
+    Edge.Types.CROSS_DOM,
+    Edge.Types.EXECUTE,
+    Edge.Types.EXECUTE_FROM_ATTRIBUTE,
+    Edge.Types.NODE_CREATE,
+    Edge.Types.STRUCTURE,
+]
+REQUEST_EDGE_TYPES = [
+    Edge.Types.REQUEST_COMPLETE,
+    Edge.Types.REQUEST_ERROR,
+    Edge.Types.REQUEST_REDIRECT,
+    Edge.Types.REQUEST_START,
+]
+FRAME_ATTRS = [
+    Node.RawAttrs.BLINK_ID.value,
+    Node.RawAttrs.FRAME_ID.value,
+    Node.RawAttrs.TAG.value,
+    Node.RawAttrs.TIMESTAMP.value,
+    Node.RawAttrs.URL.value,
+    Edge.RawAttrs.FRAME_ID.value,
+]
+REQUEST_ATTRS = [
+    Edge.RawAttrs.HASH.value,
+    Edge.RawAttrs.HEADERS.value,
+    Edge.RawAttrs.REQUEST_ID.value,
+    Edge.RawAttrs.RESOURCE_TYPE.value,
+    Edge.RawAttrs.SIZE.value,
+]
+
+SUBFRAMES_PROJECTION = Projection(
+    EXECUTION_NODE_TYPES, EXECUTION_EDGE_TYPES, FRAME_ATTRS)
+
+REQUESTS_PROJECTION = Projection(
+    [Node.Types.RESOURCE, *EXECUTION_NODE_TYPES],
+    REQUEST_EDGE_TYPES,
+    [*FRAME_ATTRS, *REQUEST_ATTRS])
+
+SCRIPTS_PROJECTION = Projection(
+    [Node.Types.RESOURCE, *EXECUTION_NODE_TYPES],
+    [*REQUEST_EDGE_TYPES, *EXECUTION_EDGE_TYPES],
+    [*FRAME_ATTRS, *REQUEST_ATTRS, Node.RawAttrs.SCRIPT_TYPE.value,
+     Node.RawAttrs.SOURCE.value])
+
+JS_CALLS_PROJECTION = Projection(
+    [Node.Types.JS_BUILTIN, Node.Types.WEB_API, *EXECUTION_NODE_TYPES],
+    [Edge.Types.JS_CALL, Edge.Types.JS_RESULT, *EXECUTION_EDGE_TYPES],
+    [*FRAME_ATTRS, Node.RawAttrs.METHOD.value, Edge.RawAttrs.ARGS.value,
+     Edge.RawAttrs.VALUE.value])
+
+
 @dataclass
 class SubFramesCommandReport(Report):
     parent_frame: FrameReport
@@ -17,10 +82,14 @@ class SubFramesCommandReport(Report):
 
 
 def subframes(input_path: str, local_only: bool,
-              debug: bool) -> list[SubFramesCommandReport]:
-    pg = pagegraph.graph.from_path(input_path, debug)
-    report: list[SubFramesCommandReport] = []
+              debug: bool) -> Iterator[SubFramesCommandReport]:
+    with pagegraph.graph.from_path(input_path, debug,
+                                   projection=SUBFRAMES_PROJECTION) as pg:
+        yield from subframes_for_graph(pg, local_only)
+
 
+def subframes_for_graph(
+        pg: PageGraph, local_only: bool) -> Iterator[SubFramesCommandReport]:
     for iframe_node in pg.iframe_nodes():
         parent_frame = iframe_node.domroot()
         if parent_frame is None:
@@ -47,10 +116,8 @@ def subframes(input_path: str, local_only: bool,
         if local_only and not is_all_local_frames:
             continue
 
-        subframe_report = SubFramesCommandReport(
+        yield SubFramesCommandReport(
             parent_frame_report, iframe_elm_report, child_frame_reports)
-        report.append(subframe_report)
-    return report
 
 
 @dataclass
@@ -59,24 +126,37 @@ class RequestsCommandReport(Report):
     frame: FrameReport
 
 
-def requests(input_path: str, frame_nid: str | None,
-             debug: bool) -> list[RequestsCommandReport]:
-    pg = pagegraph.graph.from_path(input_path, debug)
-    reports: list[RequestsCommandReport] = []
+def requests(input_path: str, frame_nid: str | None, debug: bool,
+             since: int | None = None, until: int | None = None
+             ) -> Iterator[RequestsCommandReport]:
+    with pagegraph.graph.from_path(input_path, debug,
+                                   projection=REQUESTS_PROJECTION) as pg:
+        yield from requests_for_graph(pg, frame_nid, since, until)
 
-    for request_start_edge in pg.request_start_edges():
+
+def requests_for_graph(pg: PageGraph, frame_nid: str | None,
+                       since: int | None = None, until: int | None = None
+                       ) -> Iterator[RequestsCommandReport]:
+    if frame_nid:
+        request_start_edges = pg.request_start_edges_for_frame_id(frame_nid)
+    else:
+        request_start_edges = pg.request_start_edges()
+    if since is not None or until is not None:
+        # Requests are still reported in graph order, not time order.
+        timeline = pg.temporal_index().timeline(
+            Edge.Types.REQUEST_START, frame_nid or None)
+        in_range = set(timeline.between(since, until))
+        request_start_edges = [edge for edge in request_start_edges
+                               if edge.index() in in_range]
+    for request_start_edge in request_start_edges:
         request_frame_id = request_start_edge.frame_id()
-        if frame_nid and request_frame_id != frame_nid:
-            continue
         request_id = request_start_edge.request_id()
         request_chain = pg.request_chain_for_id(request_id)
         request_frame = pg.domroot_for_frame_id(request_frame_id)
 
         request_chain_report = request_chain.to_report()
         frame_report = request_frame.to_report()
-        report = RequestsCommandReport(request_chain_report, frame_report)
-        reports.append(report)
-    return pg, reports
+        yield RequestsCommandReport(request_chain_report, frame_report)
 
 
 @dataclass
@@ -88,32 +168,31 @@ class JSCallsCommandReport(Report):
 
 
 def js_calls(input_path: str, frame: str | None, cross_frame: bool,
-             method: str | None, pg_id: PageGraphId | None,
-             debug: bool) -> list[JSCallsCommandReport]:
-    pg = pagegraph.graph.from_path(input_path, debug)
-    reports: list[JSCallsCommandReport] = []
-
-    js_structure_nodes = pg.js_structure_nodes()
-    for js_node in js_structure_nodes:
-        if pg_id and js_node.id() != pg_id:
-            continue
-        if method and method not in js_node.name():
-            continue
-
-        for call_result in js_node.call_results():
-            if frame and call_result.call_context().id() != frame:
-                continue
-            if cross_frame and not call_result.is_cross_frame_call():
-                continue
-
-            call_context = call_result.call_context()
-            receiver_context = call_result.receiver_context()
-
-            js_call_report = JSCallsCommandReport(
-                js_node.to_report(), call_result.to_report(),
-                call_context.to_report(), receiver_context.to_report())
-            reports.append(js_call_report)
-    return reports
+             method: str | None, pg_id: PageGraphId | None, debug: bool,
+             since: int | None = None, until: int | None = None
+             ) -> Iterator[JSCallsCommandReport]:
+    with pagegraph.graph.from_path(input_path, debug,
+                                   projection=JS_CALLS_PROJECTION) as pg:
+        yield from js_calls_for_graph(pg, frame, cross_frame, method, pg_id,
+                                      since, until)
+
+
+def js_calls_for_graph(pg: PageGraph, frame: str | None, cross_frame: bool,
+                       method: str | None, pg_id: PageGraphId | None,
+                       since: int | None = None, until: int | None = None
+                       ) -> Iterator[JSCallsCommandReport]:
+    # Calls are selected using the call table's indexes, and only the
+    # selected calls' edges and nodes are read.
+    table = pg.js_call_table()
+    for row in table.rows(pg_id, method, frame, cross_frame, since, until):
+        js_node = cast(JSStructureNode, pg.node_at(table.callees[row]))
+        call_context = table.call_context(row)
+        receiver_context = table.receiver_context(row)
+        call_result = table.call_result(row)
+
+        yield JSCallsCommandReport(
+            js_node.to_report(), call_result.to_report(),
+            call_context.to_report(), receiver_context.to_report())
 
 
 @dataclass
@@ -123,24 +202,69 @@ class ScriptsCommandReport(Report):
 
 
 def scripts(input_path: str, frame: str | None, pg_id: PageGraphId | None,
-            include_source: bool, debug: bool) -> list[ScriptsCommandReport]:
-    pg = pagegraph.graph.from_path(input_path, debug)
-    reports: list[ScriptsCommandReport] = []
+            include_source: bool, debug: bool, since: int | None = None,
+            until: int | None = None) -> Iterator[ScriptsCommandReport]:
+    with pagegraph.graph.from_path(input_path, debug,
+                                   projection=SCRIPTS_PROJECTION) as pg:
+        yield from scripts_for_graph(pg, frame, pg_id, include_source,
+                                     since, until)
+
+
+def scripts_for_graph(pg: PageGraph, frame: str | None,
+                      pg_id: PageGraphId | None, include_source: bool,
+                      since: int | None = None, until: int | None = None
+                      ) -> Iterator[ScriptsCommandReport]:
+    # Scripts are filtered by when they were executed, using the graph's
+    # temporal index.
+    executed_in_range: set[int] | None = None
+    if since is not None or until is not None:
+        temporal_index = pg.temporal_index()
+        executed_in_range = set()
+        for edge_type in (Edge.Types.EXECUTE,
+                          Edge.Types.EXECUTE_FROM_ATTRIBUTE):
+            timeline = temporal_index.timeline(edge_type)
+            executed_in_range.update(
+                pg.store.edge_target(i)
+                for i in timeline.between(since, until))
+
     for script_node in pg.script_nodes():
         if pg_id and script_node.id() != pg_id:
             continue
+        if (executed_in_range is not None and
+                script_node.index() not in executed_in_range):
+            continue
         script_report = script_node.to_report(include_source)
-        report = ScriptsCommandReport(script_report)
-        reports.append(report)
-    return reports
+        yield ScriptsCommandReport(script_report)
 
 
 def element_query(input_path: str, pg_id: PageGraphId, depth: int,
                   debug: bool) -> Union[NodeReport | EdgeReport]:
-    pg = pagegraph.graph.from_path(input_path, debug)
+    with pagegraph.graph.from_path(input_path, debug) as pg:
+        return element_query_for_graph(pg, pg_id, depth)
+
+
+def element_query_for_graph(pg: PageGraph, pg_id: PageGraphId,
+                            depth: int) -> Union[NodeReport | EdgeReport]:
     if pg_id.startswith("n"):
         return pg.node(pg_id).to_node_report(depth)
     elif pg_id.startswith("e"):
         return pg.edge(pg_id).to_edge_report(depth)
     else:
         raise ValueError("Invalid element id, should be either n## or e##.")
+
+
+@dataclass
+class SnapshotBuildCommandReport(Report):
+    input: str
+    snapshot: str
+    nodes: int
+    edges: int
+
+
+def snapshot_build(input_path: str,
+                   debug: bool) -> SnapshotBuildCommandReport:
+    snapshot_path = pagegraph.graph.build_snapshot(input_path)
+    with pagegraph.graph.from_path(input_path, debug) as pg:
+        return SnapshotBuildCommandReport(input_path, snapshot_path,
+                                          pg.store.num_nodes(),
+                                          pg.store.num_edges())
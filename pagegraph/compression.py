@@ -0,0 +1,75 @@
+"""Support for reading compressed PageGraph recordings.
+
+Recordings are often stored gzip or zstd compressed. The compression used
+is detected from the first bytes of the file (not the file name), and the
+recording is decompressed as it is read, so compressed recordings never
+need to be written back to disk.
+
+Reading zstd compressed recordings needs either Python 3.14's
+`compression.zstd` module, or the `zstandard` package."""
+from enum import StrEnum
+import gzip
+from typing import Any, BinaryIO, cast
+
+
+class Compression(StrEnum):
+    NONE = "none"
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+
+MAGIC_BYTES: dict[Compression, bytes] = {
+    Compression.GZIP: b"\x1f\x8b",
+    Compression.ZSTD: b"\x28\xb5\x2f\xfd",
+}
+
+# File name suffixes used for recordings, most specific first.
+RECORDING_SUFFIXES = (".graphml.gz", ".graphml.zst", ".graphml")
+
+
+def detect_compression(input_path: str) -> Compression:
+    with open(input_path, "rb") as handle:
+        header = handle.read(4)
+    for compression, magic in MAGIC_BYTES.items():
+        if header.startswith(magic):
+            return compression
+    return Compression.NONE
+
+
+def _open_zstd(input_path: str) -> BinaryIO:
+    zstd: Any
+    try:
+        from compression import zstd  # type: ignore
+        return cast(BinaryIO, zstd.open(input_path, "rb"))
+    except ImportError:
+        pass
+    try:
+        import zstandard as zstd  # type: ignore
+    except ImportError:
+        raise Exception(
+            f"Unable to read zstd compressed recording {input_path}: "
+            "install the zstandard package to read these recordings.")
+    handle = open(input_path, "rb")
+    return cast(BinaryIO, zstd.ZstdDecompressor().stream_reader(
+        handle, closefd=True))
+
+
+def open_recording(input_path: str) -> BinaryIO:
+    """Opens the recording at `input_path` for reading, decompressing it
+    as it is read if needed."""
+    compression = detect_compression(input_path)
+    if compression == Compression.GZIP:
+        return cast(BinaryIO, gzip.open(input_path, "rb"))
+    if compression == Compression.ZSTD:
+        return _open_zstd(input_path)
+    return open(input_path, "rb")
+
+
+def recording_name(file_name: str) -> str | None:
+    """Returns `file_name` without its recording suffix (e.g.,
+    "example.graphml.gz" -> "example"), or None if `file_name` does not
+    look like a PageGraph recording."""
+    for suffix in RECORDING_SUFFIXES:
+        if file_name.endswith(suffix):
+            return file_name[:-len(suffix)]
+    return None
@@ -1,89 +1,219 @@
-from functools import lru_cache
-from itertools import chain
+from enum import Enum
+from itertools import islice
+import mmap
+import os
+import sys
 from typing import Any, cast
 
 import networkx as NWX  # type: ignore
 
+from pagegraph.graph.domhistory import DOMHistory
+from pagegraph.graph.domroots import DOMRootIndex
 from pagegraph.graph.edge import Edge, NodeInsertEdge, JSCallEdge
 from pagegraph.graph.edge import RequestStartEdge
 from pagegraph.graph.edge import for_type as edge_for_type
+from pagegraph.graph.frames import FrameIndex
+from pagegraph.graph.graphml import read_graphml
+from pagegraph.graph.js import JSCallTable
+from pagegraph.graph.projection import Projection
 from pagegraph.graph.node import for_type as node_for_type
 from pagegraph.graph.node import DOMRootNode, Node, HTMLNode, ScriptNode
 from pagegraph.graph.node import ParserNode, FrameOwnerNode, ResourceNode
 from pagegraph.graph.node import TextNode, JSStructureNode
 from pagegraph.graph.requests import RequestChain, request_chain_for_edge
+from pagegraph.graph.snapshot import read_snapshot, snapshot_path
+from pagegraph.graph.snapshot import write_snapshot
+from pagegraph.graph.store import GraphStore, GraphStoreBuilder
+from pagegraph.graph.temporal import TemporalIndex
 from pagegraph.types import BlinkId, NodeIterator, PageGraphId, DOMNode
 from pagegraph.types import ChildNode, ParentNode, EdgeIterator, FrameId
-from pagegraph.types import RequestId
-from pagegraph.util import check_pagegraph_version
+from pagegraph.types import FrameSummary, RequestId
+from pagegraph.util import check_pagegraph_version, VersionPolicy
+
+
+# The number of items followed in each container, and the types of
+# objects not followed, by `_deep_size` (along with `PageGraph`).
+_SAMPLE_SIZE = 1000
+_UNMEASURED_TYPES = (GraphStore, type, Enum, memoryview, mmap.mmap)
+
+
+def _deep_size(roots: list[Any]) -> int:
+    """Estimates the memory held by the given objects, and by everything
+    they refer to, in bytes. Graphs and stores (which every node and edge
+    refers to) aren't followed, nor are classes, enum members, or views
+    into memory owned by something else.
+
+    So that measuring stays cheap, only a sample of the items in large
+    containers (e.g., the graph's cached nodes) is followed, and the
+    sample's size is scaled up to the container's length."""
+    unmeasured_types = (PageGraph, *_UNMEASURED_TYPES)
+    size = 0.0
+    seen: set[int] = set()
+    slots_by_type: dict[type, list[str]] = {}
+    # Each object to measure, with how many objects it stands for.
+    pending: list[tuple[Any, float]] = [(root, 1.0) for root in roots]
+    while pending:
+        value, weight = pending.pop()
+        if id(value) in seen or isinstance(value, unmeasured_types):
+            continue
+        seen.add(id(value))
+        size += sys.getsizeof(value) * weight
+        if isinstance(value, (dict, list, tuple, set, frozenset)):
+            step = max(1, len(value) // _SAMPLE_SIZE)
+            for item in islice(value.items() if isinstance(value, dict)
+                               else value, 0, None, step):
+                if isinstance(value, dict):
+                    pending.append((item[0], weight * step))
+                    item = item[1]
+                pending.append((item, weight * step))
+            continue
+        if hasattr(value, "__dict__"):
+            pending.append((vars(value), weight))
+        # Nodes and edges keep their state in slots.
+        value_type = type(value)
+        if value_type not in slots_by_type:
+            slots_by_type[value_type] = [
+                slot for cls in value_type.__mro__
+                for slot in getattr(cls, "__slots__", ())]
+        for slot in slots_by_type[value_type]:
+            if hasattr(value, slot):
+                pending.append((getattr(value, slot), weight))
+    return int(size)
 
 
 class PageGraph:
+    """A loaded PageGraph recording.
 
-    # Instance properties
-    debug: bool = True
-    graph: NWX.MultiDiGraph
-    r_graph: NWX.MultiDiGraph
-
-    __blink_id_map: dict[BlinkId, DOMNode] = {}
-    __request_chain_map: dict[RequestId, RequestChain] = {}
-
-    __nodes_by_type: dict[Node.Types, list[Node]] = {}
-    __edges_by_type: dict[Edge.Types, list[Edge]] = {}
-    __edge_cache: list[Edge] = []
-    __edge_id_cache: dict[PageGraphId, tuple[Any, Any]] = {}
+    All state (including every cached Node and Edge object) is owned by
+    the instance. Call `close()`, or use the graph as a context manager,
+    to release it as soon as the graph is no longer needed, e.g.:
 
-    __inserted_below_map: dict[ParentNode, list[ChildNode]] = {}
-    # Mapping from a frame id to the most recent DOM node seen for the frame
-    __frame_id_map: dict[FrameId, DOMRootNode] = {}
+        with pagegraph.graph.from_path(path) as pg:
+            ..."""
 
-    def __init__(self, graph: NWX.MultiDiGraph, debug: bool = False):
-        self.graph = graph
+    # Instance properties
+    debug: bool
+    store: GraphStore
+
+    # Node and Edge objects are created the first time they're requested,
+    # and then cached here, at their index in the graph store. The lists
+    # themselves are allocated when the first element is requested.
+    __nodes: list[Node | None]
+    __edges: list[Edge | None]
+
+    __nodes_by_type: dict[Node.Types, list[Node]]
+    __edges_by_type: dict[Edge.Types, list[Edge]]
+
+    # The Types value for each of the store's node and edge type codes
+    # (or None, for type names PageGraph doesn't know about).
+    __node_type_values: list[Node.Types | None]
+    __edge_type_values: list[Edge.Types | None]
+
+    # The below are built the first time they're needed.
+    __blink_id_map: dict[BlinkId, DOMNode] | None
+    __request_chain_map: dict[RequestId, RequestChain] | None
+    # Mapping from a response hash to the request chains that completed
+    # with that hash, in the order the requests were made.
+    __request_chains_by_hash: dict[str, list[RequestChain]] | None
+    __inserted_below_map: dict[ParentNode, list[ChildNode]] | None
+    __domroot_index: DOMRootIndex | None
+    __dom_history: DOMHistory | None
+    __frame_index: FrameIndex | None
+    __js_call_table: JSCallTable | None
+    __temporal_index: TemporalIndex | None
+
+    __graph: NWX.MultiDiGraph | None
+
+    def __init__(self, graph: GraphStore | NWX.MultiDiGraph,
+                 debug: bool = False):
+        """Graphs are typically loaded with `from_path`, which builds the
+        graph store by streaming the recording (or reading a snapshot of
+        it). Passing a networkx graph here is also supported."""
+        self.__reset_caches()
+        if isinstance(graph, GraphStore):
+            self.store = graph
+        else:
+            self.__graph = graph
+            self.store = store_from_networkx(graph)
         self.debug = debug
-        self.r_graph = NWX.reverse_view(graph)
-
-        # do the below to populate the blink_id mapping dicts
-        # and the frame_id to frame node mapping (we keep the most
-        # recent version of each frame).
-        for node_type in Node.Types:
-            self.__nodes_by_type[node_type] = []
-        for edge_type in Edge.Types:
-            self.__edges_by_type[edge_type] = []
-
-        for node in self.nodes():
-            self.__nodes_by_type[node.node_type()].append(node)
-        for edge in self.edges():
-            self.__edges_by_type[edge.edge_type()].append(edge)
-
-        # Now that we've mapped the NetworkX representation of the
-        # graph into the representation defined by this library,
-        # we iterate over each node and edge again, to allow
-        # each element to take steps and operations only
-        # safe to do once we know the entire graph is hooked up.
-        for node in self.nodes():
-            if self.debug:
+        self.__node_type_values = [
+            Node.Types(name) if name in Node.Types else None
+            for name in self.store.node_type_names]
+        self.__edge_type_values = [
+            Edge.Types(name) if name in Edge.Types else None
+            for name in self.store.edge_type_names]
+
+        if self.debug:
+            for node in self.nodes():
                 node.validate()
-            node.build_caches()
-        for edge in self.edges():
-            if self.debug:
+            for edge in self.edges():
                 edge.validate()
-            edge.build_caches()
-
-        for node in self.dom_nodes():
-            if node.is_domroot():
-                domroot_node = cast(DOMRootNode, node)
-                blink_id = domroot_node.blink_id()
-                if blink_id not in self.__frame_id_map:
-                    self.__frame_id_map[blink_id] = domroot_node
-                else:
-                    current_node = self.__frame_id_map[blink_id]
-                    if current_node.timestamp() < domroot_node.timestamp():
-                        self.__frame_id_map[blink_id] = domroot_node
 
-        for request_start_edge in self.request_start_edges():
-            request_id = request_start_edge.request_id()
-            self.__request_chain_map[request_id] = request_chain_for_edge(
-                request_start_edge)
+    def __reset_caches(self) -> None:
+        self.__nodes = []
+        self.__edges = []
+        self.__nodes_by_type = {}
+        self.__edges_by_type = {}
+        self.__blink_id_map = None
+        self.__request_chain_map = None
+        self.__request_chains_by_hash = None
+        self.__inserted_below_map = None
+        self.__domroot_index = None
+        self.__dom_history = None
+        self.__frame_index = None
+        self.__js_call_table = None
+        self.__temporal_index = None
+        self.__graph = None
+
+    def close(self) -> None:
+        """Releases the graph's caches and store. Nodes and edges from the
+        graph must not be used after it's closed. Closing a graph more
+        than once is harmless."""
+        self.__reset_caches()
+        self.store.close()
+
+    def memory_size(self) -> int:
+        """Returns an estimate of the memory held by the graph, in bytes:
+        its store, plus the node and edge objects and the indexes built so
+        far, which grow as the graph is queried."""
+        return self.store.memory_size() + _deep_size([
+            self.__nodes, self.__edges, self.__nodes_by_type,
+            self.__edges_by_type, self.__blink_id_map,
+            self.__request_chain_map, self.__request_chains_by_hash,
+            self.__inserted_below_map, self.__domroot_index,
+            self.__dom_history, self.__frame_index, self.__js_call_table,
+            self.__temporal_index, self.__graph])
+
+    def __enter__(self) -> "PageGraph":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @property
+    def graph(self) -> NWX.MultiDiGraph:
+        """A networkx view of the graph, for callers that want to use
+        networkx algorithms. This is only built when first requested."""
+        if self.__graph is None:
+            store = self.store
+            graph = NWX.MultiDiGraph()
+            # Attributes are passed as dicts, not keyword arguments, since
+            # attribute names (e.g., "key") can collide with networkx's
+            # own argument names.
+            graph.add_nodes_from(
+                (store.node_id(i), store.node_attrs(i, True))
+                for i in range(store.num_nodes()))
+            graph.add_edges_from(
+                (store.node_id(store.edge_source(i)),
+                 store.node_id(store.edge_target(i)),
+                 store.edge_id(i), store.edge_attrs(i, True))
+                for i in range(store.num_edges()))
+            self.__graph = graph
+        return self.__graph
+
+    @property
+    def r_graph(self) -> NWX.MultiDiGraph:
+        return NWX.reverse_view(self.graph)
 
     def unattributed_requests(self) -> list[RequestChain]:
         prefetched_requests = []
@@ -94,23 +224,41 @@ class PageGraph:
         return prefetched_requests
 
     def request_chain_for_id(self, request_id: RequestId) -> RequestChain:
+        request_chain_map = self.__request_chains()
         if self.debug:
-            if request_id not in self.__request_chain_map:
+            if request_id not in request_chain_map:
                 raise Exception(f"Unrecognized request id: {request_id}")
-        return self.__request_chain_map[request_id]
+        return request_chain_map[request_id]
+
+    def __request_chains(self) -> dict[RequestId, RequestChain]:
+        if self.__request_chain_map is None:
+            self.__request_chain_map = {}
+            for request_start_edge in self.request_start_edges():
+                self.__request_chain_map[request_start_edge.request_id()] = (
+                    request_chain_for_edge(request_start_edge))
+        return self.__request_chain_map
+
+    def request_chains_for_hash(self,
+                                response_hash: str) -> list[RequestChain]:
+        """Returns the request chains whose response had the given hash,
+        in the order the requests were made."""
+        if self.__request_chains_by_hash is None:
+            self.__request_chains_by_hash = {}
+            for request_chain in self.__request_chains().values():
+                chain_hash = request_chain.hash()
+                if chain_hash is None:
+                    continue
+                if chain_hash not in self.__request_chains_by_hash:
+                    self.__request_chains_by_hash[chain_hash] = []
+                self.__request_chains_by_hash[chain_hash].append(
+                    request_chain)
+        return self.__request_chains_by_hash.get(response_hash, [])
 
     def nodes(self) -> list[Node]:
-        return [self.node(node_id) for node_id in self.graph.nodes()]
+        return [self.node_at(i) for i in range(self.store.num_nodes())]
 
     def edges(self) -> EdgeIterator:
-        if len(self.__edge_cache) > 0:
-            return self.__edge_cache
-        edges = []
-        for u, v, edge_id in self.graph.edges:
-            self.__edge_id_cache[edge_id] = (u, v)
-            edges.append(self.edge(edge_id))
-        self.__edge_cache = edges
-        return edges
+        return [self.edge_at(i) for i in self.store.edges_in_order()]
 
     def insert_edges(self) -> list[NodeInsertEdge]:
         edges = self.edges_of_type(Edge.Types.NODE_INSERT)
@@ -121,6 +269,13 @@ class PageGraph:
         return cast(list[RequestStartEdge], edges)
 
     def node_for_blink_id(self, blink_id: BlinkId) -> Node:
+        if self.__blink_id_map is None:
+            # If more than one node has the same blink id, the one
+            # appearing last in the graph wins.
+            self.__blink_id_map = {}
+            for dom_node in sorted(self.dom_nodes(), key=lambda x: x.index()):
+                self.__blink_id_map[dom_node.blink_id()] = dom_node
+
         if self.debug:
             if blink_id not in self.__blink_id_map:
                 raise Exception(f"blink_id not in blink_id cache: {blink_id}")
@@ -146,16 +301,70 @@ class PageGraph:
         return cast(list[DOMNode], nodes)
 
     def nodes_of_type(self, node_type: Node.Types) -> list[Node]:
+        if node_type not in self.__nodes_by_type:
+            node_indexes = self.store.nodes_of_type(node_type.value)
+            self.__nodes_by_type[node_type] = [
+                self.node_at(i) for i in node_indexes]
         return self.__nodes_by_type[node_type]
 
     def edges_of_type(self, edge_type: Edge.Types) -> list[Edge]:
+        if edge_type not in self.__edges_by_type:
+            edge_indexes = self.store.edges_of_type(edge_type.value)
+            self.__edges_by_type[edge_type] = [
+                self.edge_at(i) for i in edge_indexes]
         return self.__edges_by_type[edge_type]
 
+    def domroot_for_node(self, node_index: int) -> DOMRootNode | None:
+        """Returns the DOM root the node at `node_index` belongs to (see
+        `pagegraph.graph.domroots`), or None if it can't be found."""
+        if self.__domroot_index is None:
+            self.__domroot_index = DOMRootIndex(self)
+        domroot_index = self.__domroot_index.domroot_index(node_index)
+        if domroot_index is None:
+            return None
+        return cast(DOMRootNode, self.node_at(domroot_index))
+
+    def frame_index(self) -> FrameIndex:
+        """Returns the index of the graph's frames (see
+        `pagegraph.graph.frames`), building it if needed."""
+        if self.__frame_index is None:
+            self.__frame_index = FrameIndex(self)
+        return self.__frame_index
+
+    def frame_ids(self) -> list[FrameId]:
+        return self.frame_index().frame_ids()
+
+    def domroots_for_frame_id(self, frame_id: FrameId) -> list[DOMRootNode]:
+        """Returns every DOM root the frame has had, oldest first."""
+        node_indexes = self.frame_index().domroots(frame_id)
+        return [cast(DOMRootNode, self.node_at(i)) for i in node_indexes]
+
     def domroot_for_frame_id(self, frame_id: FrameId) -> DOMRootNode:
-        if self.debug:
-            if frame_id not in self.__frame_id_map:
-                raise Exception(f"frame_id not in __frame_id_map:{frame_id}")
-        return self.__frame_id_map[frame_id]
+        """Returns the most recent DOM root of the frame."""
+        domroot_index = self.frame_index().latest_domroot(frame_id)
+        if domroot_index is None:
+            if self.debug:
+                raise Exception(f"frame_id not in frame index:{frame_id}")
+            raise KeyError(frame_id)
+        return cast(DOMRootNode, self.node_at(domroot_index))
+
+    def frame_owner_nodes_for_frame_id(
+            self, frame_id: FrameId) -> list[FrameOwnerNode]:
+        node_indexes = self.frame_index().frame_owners(frame_id)
+        return [cast(FrameOwnerNode, self.node_at(i)) for i in node_indexes]
+
+    def request_start_edges_for_frame_id(
+            self, frame_id: FrameId) -> list[RequestStartEdge]:
+        edge_indexes = self.frame_index().request_starts(frame_id)
+        return [cast(RequestStartEdge, self.edge_at(i)) for i in edge_indexes]
+
+    def js_call_edges_for_frame_id(
+            self, frame_id: FrameId) -> list[JSCallEdge]:
+        edge_indexes = self.frame_index().js_calls(frame_id)
+        return [cast(JSCallEdge, self.edge_at(i)) for i in edge_indexes]
+
+    def frame_summary(self, domroot: DOMRootNode) -> FrameSummary:
+        return self.frame_index().summary(domroot)
 
     def resource_nodes(self) -> list[ResourceNode]:
         node_iterator = self.nodes_of_type(Node.Types.RESOURCE)
@@ -184,55 +393,141 @@ class PageGraph:
     def js_structure_nodes(self) -> list[JSStructureNode]:
         js_builtin_iterator = self.nodes_of_type(Node.Types.JS_BUILTIN)
         webapi_iterator = self.nodes_of_type(Node.Types.WEB_API)
-        js_structures = chain(js_builtin_iterator, webapi_iterator)
+        js_structures = [*js_builtin_iterator, *webapi_iterator]
         return cast(list[JSStructureNode], js_structures)
 
     def js_call_edges(self) -> list[JSCallEdge]:
         edge_iterator = self.edges_of_type(Edge.Types.JS_CALL)
         return cast(list[JSCallEdge], edge_iterator)
 
+    def js_call_table(self) -> JSCallTable:
+        """Returns the table of every JS call in the graph (see
+        `pagegraph.graph.js.JSCallTable`), building it if needed."""
+        if self.__js_call_table is None:
+            self.__js_call_table = JSCallTable(self)
+        return self.__js_call_table
+
+    def temporal_index(self) -> TemporalIndex:
+        """Returns the index of the graph's edges by timestamp (see
+        `pagegraph.graph.temporal`), building it if needed."""
+        if self.__temporal_index is None:
+            self.__temporal_index = TemporalIndex(self)
+        return self.__temporal_index
+
+    def edges_between(self, since: int | None, until: int | None,
+                      edge_type: Edge.Types | None = None,
+                      frame_id: FrameId | None = None) -> list[Edge]:
+        """Returns the edges with timestamps from `since` to `until` (both
+        inclusive, and either unbounded if None), optionally only those
+        of one type, or in one frame, ordered by timestamp."""
+        timeline = self.temporal_index().timeline(edge_type, frame_id)
+        return [self.edge_at(i) for i in timeline.between(since, until)]
+
+    def edge_preceding(self, timestamp: int,
+                       edge_type: Edge.Types | None = None,
+                       frame_id: FrameId | None = None) -> Edge | None:
+        """Returns the last edge (optionally, of one type, or in one frame)
+        with a timestamp at or before `timestamp`, if any."""
+        timeline = self.temporal_index().timeline(edge_type, frame_id)
+        edge_index = timeline.latest_at(timestamp)
+        if edge_index is None:
+            return None
+        return self.edge_at(edge_index)
+
     def child_dom_nodes(self,
                         parent_node: ParentNode) -> list[ChildNode] | None:
         """Returns all nodes that were ever a child of the parent node,
-        at any point during the page's lifetime."""
+        at any point during the page's lifetime (see
+        `child_dom_nodes_at` for the children at a given time)."""
+        if self.__inserted_below_map is None:
+            self.__inserted_below_map = {}
+            for insert_edge in self.insert_edges():
+                inserted_node = insert_edge.inserted_node()
+                below_node = insert_edge.inserted_below_node()
+                if below_node not in self.__inserted_below_map:
+                    self.__inserted_below_map[below_node] = []
+                self.__inserted_below_map[below_node].append(inserted_node)
+
         if parent_node not in self.__inserted_below_map:
             return None
         return self.__inserted_below_map[parent_node]
 
-    @lru_cache(maxsize=None)
+    def dom_history(self) -> DOMHistory:
+        """Returns the history of the graph's DOM (see
+        `pagegraph.graph.domhistory`), building it if needed."""
+        if self.__dom_history is None:
+            self.__dom_history = DOMHistory(self)
+        return self.__dom_history
+
+    def child_dom_nodes_at(self, parent_node: ParentNode,
+                           timestamp: int) -> list[ChildNode]:
+        """Returns the children of the parent node at `timestamp`, in
+        document order."""
+        node_indexes = self.dom_history().children_at(
+            parent_node.index(), timestamp)
+        return [cast(ChildNode, self.node_at(i)) for i in node_indexes]
+
+    def dom_nodes_at(self, domroot: DOMRootNode,
+                     timestamp: int) -> list[DOMNode]:
+        """Returns the DOM root and every node in its document at
+        `timestamp`, in document order."""
+        node_indexes = self.dom_history().tree_at(domroot.index(), timestamp)
+        return [cast(DOMNode, self.node_at(i)) for i in node_indexes]
+
     def node(self, node_id: PageGraphId) -> Node:
+        node_index = self.store.node_index(node_id)
+        if node_index is None:
+            raise KeyError(node_id)
+        return self.node_at(node_index)
+
+    def edge(self, edge_id: PageGraphId) -> Edge:
+        edge_index = self.store.edge_index(edge_id)
+        if edge_index is None:
+            raise KeyError(edge_id)
+        return self.edge_at(edge_index)
+
+    def node_type_at(self, node_index: int) -> Node.Types:
+        node_type = self.__node_type_values[self.store.node_types[node_index]]
+        if node_type is None:
+            type_name = self.store.node_type_name(node_index)
+            raise ValueError(f"Unexpected node type={type_name}")
+        return node_type
+
+    def edge_type_at(self, edge_index: int) -> Edge.Types:
+        edge_type = self.__edge_type_values[self.store.edge_types[edge_index]]
+        if edge_type is None:
+            type_name = self.store.edge_type_name(edge_index)
+            raise ValueError(f"Unexpected edge type='{type_name}'")
+        return edge_type
+
+    def node_at(self, node_index: int) -> Node:
         """Loading any node object should come through this method, since
         this method is the one that knows what Node or Node subtype
         should be used."""
-        node_type_str = self.graph.nodes[node_id][Node.RawAttrs.TYPE.value]
-        node_type = Node.Types(node_type_str)
-        node = node_for_type(node_type, self, node_id)
-        if node.is_dom_node_type():
-            dom_node = cast(DOMNode, node)
-            self.__blink_id_map[dom_node.blink_id()] = dom_node
+        nodes = self.__nodes
+        if not nodes:
+            nodes = self.__nodes = [None] * self.store.num_nodes()
+        node = nodes[node_index]
+        if node is None:
+            node = node_for_type(
+                self.node_type_at(node_index), self, node_index)
+            nodes[node_index] = node
+            node.build_caches()
         return node
 
-    @lru_cache(maxsize=None)
-    def edge(self, edge_id: PageGraphId) -> Edge:
+    def edge_at(self, edge_index: int) -> Edge:
         """Loading any edge object should come through this method, since
         this method is the one that knows what Edge or Edge subtype
         should be used."""
-        parent_id, child_id = self.__edge_id_cache[edge_id]
-        edge_key = (parent_id, child_id, edge_id)
-        edge_data = self.graph.edges[edge_key]
-        edge_type_str = edge_data[Edge.RawAttrs.TYPE.value]
-        edge_type = Edge.Types(edge_type_str)
-        init_args = [self, edge_id, parent_id, child_id]
-        edge = edge_for_type(edge_type, *init_args)
-
-        if edge.is_insert_edge():
-            insert_edge = cast(NodeInsertEdge, edge)
-            inserted_node = insert_edge.inserted_node()
-            parent_node = insert_edge.inserted_below_node()
-
-            if parent_node not in self.__inserted_below_map:
-                self.__inserted_below_map[parent_node] = []
-            self.__inserted_below_map[parent_node].append(inserted_node)
+        edges = self.__edges
+        if not edges:
+            edges = self.__edges = [None] * self.store.num_edges()
+        edge = edges[edge_index]
+        if edge is None:
+            edge = edge_for_type(
+                self.edge_type_at(edge_index), self, edge_index)
+            edges[edge_index] = edge
+            edge.build_caches()
         return edge
 
     def iframe_nodes(self) -> list[FrameOwnerNode]:
@@ -256,6 +551,53 @@ class PageGraph:
         return nodes
 
 
-def from_path(input_path: str, debug: bool = False) -> PageGraph:
-    check_pagegraph_version(input_path)
-    return PageGraph(NWX.read_graphml(input_path), debug)
+def store_from_networkx(graph: NWX.MultiDiGraph) -> GraphStore:
+    builder = GraphStoreBuilder()
+    for node_id, node_data in graph.nodes(data=True):
+        builder.add_node(node_id, node_data)
+    for parent_id, child_id, edge_id, edge_data in graph.edges(
+            keys=True, data=True):
+        builder.add_edge(edge_id, parent_id, child_id, edge_data)
+    return builder.build()
+
+
+def from_path(input_path: str, debug: bool = False,
+              version_policy: VersionPolicy = VersionPolicy.WARN,
+              projection: Projection | None = None) -> PageGraph:
+    """Loads the PageGraph recording at `input_path`. If the recording was
+    written by a different major or minor version of PageGraph, a warning
+    is printed, or, if `version_policy` is `VersionPolicy.ERROR`, an
+    exception is raised before the rest of the file is read.
+
+    If `projection` is given, only the parts of the recording included in
+    the projection are loaded (see `pagegraph.graph.projection`).
+
+    If a snapshot of the recording has been built (see `build_snapshot`),
+    the graph is read from the snapshot instead, and `projection` is
+    ignored. If the recording has changed since the snapshot was built,
+    the snapshot is rebuilt."""
+    if not os.path.exists(snapshot_path(input_path)):
+        return PageGraph(
+            read_graphml(input_path, version_policy, projection), debug)
+
+    snapshot_store = read_snapshot(input_path)
+    if snapshot_store is not None:
+        check_pagegraph_version(snapshot_store.version, version_policy)
+        return PageGraph(snapshot_store, debug)
+
+    store = read_graphml(input_path, version_policy)
+    try:
+        write_snapshot(store, input_path)
+    except OSError as e:
+        print(f"Unable to rebuild snapshot of {input_path}: {e}",
+              file=sys.stderr)
+    return PageGraph(store, debug)
+
+
+def build_snapshot(input_path: str,
+                   version_policy: VersionPolicy = VersionPolicy.WARN) -> str:
+    """Parses the recording at `input_path` and writes a snapshot of it
+    next to the recording, so that later calls to `from_path` can skip
+    parsing. Returns the path of the snapshot."""
+    store = read_graphml(input_path, version_policy)
+    return write_snapshot(store, input_path)
@@ -0,0 +1,372 @@
+"""Reconstructs the DOM as it was at any point during the page's lifetime,
+from the graph's insert and remove edges (unlike
+`PageGraph.child_dom_nodes`, which returns every node that was ever a
+child of a node).
+
+Each time a node is inserted below a parent, the node is attached to the
+parent until it's removed, or inserted somewhere else. These attachments
+are recorded as intervals, numbered in the order they start, and indexed
+by parent and by child, so the DOM at any timestamp can be read directly
+from the intervals open at that time, without replaying the edges before
+it. A `DOMCursor` holds the DOM at one timestamp, and can step through
+the insertions and removals after it one at a time.
+
+Siblings are ordered by where each was inserted (i.e., before the node
+the insert edge names, or after the parent's other children). When the
+intervals are built, every attachment to a parent is placed in a single
+(linked) list that attachments are inserted into but never removed
+from, so the order of any two siblings never changes, and the children
+of a node at any timestamp are the attachments open at that time, in
+list order.
+
+Insert and remove edges are ordered by timestamp, and then by id. Edges
+without a timestamp are treated as happening before every other edge.
+An insert edge whose parent node can't be found only detaches the node
+from its previous parent (if any). A snapshot at a timestamp includes
+every edge with that timestamp."""
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Callable, TYPE_CHECKING
+
+from pagegraph.graph.edge import Edge
+from pagegraph.graph.store import MISSING
+from pagegraph.types import BlinkId, FrameId
+
+if TYPE_CHECKING:
+    from pagegraph.graph import PageGraph
+
+
+# The end of an attachment that's never closed.
+NO_END = (1 << 63) - 1
+
+
+@dataclass
+class DOMEvent:
+    class Types(StrEnum):
+        INSERT = "insert"
+        REMOVE = "remove"
+
+    event_type: Types
+    timestamp: int
+    # The indexes of the insert or remove edge, of the node inserted or
+    # removed, and of its parent (after an insert, or before a removal).
+    edge_index: int
+    node_index: int
+    parent_index: int
+
+
+class DOMHistory:
+
+    pg: "PageGraph"
+
+    # Every insert and remove edge, in the order they're applied, and for
+    # each, the attachment it opens (for inserts) and closes (for
+    # removals, and for inserts of already attached nodes), or -1.
+    event_edges: "array[int]"
+    event_timestamps: "array[int]"
+    event_opens: "array[int]"
+    event_closes: "array[int]"
+
+    # Every attachment, in the order they start: the parent and child
+    # node indexes, when the attachment starts and ends (or NO_END), and
+    # the attachment's position among all the parent's attachments.
+    parents: "array[int]"
+    children: "array[int]"
+    starts: "array[int]"
+    ends: "array[int]"
+    ranks: "array[int]"
+
+    # The attachments of each parent, and of each child, in start order.
+    __parent_attachments: dict[int, list[int]]
+    __child_attachments: dict[int, list[int]]
+
+    def __init__(self, pg: "PageGraph"):
+        self.pg = pg
+        self.event_edges = array("i")
+        self.event_timestamps = array("q")
+        self.event_opens = array("i")
+        self.event_closes = array("i")
+        self.parents = array("i")
+        self.children = array("i")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.ranks = array("i")
+        self.__parent_attachments = {}
+        self.__child_attachments = {}
+
+        store = pg.store
+        edge_indexes = sorted(
+            [*store.edges_of_type(Edge.Types.NODE_INSERT.value),
+             *store.edges_of_type(Edge.Types.NODE_REMOVE.value)],
+            key=lambda i: (store.edge_timestamps[i], store.edge_ids[i]))
+        try:
+            insert_type = store.edge_type_names.index(
+                Edge.Types.NODE_INSERT.value)
+        except ValueError:
+            insert_type = -1
+
+        # The open attachment of each attached node, and every attachment
+        # each parent has had, in sibling order, as a linked list: the
+        # first and last attachment of each parent, and the attachments
+        # before and after each attachment (or -1).
+        open_attachments: dict[int, int] = {}
+        first_siblings: dict[int, int] = {}
+        last_siblings: dict[int, int] = {}
+        previous_siblings = array("i")
+        next_siblings = array("i")
+        for edge_index in edge_indexes:
+            timestamp = store.edge_timestamps[edge_index]
+            child = store.edge_target(edge_index)
+            closes = open_attachments.pop(child, -1)
+            if closes != -1:
+                self.ends[closes] = timestamp
+
+            opens = -1
+            if store.edge_types[edge_index] == insert_type:
+                parent = self.__node_index_for_blink_id(store.edge_payload(
+                    edge_index, Edge.RawAttrs.PARENT_BLINK_ID.value))
+                if parent is None:
+                    if closes == -1:
+                        continue
+                else:
+                    opens = len(self.parents)
+                    self.parents.append(parent)
+                    self.children.append(child)
+                    self.starts.append(timestamp)
+                    self.ends.append(NO_END)
+                    self.ranks.append(-1)
+                    open_attachments[child] = opens
+                    self.__parent_attachments.setdefault(
+                        parent, []).append(opens)
+                    self.__child_attachments.setdefault(
+                        child, []).append(opens)
+                    before = self.__node_index_for_blink_id(
+                        store.edge_payload(
+                            edge_index, Edge.RawAttrs.BEFORE_BLINK_ID.value))
+                    before_attachment = None
+                    if before is not None:
+                        before_attachment = open_attachments.get(before)
+                    if (before_attachment is not None and
+                            self.parents[before_attachment] == parent):
+                        previous = previous_siblings[before_attachment]
+                        previous_siblings.append(previous)
+                        next_siblings.append(before_attachment)
+                        previous_siblings[before_attachment] = opens
+                        if previous == -1:
+                            first_siblings[parent] = opens
+                        else:
+                            next_siblings[previous] = opens
+                    else:
+                        last = last_siblings.get(parent, -1)
+                        previous_siblings.append(last)
+                        next_siblings.append(-1)
+                        last_siblings[parent] = opens
+                        if last == -1:
+                            first_siblings[parent] = opens
+                        else:
+                            next_siblings[last] = opens
+            elif closes == -1:
+                continue
+
+            self.event_edges.append(edge_index)
+            self.event_timestamps.append(timestamp)
+            self.event_opens.append(opens)
+            self.event_closes.append(closes)
+
+        for attachment in first_siblings.values():
+            rank = 0
+            while attachment != -1:
+                self.ranks[attachment] = rank
+                rank += 1
+                attachment = next_siblings[attachment]
+
+    def __node_index_for_blink_id(self, blink_id: BlinkId | None
+                                  ) -> int | None:
+        if not blink_id:
+            return None
+        try:
+            return self.pg.node_for_blink_id(blink_id).index()
+        except KeyError:
+            return None
+
+    def num_events(self) -> int:
+        return len(self.event_edges)
+
+    def event(self, position: int) -> DOMEvent:
+        """Returns the `position`-th insertion or removal."""
+        opens = self.event_opens[position]
+        if opens != -1:
+            return DOMEvent(DOMEvent.Types.INSERT,
+                            self.event_timestamps[position],
+                            self.event_edges[position],
+                            self.children[opens], self.parents[opens])
+        closes = self.event_closes[position]
+        return DOMEvent(DOMEvent.Types.REMOVE,
+                        self.event_timestamps[position],
+                        self.event_edges[position],
+                        self.children[closes], self.parents[closes])
+
+    def events_between(self, since: int, until: int) -> list[DOMEvent]:
+        """Returns the insertions and removals with timestamps after
+        `since`, up to and including `until`."""
+        start = bisect_right(self.event_timestamps, since)
+        end = bisect_right(self.event_timestamps, until)
+        return [self.event(position) for position in range(start, end)]
+
+    def is_open(self, attachment: int, timestamp: int) -> bool:
+        return self.starts[attachment] <= timestamp < self.ends[attachment]
+
+    def children_at(self, parent_index: int, timestamp: int) -> list[int]:
+        """Returns the indexes of the parent's children at `timestamp`,
+        in sibling order."""
+        attachments = self.__parent_attachments.get(parent_index, [])
+        started = bisect_right(attachments, timestamp,
+                               key=self.starts.__getitem__)
+        open_attachments = [
+            a for a in attachments[:started] if self.ends[a] > timestamp]
+        open_attachments.sort(key=self.ranks.__getitem__)
+        return [self.children[a] for a in open_attachments]
+
+    def parent_at(self, node_index: int, timestamp: int) -> int | None:
+        """Returns the index of the node's parent at `timestamp`, or None
+        if the node wasn't attached at that time."""
+        attachments = self.__child_attachments.get(node_index, [])
+        started = bisect_right(attachments, timestamp,
+                               key=self.starts.__getitem__)
+        if started == 0:
+            return None
+        # A node has at most one open attachment, and it's the latest one
+        # to start.
+        latest = attachments[started - 1]
+        if self.ends[latest] <= timestamp:
+            return None
+        return self.parents[latest]
+
+    def tree_at(self, root_index: int, timestamp: int) -> list[int]:
+        """Returns the indexes of the root and every node below it at
+        `timestamp`, in document order."""
+        return _document_order(
+            root_index, lambda i: self.children_at(i, timestamp))
+
+    def domroot_at(self, frame_id: FrameId, timestamp: int) -> int | None:
+        """Returns the index of the frame's DOM root at `timestamp` (the
+        last one created at or before it), or None if the frame had no
+        document yet."""
+        store = self.pg.store
+        domroot_index = None
+        for node_index in self.pg.frame_index().domroots(frame_id):
+            if store.node_timestamps[node_index] > timestamp:
+                break
+            domroot_index = node_index
+        return domroot_index
+
+    def cursor(self, timestamp: int) -> "DOMCursor":
+        """Returns a cursor over the DOM at `timestamp`."""
+        cursor = DOMCursor(self)
+        cursor.seek(timestamp)
+        return cursor
+
+
+class DOMCursor:
+    """The DOM at one point in time. Moving the cursor forward applies the
+    insertions and removals since its current timestamp; moving it
+    backward rebuilds it from the attachments open at the new time."""
+
+    history: DOMHistory
+    timestamp: int
+
+    # The number of events applied, the open attachments of each parent,
+    # and the open attachment of each attached node.
+    __position: int
+    __open_attachments: dict[int, set[int]]
+    __child_attachments: dict[int, int]
+
+    def __init__(self, history: DOMHistory):
+        self.history = history
+        self.timestamp = MISSING
+        self.__position = 0
+        self.__open_attachments = {}
+        self.__child_attachments = {}
+
+    def seek(self, timestamp: int) -> list[DOMEvent]:
+        """Moves the cursor to `timestamp`. Returns the insertions and
+        removals applied, if the cursor moved forward."""
+        if timestamp < self.timestamp:
+            self.__rebuild(timestamp)
+            return []
+        events = []
+        end = bisect_right(self.history.event_timestamps, timestamp)
+        while self.__position < end:
+            events.append(self.__apply_next())
+        self.timestamp = timestamp
+        return events
+
+    def step(self) -> DOMEvent | None:
+        """Applies the next insertion or removal, and moves the cursor to
+        its timestamp, or returns None if there are none left."""
+        if self.__position == self.history.num_events():
+            return None
+        event = self.__apply_next()
+        self.timestamp = event.timestamp
+        return event
+
+    def __apply_next(self) -> DOMEvent:
+        history = self.history
+        position = self.__position
+        closes = history.event_closes[position]
+        if closes != -1:
+            self.__open_attachments[history.parents[closes]].discard(closes)
+            del self.__child_attachments[history.children[closes]]
+        opens = history.event_opens[position]
+        if opens != -1:
+            self.__open(opens)
+        self.__position += 1
+        return history.event(position)
+
+    def __rebuild(self, timestamp: int) -> None:
+        history = self.history
+        self.__position = bisect_right(history.event_timestamps, timestamp)
+        self.__open_attachments = {}
+        self.__child_attachments = {}
+        started = bisect_right(history.starts, timestamp)
+        for attachment in range(started):
+            if history.ends[attachment] > timestamp:
+                self.__open(attachment)
+        self.timestamp = timestamp
+
+    def __open(self, attachment: int) -> None:
+        history = self.history
+        self.__open_attachments.setdefault(
+            history.parents[attachment], set()).add(attachment)
+        self.__child_attachments[history.children[attachment]] = attachment
+
+    def children(self, parent_index: int) -> list[int]:
+        attachments = sorted(self.__open_attachments.get(parent_index, ()),
+                             key=self.history.ranks.__getitem__)
+        return [self.history.children[a] for a in attachments]
+
+    def parent(self, node_index: int) -> int | None:
+        attachment = self.__child_attachments.get(node_index)
+        if attachment is None:
+            return None
+        return self.history.parents[attachment]
+
+    def tree(self, root_index: int) -> list[int]:
+        return _document_order(root_index, self.children)
+
+
+def _document_order(root_index: int,
+                    children: Callable[[int], list[int]]) -> list[int]:
+    node_indexes = []
+    seen = set()
+    pending = [root_index]
+    while pending:
+        node_index = pending.pop()
+        if node_index in seen:
+            continue
+        seen.add(node_index)
+        node_indexes.append(node_index)
+        pending += reversed(children(node_index))
+    return node_indexes
@@ -0,0 +1,158 @@
+"""Attributes nodes to the DOM root (i.e., the document) they belong to.
+
+A node belongs to one of the documents built by the parser at the top of
+its chain of creators (following execute edges for scripts, and create
+edges for other nodes): the DOM root the parser created most recently
+before the node. HTML elements are first attributed by following the
+elements they were inserted below, up to a DOM root, since they can be
+created by scripts in other frames.
+
+Each node's creator parser, and each element's DOM root by insertion, is
+found at most once, and remembered for every node on the chain that led
+to it, so attributing every node in the graph takes a single pass over
+the graph's creation and insertion edges."""
+from array import array
+from bisect import bisect_left
+from typing import Callable, cast, TYPE_CHECKING
+
+from pagegraph.graph.edge import Edge, NodeInsertEdge
+from pagegraph.graph.node import Node
+
+if TYPE_CHECKING:
+    from pagegraph.graph import PageGraph
+
+
+# Values used in the arrays of results, for nodes not yet resolved, and
+# for nodes on the chain currently being resolved.
+UNKNOWN = -2
+VISITING = -3
+
+# Given a node index, returns either the result for the node, or None and
+# the next node in the chain.
+Step = Callable[[int], tuple[int | None, int]]
+
+
+def _resolve(start: int, results: "array[int]", step: Step) -> int:
+    path: list[int] = []
+    node = start
+    result = -1
+    while node >= 0:
+        known = results[node]
+        if known != UNKNOWN:
+            # A chain that loops back on itself has no result.
+            result = -1 if known == VISITING else known
+            break
+        path.append(node)
+        results[node] = VISITING
+        final, node = step(node)
+        if final is not None:
+            result = final
+            break
+    for visited in path:
+        results[visited] = result
+    return result
+
+
+class DOMRootIndex:
+
+    pg: "PageGraph"
+
+    # For each node, the index of the parser at the top of its chain of
+    # creators, and (for HTML elements) the index of the DOM root found
+    # by following the elements it was inserted below, or -1.
+    __creator_parsers: "array[int]"
+    __inserted_domroots: "array[int]"
+    # For each parser, the ids and indexes of the DOM roots it built,
+    # sorted by id.
+    __parser_domroots: dict[int, tuple[list[int], list[int]]]
+
+    __parser_code: int
+    __script_code: int
+    __html_code: int
+    __domroot_code: int
+
+    def __init__(self, pg: "PageGraph"):
+        self.pg = pg
+        num_nodes = pg.store.num_nodes()
+        self.__creator_parsers = array("i", [UNKNOWN]) * num_nodes
+        self.__inserted_domroots = array("i", [UNKNOWN]) * num_nodes
+        self.__parser_domroots = {}
+        self.__parser_code = self.__type_code(Node.Types.PARSER)
+        self.__script_code = self.__type_code(Node.Types.SCRIPT)
+        self.__html_code = self.__type_code(Node.Types.HTML_NODE)
+        self.__domroot_code = self.__type_code(Node.Types.DOM_ROOT)
+
+    def __type_code(self, node_type: Node.Types) -> int:
+        try:
+            return self.pg.store.node_type_names.index(node_type)
+        except ValueError:
+            return -1
+
+    def domroot_index(self, node_index: int) -> int | None:
+        """Returns the index of the DOM root the node belongs to, or None
+        if the node can't be attributed to a DOM root."""
+        node_type = self.pg.store.node_types[node_index]
+        if node_type == self.__domroot_code:
+            return node_index
+        if node_type == self.__html_code:
+            domroot_index = _resolve(node_index, self.__inserted_domroots,
+                                     self.__insertion_step)
+            if domroot_index >= 0:
+                return domroot_index
+        parser_index = _resolve(node_index, self.__creator_parsers,
+                                self.__creator_step)
+        if parser_index < 0:
+            return None
+        return self.__youngest_domroot_before(parser_index, node_index)
+
+    def __creator_step(self, node_index: int) -> tuple[int | None, int]:
+        store = self.pg.store
+        node_type = store.node_types[node_index]
+        if node_type == self.__parser_code:
+            return node_index, -1
+        if node_type == self.__script_code:
+            edge_index = store.execute_edge(node_index)
+        else:
+            edge_index = store.create_edge(node_index)
+        if edge_index is None:
+            return -1, -1
+        return None, store.edge_source(edge_index)
+
+    def __insertion_step(self, node_index: int) -> tuple[int | None, int]:
+        store = self.pg.store
+        node_type = store.node_types[node_index]
+        if node_type == self.__domroot_code:
+            return node_index, -1
+        if node_type != self.__html_code:
+            return -1, -1
+        edge_index = store.insert_edge(node_index)
+        if edge_index is None:
+            return -1, -1
+        insert_edge = cast(NodeInsertEdge, self.pg.edge_at(edge_index))
+        return None, insert_edge.inserted_below_node().index()
+
+    def __youngest_domroot_before(self, parser_index: int,
+                                  node_index: int) -> int | None:
+        # Any document created after the node (i.e., with a higher id)
+        # can't contain the node.
+        if parser_index not in self.__parser_domroots:
+            self.__parser_domroots[parser_index] = self.__domroots_for(
+                parser_index)
+        domroot_ids, domroot_indexes = self.__parser_domroots[parser_index]
+        node_id = self.pg.store.node_ids[node_index]
+        position = bisect_left(domroot_ids, node_id)
+        if position == 0:
+            return None
+        return domroot_indexes[position - 1]
+
+    def __domroots_for(self,
+                       parser_index: int) -> tuple[list[int], list[int]]:
+        store = self.pg.store
+        domroot_indexes = set()
+        for edge_index in store.outgoing_edges_of_type(
+                parser_index, Edge.Types.NODE_CREATE, Edge.Types.STRUCTURE):
+            child_index = store.edge_target(edge_index)
+            if store.node_types[child_index] == self.__domroot_code:
+                domroot_indexes.add(child_index)
+        ordered = sorted(domroot_indexes, key=store.node_ids.__getitem__)
+        return [store.node_ids[i] for i in ordered], ordered
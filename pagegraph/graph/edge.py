@@ -4,6 +4,7 @@ from json import loads, JSONDecodeError
 from typing import Any, cast, Dict, List, TypeVar, Type, TYPE_CHECKING, Union
 
 from pagegraph.graph.element import PageGraphElement
+from pagegraph.graph.reports import element_report
 from pagegraph.types import PageGraphNodeId, PageGraphEdgeId, Url
 from pagegraph.types import BlinkId, PageGraphEdgeKey, RequesterNode
 from pagegraph.types import ChildNode, ParentNode, FrameId, RequestId
@@ -21,51 +22,45 @@ class Edge(PageGraphElement):
 
     # Used as class properties
     #
-    # Note that these are defined as lists of type str, but what they
+    # Note that these are defined as sets of type str, but what they
     # really are is the str values for the Node.Types StrEnum. THis
     # is necessary to prevent the dependency loop.
     # That these are valid node type enum strs is checked at runtime
     # if in debug mode.
-    incoming_node_type_names: Union[List[str], None] = None  # Node.Types
-    outgoing_node_type_names: Union[List[str], None] = None  # Node.Types
+    incoming_node_type_names: Union[frozenset[str], None] = None
+    outgoing_node_type_names: Union[frozenset[str], None] = None
 
-    # The below are automatically generated from the above,
-    # but at runtime to again prevent the dependency loop.
-    incoming_node_types: Union[List["Node.Types"], None] = None
-    outgoing_node_types: Union[List["Node.Types"], None] = None
+    # The below are automatically generated from the above (once per
+    # class), but at runtime to again prevent the dependency loop.
+    incoming_node_types: Union[frozenset["Node.Types"], None] = None
+    outgoing_node_types: Union[frozenset["Node.Types"], None] = None
+
+    __slots__ = ()
 
     @classmethod
-    def __make_incoming_node_types(cls) -> Union[List["Node.Types"], None]:
+    def __make_incoming_node_types(
+            cls) -> Union[frozenset["Node.Types"], None]:
         if cls.incoming_node_type_names is None:
             return None
 
-        if cls.incoming_node_types:
-            return cls.incoming_node_types
-
-        from pagegraph.graph.node import Node
-        cls.incoming_node_types = []
-        for node_type_name in cls.incoming_node_type_names:
-            cls.incoming_node_types.append(Node.Types(node_type_name))
+        if "incoming_node_types" not in cls.__dict__:
+            from pagegraph.graph.node import Node
+            cls.incoming_node_types = frozenset(
+                Node.Types(name) for name in cls.incoming_node_type_names)
         return cls.incoming_node_types
 
     @classmethod
-    def __make_outgoing_node_types(cls) -> Union[List["Node.Types"], None]:
+    def __make_outgoing_node_types(
+            cls) -> Union[frozenset["Node.Types"], None]:
         if cls.outgoing_node_type_names is None:
             return None
 
-        if cls.outgoing_node_types:
-            return cls.outgoing_node_types
-
-        from pagegraph.graph.node import Node
-        cls.outgoing_node_types = []
-        for node_type_name in cls.outgoing_node_type_names:
-            cls.outgoing_node_types.append(Node.Types(node_type_name))
+        if "outgoing_node_types" not in cls.__dict__:
+            from pagegraph.graph.node import Node
+            cls.outgoing_node_types = frozenset(
+                Node.Types(name) for name in cls.outgoing_node_type_names)
         return cls.outgoing_node_types
 
-    # Used as instance properties
-    incoming_node_id: PageGraphNodeId
-    outgoing_node_id: PageGraphNodeId
-
     class Types(StrEnum):
         ATTRIBUTE_DELETE = "delete attribute"
         ATTRIBUTE_SET = "set attribute"
@@ -107,59 +102,32 @@ class Edge(PageGraphElement):
         TYPE = "edge type"
         VALUE = "value"
 
-    def __init__(self, graph: "PageGraph", id: PageGraphEdgeId,
-                 parent_id: PageGraphNodeId, child_id: PageGraphNodeId):
-        self.incoming_node_id = parent_id
-        self.outgoing_node_id = child_id
-        super().__init__(graph, id)
+    def id(self) -> PageGraphEdgeId:
+        return self.pg.store.edge_id(self._index)
+
+    def int_id(self) -> int:
+        return self.pg.store.edge_ids[self._index]
 
     def to_edge_report(
             self, depth: int = 0,
             seen: None | set[Union["Node", "Edge"]] = None) -> EdgeReport:
-        if seen is None:
-            seen = set([self])
-
-        incoming_node = self.incoming_node()
-        incoming_node_report: None | NodeReport | BriefNodeReport | str = None
-        if incoming_node:
-            if incoming_node in seen:
-                incoming_node_report = f"(recursion {incoming_node.id()})"
-            elif depth > 0:
-                incoming_node_report = incoming_node.to_node_report(depth - 1)
-            else:
-                incoming_node_report = incoming_node.to_brief_report()
-
-        outgoing_node = self.outgoing_node()
-        outgoing_node_report: None | NodeReport | BriefNodeReport | str = None
-        if outgoing_node:
-            if outgoing_node in seen:
-                outgoing_node_report = f"(recursion {outgoing_node.id()})"
-            if depth > 0:
-                outgoing_node_report = outgoing_node.to_node_report(depth - 1)
-            else:
-                outgoing_node_report = outgoing_node.to_brief_report()
-
-        return EdgeReport(
-            self.id(), self.edge_type(), self.summary_fields(),
-            incoming_node_report,
-            outgoing_node_report)
+        return cast(EdgeReport, element_report(self, False, depth, seen))
 
     def to_brief_report(self) -> BriefEdgeReport:
         return BriefEdgeReport(self.id(), self.edge_type(),
                                self.summary_fields())
 
     def incoming_node(self) -> "Node":
-        return self.pg.node(self.incoming_node_id)
+        return self.pg.node_at(self.pg.store.edge_source(self._index))
 
     def outgoing_node(self) -> "Node":
-        return self.pg.node(self.outgoing_node_id)
+        return self.pg.node_at(self.pg.store.edge_target(self._index))
 
     def edge_type(self) -> "Edge.Types":
-        type_name = self.data()[self.RawAttrs.TYPE.value]
-        return self.Types(type_name)
+        return self.pg.edge_type_at(self._index)
 
     def is_type(self, edge_type: Types) -> bool:
-        return self.data()[self.RawAttrs.TYPE.value] == edge_type.value
+        return self.edge_type() is edge_type
 
     def is_insert_edge(self) -> bool:
         return False
@@ -195,13 +163,23 @@ class Edge(PageGraphElement):
         return False
 
     def data(self) -> dict[str, str]:
-        return cast(dict[str, str], self.pg.graph.edges[self.key()])
+        if self._data is None:
+            self._data = self.pg.store.edge_attrs(self._index)
+        return cast(dict[str, str], self._data)
+
+    def payload(self, name: str) -> Any | None:
+        return self.pg.store.edge_payload(self._index, name)
 
     def timestamp(self) -> int:
-        return int(self.data()[self.RawAttrs.TIMESTAMP])
+        timestamp = self.pg.store.edge_timestamp(self._index)
+        if timestamp is None:
+            raise KeyError(self.RawAttrs.TIMESTAMP.value)
+        return timestamp
 
     def key(self) -> PageGraphEdgeKey:
-        return self.incoming_node_id, self.outgoing_node_id, self._id
+        store = self.pg.store
+        return (store.node_id(store.edge_source(self._index)),
+                store.node_id(store.edge_target(self._index)), self.id())
 
     def describe(self) -> str:
         incoming_node = self.incoming_node()
@@ -212,7 +190,8 @@ class Edge(PageGraphElement):
             f"- incoming: {incoming_node.node_type()}, {incoming_node.id()}\n"
             f"- outgoing: {outgoing_node.node_type()}, {outgoing_node.id()}\n"
         )
-        for attr_name, attr_value in self.data().items():
+        all_attrs = self.pg.store.edge_attrs(self._index, True)
+        for attr_name, attr_value in all_attrs.items():
             output += f"- {attr_name}={str(attr_value).replace("\n", "\\n")}\n"
         return output
 
@@ -235,46 +214,55 @@ class Edge(PageGraphElement):
 
 class FrameIdAttributedEdge(Edge):
 
+    __slots__ = ()
+
     def frame_id(self) -> FrameId:
-        if self.RawAttrs.FRAME_ID.value not in self.data():
+        frame_id = self.pg.store.edge_frame_id(self._index)
+        if frame_id is None:
             self.throw("")
-        return self.data()[self.RawAttrs.FRAME_ID.value]
+        return cast(FrameId, frame_id)
 
 
 class AttributeDeleteEdge(FrameIdAttributedEdge):
 
-    incoming_node_type_names = [
+    __slots__ = ()
+
+    incoming_node_type_names = frozenset([
         "script",  # Node.Types.SCRIPT
         "parser",  # TEMP
-    ]
+    ])
 
-    outgoing_node_type_names = [
+    outgoing_node_type_names = frozenset([
         "HTML element",  # Node.Types.HTML_NODE
-    ]
+    ])
 
 
 class AttributeSetEdge(FrameIdAttributedEdge):
 
-    incoming_node_type_names = [
+    __slots__ = ()
+
+    incoming_node_type_names = frozenset([
         "parser",  # Node.Types.PARSER
         "script",  # Node.Types.SCRIPT
-    ]
+    ])
 
-    outgoing_node_type_names = [
+    outgoing_node_type_names = frozenset([
         "frame owner",  # Node.Types.FRAME_OWNER
         "HTML element",  # Node.Types.HTML_NODE
-    ]
+    ])
 
 
 class CrossDOMEdge(Edge):
 
-    incoming_node_type_names = [
+    __slots__ = ()
+
+    incoming_node_type_names = frozenset([
         "frame owner",  # Node.Types.FRAME_OWNER
-    ]
+    ])
 
-    outgoing_node_type_names = [
+    outgoing_node_type_names = frozenset([
         "parser",  # Node.Types.PARSER
-    ]
+    ])
 
     def is_cross_dom_edge(self) -> bool:
         return True
@@ -282,16 +270,18 @@ class CrossDOMEdge(Edge):
 
 class ExecuteEdge(Edge):
 
-    incoming_node_type_names = [
+    __slots__ = ()
+
+    incoming_node_type_names = frozenset([
         "HTML element",  # Node.Types.HTML_NODE
         # Encodes JS URLs
         "parser",  # Node.Types.PARSER
         "script",  # Node.Types.SCRIPT
-    ]
+    ])
 
-    outgoing_node_type_names = [
+    outgoing_node_type_names = frozenset([
         "script",  # Node.Types.SCRIPT
-    ]
+    ])
 
     def is_execute_edge(self) -> bool:
         return True
@@ -304,23 +294,27 @@ class ExecuteEdge(Edge):
 
 class ExecuteFromAttributeEdge(ExecuteEdge):
 
-    incoming_node_type_names = [
+    __slots__ = ()
+
+    incoming_node_type_names = frozenset([
         "HTML element",  # Node.Types.HTML_NODE
-    ]
+    ])
 
-    outgoing_node_type_names = [
+    outgoing_node_type_names = frozenset([
         "script",  # Node.Types.SCRIPT
-    ]
+    ])
 
 
 class StructureEdge(Edge):
 
-    incoming_node_type_names = [
+    __slots__ = ()
+
+    incoming_node_type_names = frozenset([
         "DOM root",  # Node.Types.DOM_ROOT
         "frame owner",  # Node.Types.FRAME_OWNER
         "HTML element",  # Node.Types.HTML_NODE
         "parser",  # Node.Types.PARSER
-    ]
+    ])
 
     def is_structure_edge(self) -> bool:
         return True
@@ -332,16 +326,18 @@ class StructureEdge(Edge):
 
 class RequestStartEdge(FrameIdAttributedEdge):
 
-    incoming_node_type_names = [
+    __slots__ = ()
+
+    incoming_node_type_names = frozenset([
         "DOM root",  # Node.Types.DOM_ROOT
         "HTML element",  # Node.Types.HTML_NODE
         "parser",  # Node.Types.PARSER
         "script",  # Node.Types.SCRIPT
-    ]
+    ])
 
-    outgoing_node_type_names = [
+    outgoing_node_type_names = frozenset([
         "resource",  # Node.Types.RESOURCE
-    ]
+    ])
 
     summary_methods = {
         "url": "url",
@@ -385,7 +381,10 @@ class RequestStartEdge(FrameIdAttributedEdge):
         OTHER = "Other"  # Fallback / catchall case
 
     def request_id(self) -> RequestId:
-        return int(self.data()[Edge.RawAttrs.REQUEST_ID.value])
+        request_id = self.pg.store.edge_request_id(self._index)
+        if request_id is None:
+            raise KeyError(Edge.RawAttrs.REQUEST_ID.value)
+        return request_id
 
     def is_request_start_edge(self) -> bool:
         return True
@@ -415,8 +414,13 @@ class RequestStartEdge(FrameIdAttributedEdge):
 
 class RequestResponseEdge(FrameIdAttributedEdge):
 
+    __slots__ = ()
+
     def request_id(self) -> RequestId:
-        return int(self.data()[Edge.RawAttrs.REQUEST_ID.value])
+        request_id = self.pg.store.edge_request_id(self._index)
+        if request_id is None:
+            raise KeyError(Edge.RawAttrs.REQUEST_ID.value)
+        return request_id
 
     def incoming_node(self) -> "ResourceNode":
         node = super().incoming_node()
@@ -433,15 +437,17 @@ class RequestResponseEdge(FrameIdAttributedEdge):
 
 class RequestCompleteEdge(RequestResponseEdge):
 
-    incoming_node_type_names = [
+    __slots__ = ()
+
+    incoming_node_type_names = frozenset([
         "resource",  # Node.Types.RESOURCE
-    ]
+    ])
 
-    outgoing_node_type_names = [
+    outgoing_node_type_names = frozenset([
         "HTML element",  # Node.Types.HTML_NODE
         "parser",  # Node.Types.PARSER
         "script",  # Node.Types.SCRIPT
-    ]
+    ])
 
     summary_methods = {
         "size": "size",
@@ -459,10 +465,8 @@ class RequestCompleteEdge(RequestResponseEdge):
         return cast(RequesterNode, node)
 
     def headers(self) -> str | None:
-        try:
-            return self.data()[self.RawAttrs.HEADERS.value]
-        except KeyError:
-            return None
+        headers = self.payload(self.RawAttrs.HEADERS.value)
+        return None if headers is None else str(headers)
 
     def size(self) -> int:
         return int(self.data()[self.RawAttrs.SIZE.value])
@@ -473,15 +477,17 @@ class RequestCompleteEdge(RequestResponseEdge):
 
 class RequestErrorEdge(RequestResponseEdge):
 
-    incoming_node_type_names = [
+    __slots__ = ()
+
+    incoming_node_type_names = frozenset([
         "resource",  # Node.Types.RESOURCE
-    ]
+    ])
 
-    outgoing_node_type_names = [
+    outgoing_node_type_names = frozenset([
         "HTML element",  # Node.Types.HTML_NODE
         "parser",  # Node.Types.PARSER
         "script",  # Node.Types.SCRIPT
-    ]
+    ])
 
     def is_request_error_edge(self) -> bool:
         return True
@@ -494,21 +500,21 @@ class RequestErrorEdge(RequestResponseEdge):
         return cast(RequesterNode, node)
 
     def headers(self) -> str | None:
-        try:
-            return self.data()[self.RawAttrs.HEADERS.value]
-        except KeyError:
-            return None
+        headers = self.payload(self.RawAttrs.HEADERS.value)
+        return None if headers is None else str(headers)
 
 
 class RequestRedirectEdge(RequestResponseEdge):
 
-    incoming_node_type_names = [
+    __slots__ = ()
+
+    incoming_node_type_names = frozenset([
         "resource",  # Node.Types.RESOURCE
-    ]
+    ])
 
-    outgoing_node_type_names = [
+    outgoing_node_type_names = frozenset([
         "resource",  # Node.Types.RESOURCE
-    ]
+    ])
 
     def outgoing_node(self) -> "ResourceNode":
         node = super().outgoing_node()
@@ -526,17 +532,19 @@ class RequestRedirectEdge(RequestResponseEdge):
 
 class NodeCreateEdge(FrameIdAttributedEdge):
 
-    incoming_node_type_names = [
+    __slots__ = ()
+
+    incoming_node_type_names = frozenset([
         "parser",  # Node.Types.PARSER
         "script",  # Node.Types.SCRIPT
-    ]
+    ])
 
-    outgoing_node_type_names = [
+    outgoing_node_type_names = frozenset([
         "DOM root",  # Node.Types.DOM_ROOT
         "frame owner",  # Node.Types.FRAME_OWNER
         "HTML element",  # Node.Types.HTML_NODE
         "text node",  # Node.Types.TEXT_NODE
-    ]
+    ])
 
     def is_create_edge(self) -> bool:
         return True
@@ -544,17 +552,19 @@ class NodeCreateEdge(FrameIdAttributedEdge):
 
 class NodeInsertEdge(FrameIdAttributedEdge):
 
-    incoming_node_type_names = [
+    __slots__ = ()
+
+    incoming_node_type_names = frozenset([
         "parser",  # Node.Types.PARSER
         "script",  # Node.Types.SCRIPT
-    ]
+    ])
 
-    outgoing_node_type_names = [
+    outgoing_node_type_names = frozenset([
         "DOM root",  # Node.Types.DOM_ROOT
         "frame owner",  # Node.Types.FRAME_OWNER
         "HTML element",  # Node.Types.HTML_NODE
         "text node",  # Node.Types.TEXT_NODE
-    ]
+    ])
 
     def is_insert_edge(self) -> bool:
         return True
@@ -590,59 +600,65 @@ class NodeInsertEdge(FrameIdAttributedEdge):
 
 
 class NodeRemoveEdge(FrameIdAttributedEdge):
-    incoming_node_type_names = [
+    __slots__ = ()
+
+    incoming_node_type_names = frozenset([
         "script",  # Node.Types.SCRIPT
         "parser",  # TEMP
-    ]
+    ])
 
-    outgoing_node_type_names = [
+    outgoing_node_type_names = frozenset([
         "DOM root",  # Node.Types.DOM_ROOT
         "frame owner",  # Node.Types.FRAME_OWNER
         "HTML element",  # Node.Types.HTML_NODE
         "text node",  # Node.Types.TEXT_NODE
-    ]
+    ])
 
 
 class EventListenerEdge(Edge):
-    pass
+    __slots__ = ()
 
 
 class EventListenerAddEdge(FrameIdAttributedEdge):
-    pass
+    __slots__ = ()
 
 
 class EventListenerRemoveEdge(FrameIdAttributedEdge):
-    pass
+    __slots__ = ()
 
 
 class StorageBucketEdge(Edge):
-    pass
+    __slots__ = ()
 
 
 class StorageReadCallEdge(FrameIdAttributedEdge):
-    pass
+    __slots__ = ()
 
 
 class StorageReadResultEdge(FrameIdAttributedEdge):
-    pass
+    __slots__ = ()
 
 
 class StorageSetEdge(FrameIdAttributedEdge):
-    pass
+    __slots__ = ()
 
 
 class StorageClearEdge(FrameIdAttributedEdge):
-    pass
+    __slots__ = ()
 
 
 class StorageDeleteEdge(FrameIdAttributedEdge):
-    pass
+    __slots__ = ()
 
 
 class JSCallEdge(FrameIdAttributedEdge):
 
+    __slots__ = ()
+
     def args(self) -> Any:
-        args_raw = self.data()[Edge.RawAttrs.ARGS.value]
+        args_raw = self.payload(Edge.RawAttrs.ARGS.value)
+        if args_raw is None:
+            raise KeyError(Edge.RawAttrs.ARGS.value)
         return_result = None
         try:
             return_result = loads(args_raw)
@@ -670,8 +686,12 @@ class JSCallEdge(FrameIdAttributedEdge):
 
 class JSResultEdge(FrameIdAttributedEdge):
 
+    __slots__ = ()
+
     def value(self) -> Any:
-        value_raw = self.data()[Edge.RawAttrs.VALUE.value]
+        value_raw = self.payload(Edge.RawAttrs.VALUE.value)
+        if value_raw is None:
+            raise KeyError(Edge.RawAttrs.VALUE.value)
         try:
             return loads(value_raw)
         except JSONDecodeError:
@@ -696,7 +716,7 @@ class JSResultEdge(FrameIdAttributedEdge):
 
 
 class DeprecatedEdge(Edge):
-    pass
+    __slots__ = ()
 
 
 TYPE_MAPPING: Dict[Edge.Types, Type[Edge]] = dict([
@@ -730,9 +750,9 @@ TYPE_MAPPING: Dict[Edge.Types, Type[Edge]] = dict([
 
 
 def for_type(edge_type: Edge.Types, graph: "PageGraph",
-             edge_id: PageGraphEdgeId, parent_id: PageGraphNodeId,
-             child_id: PageGraphNodeId) -> Edge:
+             edge_index: int) -> Edge:
     try:
-        return TYPE_MAPPING[edge_type](graph, edge_id, parent_id, child_id)
+        edge_class = TYPE_MAPPING[edge_type]
     except KeyError:
         raise ValueError(f"Unexpected edge type='{edge_type.value}'")
+    return edge_class(graph, edge_index)
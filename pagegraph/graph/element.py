@@ -13,18 +13,28 @@ class PageGraphElement:
     summary_methods: Union[dict[str, str], None] = None
 
     # Instance properties
+    #
+    # Elements are views over the graph's store, and hold nothing but
+    # their position in the store (and, once read, their attributes).
     pg: "PageGraph"
-    _id: PageGraphId
+    _index: int
+    _data: dict[str, Any] | None
 
-    def __init__(self, graph: "PageGraph", pg_id: PageGraphId):
+    __slots__ = ("pg", "_index", "_data")
+
+    def __init__(self, graph: "PageGraph", index: int):
         self.pg = graph
-        self._id = pg_id
+        self._index = index
+        self._data = None
 
     def int_id(self) -> int:
-        return int(self._id[1:])
+        raise NotImplementedError("Child class must implement 'int_id'")
 
     def id(self) -> PageGraphId:
-        return self._id
+        raise NotImplementedError("Child class must implement 'id'")
+
+    def index(self) -> int:
+        return self._index
 
     def summary_fields(self) -> Union[None, dict[str, str]]:
         if self.__class__.summary_methods is None:
@@ -39,8 +49,16 @@ class PageGraphElement:
         raise NotImplementedError()
 
     def data(self) -> dict[str, Any]:
+        """Returns the element's attributes, other than large values
+        like script source (see `payload`)."""
         raise NotImplementedError("Child class must implement 'data'")
 
+    def payload(self, name: str) -> Any | None:
+        """Returns the value of a large attribute (e.g., script source),
+        or None if the element doesn't have the attribute. These values
+        are read from the recording each time they're requested."""
+        raise NotImplementedError("Child class must implement 'payload'")
+
     def timestamp(self) -> int:
         raise NotImplementedError("Child class must implement 'timestamp'")
 
@@ -0,0 +1,173 @@
+"""Indexes the graph by frame, so that frame-scoped queries (e.g., "which
+requests did this frame make") don't need to scan the whole graph.
+
+Frames are identified by their frame id: the "frame id" attribute of
+the frame's DOM roots, which is also what request start and JS call
+edges name the frame they happened in by. (Recordings normally give a
+DOM root the same frame id as its blink id, but only the frame id is
+read here.) A frame can have more than one DOM root over the page's
+lifetime (e.g., if the frame is navigated), and so the index records
+every version of the frame's document, ordered by when it was created.
+
+The index over DOM roots, frame owners, requests and JS calls is built
+in a single pass over the store's columns, the first time any frame is
+queried. Frame summaries (the nodes created, attached and executed in a
+frame) are built the first time each is requested, with an explicit
+stack (so that deep documents don't hit Python's recursion limit), and
+shared between DOM roots built by the same parser."""
+from typing import cast, TYPE_CHECKING
+
+from pagegraph.graph.edge import Edge
+from pagegraph.graph.node import Node, DOMRootNode, FrameOwnerNode, HTMLNode
+from pagegraph.graph.node import ParserNode, ScriptNode, TextNode
+from pagegraph.types import FrameId, FrameSummary, ParentNode
+
+if TYPE_CHECKING:
+    from pagegraph.graph import PageGraph
+
+
+class FrameIndex:
+
+    pg: "PageGraph"
+
+    # For each frame id, the indexes of the frame's DOM roots, ordered by
+    # timestamp, and of the frame owner nodes created or inserted by the
+    # frame.
+    __domroots: dict[FrameId, list[int]]
+    __frame_owners: dict[FrameId, list[int]]
+    # For each frame id, the indexes of the request start and JS call
+    # edges attributed to the frame.
+    __request_starts: dict[FrameId, list[int]]
+    __js_calls: dict[FrameId, list[int]]
+    # Frame summaries, by the index of the parser that built the frame.
+    __summaries: dict[int, FrameSummary]
+
+    def __init__(self, pg: "PageGraph"):
+        self.pg = pg
+        self.__summaries = {}
+        store = pg.store
+
+        self.__domroots = {}
+        for node_index in store.nodes_of_type(Node.Types.DOM_ROOT.value):
+            frame_id = store.node_frame_id(node_index)
+            if frame_id is not None:
+                self.__domroots.setdefault(frame_id, []).append(node_index)
+        for domroot_indexes in self.__domroots.values():
+            domroot_indexes.sort(key=lambda i: store.node_timestamp(i) or 0)
+
+        self.__frame_owners = {}
+        for node_index in store.nodes_of_type(Node.Types.FRAME_OWNER.value):
+            frame_ids = []
+            for edge_index in (store.create_edge(node_index),
+                               store.insert_edge(node_index)):
+                if edge_index is None:
+                    continue
+                frame_id = store.edge_frame_id(edge_index)
+                if frame_id is not None and frame_id not in frame_ids:
+                    frame_ids.append(frame_id)
+            for frame_id in frame_ids:
+                self.__frame_owners.setdefault(frame_id, []).append(
+                    node_index)
+
+        self.__request_starts = self.__edges_by_frame(
+            Edge.Types.REQUEST_START)
+        self.__js_calls = self.__edges_by_frame(Edge.Types.JS_CALL)
+
+    def __edges_by_frame(
+            self, edge_type: Edge.Types) -> dict[FrameId, list[int]]:
+        store = self.pg.store
+        edges_by_frame: dict[FrameId, list[int]] = {}
+        for edge_index in store.edges_of_type(edge_type.value):
+            frame_id = store.edge_frame_id(edge_index)
+            if frame_id is not None:
+                edges_by_frame.setdefault(frame_id, []).append(edge_index)
+        return edges_by_frame
+
+    def frame_ids(self) -> list[FrameId]:
+        return list(self.__domroots)
+
+    def domroots(self, frame_id: FrameId) -> list[int]:
+        return self.__domroots.get(frame_id, [])
+
+    def latest_domroot(self, frame_id: FrameId) -> int | None:
+        """Returns the index of the frame's most recent DOM root (the
+        first of them, if more than one has the latest timestamp)."""
+        domroot_indexes = self.__domroots.get(frame_id)
+        if not domroot_indexes:
+            return None
+        timestamps = self.pg.store.node_timestamps
+        return max(domroot_indexes, key=timestamps.__getitem__)
+
+    def frame_owners(self, frame_id: FrameId) -> list[int]:
+        return self.__frame_owners.get(frame_id, [])
+
+    def request_starts(self, frame_id: FrameId) -> list[int]:
+        return self.__request_starts.get(frame_id, [])
+
+    def js_calls(self, frame_id: FrameId) -> list[int]:
+        return self.__js_calls.get(frame_id, [])
+
+    def summary(self, domroot: DOMRootNode) -> FrameSummary:
+        parser = domroot.parser()
+        assert parser
+        parser_index = parser.index()
+        if parser_index not in self.__summaries:
+            self.__summaries[parser_index] = self.__summarize(parser)
+        return self.__summaries[parser_index]
+
+    def __summarize(self, parser: ParserNode) -> FrameSummary:
+        # Everything the parser built, attached, created or executed
+        # belongs to the frame, as does everything those nodes in turn
+        # built, attached, created or executed. Each node is expanded at
+        # most once, tracked by node index.
+        frame_summary = FrameSummary()
+        expanded = bytearray(self.pg.store.num_nodes())
+        pending: list[Node] = [parser]
+        while pending:
+            node = pending.pop()
+            if expanded[node.index()]:
+                continue
+            expanded[node.index()] = 1
+
+            if node.is_parent_dom_node_type():
+                parent_node = cast(ParentNode, node)
+                child_dom_nodes = self.pg.child_dom_nodes(parent_node)
+                if child_dom_nodes is not None:
+                    for a_child_node in child_dom_nodes:
+                        if frame_summary.includes_attached(a_child_node):
+                            continue
+
+                        if a_child_node.is_text_elm():
+                            c_text_node = cast(TextNode, a_child_node)
+                            frame_summary.attached_nodes.add(c_text_node)
+                        elif a_child_node.is_frame_owner():
+                            c_frame_node = cast(FrameOwnerNode, a_child_node)
+                            frame_summary.attached_nodes.add(c_frame_node)
+                        elif a_child_node.is_html_elm():
+                            c_html_node = cast(HTMLNode, a_child_node)
+                            frame_summary.attached_nodes.add(c_html_node)
+                            pending.append(c_html_node)
+
+            if node.is_script() or node.is_parser():
+                creating_node: ScriptNode | ParserNode
+                if node.is_script():
+                    creating_node = cast(ScriptNode, node)
+                else:
+                    creating_node = cast(ParserNode, node)
+
+                for a_created_node in creating_node.created_nodes():
+                    if frame_summary.includes_created(a_created_node):
+                        continue
+                    frame_summary.created_nodes.add(a_created_node)
+                    pending.append(a_created_node)
+
+            for executed_node in node.executed_scripts():
+                assert executed_node.is_script()
+
+                if frame_summary.includes_executed(executed_node):
+                    continue
+
+                frame_summary.script_nodes.add(executed_node)
+                pending.append(executed_node)
+
+        return frame_summary
@@ -0,0 +1,208 @@
+"""Incremental reader for GraphML files written by PageGraph.
+
+Rather than building an intermediate networkx graph (and an ElementTree
+element for every node, edge and data value) and then walking that
+structure again, this reader drives expat directly, and hands each node and
+edge record to a `GraphStoreBuilder` as soon as the closing tag is seen.
+Only the attributes of the element currently being read are kept in
+memory.
+
+The PageGraph version recorded in the document's `<desc>` block is
+checked as soon as it is read, so the file is only read once.
+
+Compressed recordings are decompressed as they are read (see
+`pagegraph.compression`). For uncompressed recordings, large attribute
+values (e.g., script source) are not decoded at all; only their location
+in the file is recorded (see `pagegraph.graph.store.SourceSpan`)."""
+from typing import Any, BinaryIO, Callable
+from xml.parsers import expat
+
+from pagegraph.compression import Compression, detect_compression
+from pagegraph.compression import open_recording
+from pagegraph.graph.projection import Projection
+from pagegraph.graph.store import GraphStore, GraphStoreBuilder
+from pagegraph.graph.store import PAYLOAD_ATTRS, SourceSpan
+from pagegraph.types import PageGraphId
+from pagegraph.util import check_pagegraph_version, VersionPolicy
+
+
+# Reading in chunks of this size keeps memory use independent of the size
+# of the GraphML file.
+READ_CHUNK_SIZE = 1 << 20
+
+
+def _to_bool(value: str) -> bool:
+    # Matches how networkx decodes GraphML booleans.
+    return {"true": True, "false": False, "0": False, "1": True}[
+        value.lower()]
+
+
+# Mapping from GraphML `attr.type` values to the functions used to decode
+# values of that type (again, matching networkx's behavior).
+ATTR_TYPES: dict[str, Callable[[str], Any]] = {
+    "boolean": _to_bool,
+    "double": float,
+    "float": float,
+    "int": int,
+    "integer": int,
+    "long": int,
+    "string": str,
+    "yfiles": str,
+}
+
+
+class GraphMLKey:
+
+    name: str
+    decode: Callable[[str], Any]
+
+    def __init__(self, name: str, decode: Callable[[str], Any]):
+        self.name = name
+        self.decode = decode
+
+
+class GraphMLReader:
+    """Reads a GraphML document and adds each node and edge to the given
+    `GraphStoreBuilder`, in document order."""
+
+    builder: GraphStoreBuilder
+    keys: dict[str, GraphMLKey]
+    version_policy: VersionPolicy
+    version: str | None
+    # Whether large values should be recorded as `SourceSpan`s, which is
+    # only possible if the byte offsets seen by the parser are offsets in
+    # the recording file (i.e., the recording isn't compressed).
+    record_spans: bool
+    parser: expat.XMLParserType | None
+
+    # Parser state for the element currently being read.
+    element_id: PageGraphId | None
+    source_id: PageGraphId | None
+    target_id: PageGraphId | None
+    attrs: dict[str, Any]
+    data_key: GraphMLKey | None
+    text: list[str]
+    in_version: bool
+    span_start: int | None
+    span_has_text: bool
+
+    def __init__(self, builder: GraphStoreBuilder,
+                 version_policy: VersionPolicy = VersionPolicy.WARN,
+                 record_spans: bool = False):
+        self.builder = builder
+        self.keys = {}
+        self.version_policy = version_policy
+        self.version = None
+        self.record_spans = record_spans
+        self.parser = None
+        self.span_start = None
+        self.span_has_text = False
+        self.in_version = False
+        self.element_id = None
+        self.source_id = None
+        self.target_id = None
+        self.attrs = {}
+        self.data_key = None
+        self.text = []
+
+    def read(self, handle: BinaryIO) -> None:
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = self.start_element
+        parser.EndElementHandler = self.end_element
+        parser.CharacterDataHandler = self.character_data
+        self.parser = parser
+        while chunk := handle.read(READ_CHUNK_SIZE):
+            parser.Parse(chunk, False)
+        parser.Parse(b"", True)
+        if self.version is None:
+            check_pagegraph_version(None)
+
+    def start_element(self, name: str, xml_attrs: dict[str, str]) -> None:
+        if name == "data":
+            key_id = xml_attrs.get("key")
+            if key_id not in self.keys:
+                raise ValueError(f"Bad GraphML data: no key {key_id}")
+            self.data_key = self.keys[key_id]
+            self.text = []
+            projection = self.builder.projection
+            if projection and not projection.includes_attr(
+                    self.data_key.name):
+                # Skipped attributes aren't buffered or decoded at all.
+                self.data_key = None
+                return
+            if (self.record_spans and self.data_key.decode is str and
+                    self.data_key.name in PAYLOAD_ATTRS):
+                assert self.parser
+                self.span_start = self.parser.CurrentByteIndex
+                self.span_has_text = False
+        elif name == "node":
+            self.element_id = xml_attrs["id"]
+            self.attrs = {}
+        elif name == "edge":
+            self.element_id = xml_attrs["id"]
+            self.source_id = xml_attrs["source"]
+            self.target_id = xml_attrs["target"]
+            self.attrs = {}
+        elif name == "key":
+            key_id = xml_attrs["id"]
+            attr_type = xml_attrs.get("attr.type", "string")
+            try:
+                decode = ATTR_TYPES[attr_type]
+            except KeyError:
+                raise ValueError(f"Unexpected GraphML key type: {attr_type}")
+            self.keys[key_id] = GraphMLKey(xml_attrs["attr.name"], decode)
+        elif name == "version" and self.version is None:
+            self.in_version = True
+            self.text = []
+
+    def end_element(self, name: str) -> None:
+        if name == "data":
+            if self.data_key is None:
+                return
+            # Empty values are skipped, the same as networkx does.
+            if self.span_start is not None:
+                assert self.parser
+                if self.span_has_text:
+                    span_end = self.parser.CurrentByteIndex
+                    self.attrs[self.data_key.name] = SourceSpan(
+                        self.span_start, span_end - self.span_start)
+                self.span_start = None
+            elif self.text:
+                key = self.data_key
+                self.attrs[key.name] = key.decode("".join(self.text))
+            self.data_key = None
+            self.text = []
+        elif name == "node":
+            assert self.element_id
+            self.builder.add_node(self.element_id, self.attrs)
+            self.element_id = None
+        elif name == "edge":
+            assert self.element_id and self.source_id and self.target_id
+            self.builder.add_edge(self.element_id, self.source_id,
+                                  self.target_id, self.attrs)
+            self.element_id = None
+        elif name == "version" and self.in_version:
+            self.in_version = False
+            self.version = "".join(self.text).strip()
+            self.builder.version = self.version
+            self.text = []
+            check_pagegraph_version(self.version, self.version_policy)
+
+    def character_data(self, data: str) -> None:
+        if self.span_start is not None:
+            self.span_has_text = True
+        elif self.data_key is not None or self.in_version:
+            self.text.append(data)
+
+
+def read_graphml(input_path: str,
+                 version_policy: VersionPolicy = VersionPolicy.WARN,
+                 projection: Projection | None = None) -> GraphStore:
+    builder = GraphStoreBuilder(projection)
+    record_spans = detect_compression(input_path) == Compression.NONE
+    if record_spans:
+        builder.source_path = input_path
+    with open_recording(input_path) as handle:
+        GraphMLReader(builder, version_policy, record_spans).read(handle)
+    return builder.build()
@@ -1,7 +1,9 @@
-from dataclasses import dataclass
-from typing import TYPE_CHECKING, Union
+from array import array
+from itertools import chain
+from typing import cast, Iterable, Iterator, TYPE_CHECKING, Union
 
-from pagegraph.types import FrameId
+from pagegraph.graph.edge import Edge
+from pagegraph.types import FrameId, PageGraphNodeId
 from pagegraph.serialize import Reportable, JSInvokeReport
 
 if TYPE_CHECKING:
@@ -44,3 +46,295 @@ class JSCallResult(Reportable):
 
     def is_cross_frame_call(self) -> bool:
         return self.call_context() != self.receiver_context()
+
+
+class JSCallTable:
+    """Every JS call in the graph, paired with its result (if any), and
+    the frames it was made from and into.
+
+    The table is built in one pass over the graph's JS call and result
+    edges, in id (i.e., recording) order. Each result is paired with the
+    most recent call to the same JS structure (i.e., builtin or Web API)
+    before it. Each call is a row, and each row's values are stored in
+    the columns below, at the row's position.
+
+    Rows are also indexed by the JS structure called, and by the frame
+    the call was made from, so that `rows` can select calls without
+    reading the edges of calls that don't match."""
+
+    pg: "PageGraph"
+
+    # The index of each call's call edge, and result edge (or -1).
+    call_edges: "array[int]"
+    result_edges: "array[int]"
+    # The index of the script making each call, and of the JS structure
+    # node being called.
+    callers: "array[int]"
+    callees: "array[int]"
+    # The index of the DOM root of the frame each call was made from
+    # (i.e., the calling script's DOM root), and of the frame the call
+    # was made into (i.e., the most recent DOM root for the call's frame
+    # id), or -1 if the frame couldn't be found.
+    caller_frames: "array[int]"
+    receiver_frames: "array[int]"
+    # Whether the caller and receiver frames differ (1) or not (0), or -1
+    # if either frame couldn't be found.
+    cross_frame: "array[int]"
+
+    # The rows of the calls to each JS structure node, and of the calls
+    # made from each frame (by the index of the frame's DOM root, or -1),
+    # in id order.
+    __callee_rows: dict[int, list[int]]
+    __caller_frame_rows: dict[int, list[int]]
+    # The index of every JS structure node, in the order of
+    # `PageGraph.js_structure_nodes`, and the position of each in it.
+    __callee_order: list[int]
+    __callee_ranks: dict[int, int]
+    # The JS structure nodes with each method name, built when first
+    # needed.
+    __method_callees: dict[str, list[int]] | None
+    # The row of each call edge, built when first needed.
+    __call_edge_rows: dict[int, int] | None
+
+    def __init__(self, pg: "PageGraph"):
+        self.pg = pg
+        self.call_edges = array("i")
+        self.result_edges = array("i")
+        self.callers = array("i")
+        self.callees = array("i")
+        self.caller_frames = array("i")
+        self.receiver_frames = array("i")
+        self.cross_frame = array("b")
+        self.__callee_rows = {}
+        self.__caller_frame_rows = {}
+        self.__method_callees = None
+        self.__call_edge_rows = None
+
+        store = pg.store
+        self.__callee_order = [
+            node.index() for node in pg.js_structure_nodes()]
+        self.__callee_ranks = {
+            node_index: rank
+            for rank, node_index in enumerate(self.__callee_order)}
+        call_edge_indexes = store.edges_of_type(Edge.Types.JS_CALL.value)
+        result_edge_indexes = store.edges_of_type(Edge.Types.JS_RESULT.value)
+        edge_indexes = sorted(chain(call_edge_indexes, result_edge_indexes),
+                              key=store.edge_ids.__getitem__)
+        try:
+            call_type = store.edge_type_names.index(Edge.Types.JS_CALL.value)
+        except ValueError:
+            call_type = -1
+
+        # The row of the most recent call to each JS structure node.
+        last_rows: dict[int, int] = {}
+        caller_frames: dict[int, int] = {}
+        receiver_frames: dict[FrameId | None, int] = {}
+        for edge_index in edge_indexes:
+            if store.edge_types[edge_index] != call_type:
+                self.__add_result(edge_index, last_rows)
+                continue
+
+            caller = store.edge_source(edge_index)
+            callee = store.edge_target(edge_index)
+            row = len(self.call_edges)
+            self.call_edges.append(edge_index)
+            self.result_edges.append(-1)
+            self.callers.append(caller)
+            self.callees.append(callee)
+            last_rows[callee] = row
+            if callee not in self.__callee_rows:
+                self.__callee_rows[callee] = []
+            self.__callee_rows[callee].append(row)
+
+            if caller not in caller_frames:
+                caller_frames[caller] = self.__domroot_of(caller)
+            caller_frame = caller_frames[caller]
+            frame_id = store.edge_frame_id(edge_index)
+            if frame_id not in receiver_frames:
+                receiver_frames[frame_id] = self.__domroot_for(frame_id)
+            receiver_frame = receiver_frames[frame_id]
+            self.caller_frames.append(caller_frame)
+            self.receiver_frames.append(receiver_frame)
+            if caller_frame not in self.__caller_frame_rows:
+                self.__caller_frame_rows[caller_frame] = []
+            self.__caller_frame_rows[caller_frame].append(row)
+            if caller_frame < 0 or receiver_frame < 0:
+                self.cross_frame.append(-1)
+            else:
+                self.cross_frame.append(int(caller_frame != receiver_frame))
+
+    def __add_result(self, edge_index: int, last_rows: dict[int, int]) -> None:
+        callee = self.pg.store.edge_source(edge_index)
+        row = last_rows.get(callee)
+        if row is None:
+            if self.pg.debug:
+                self.pg.node_at(callee).throw(
+                    "Found a result before any call to this builtin, "
+                    f"result={self.pg.store.edge_id(edge_index)}")
+            return
+        if self.pg.debug and self.result_edges[row] != -1:
+            previous_id = self.pg.store.edge_id(self.result_edges[row])
+            result_id = self.pg.store.edge_id(edge_index)
+            self.pg.node_at(callee).throw(
+                "Found two adjacent result edges: "
+                f"{previous_id} and {result_id}")
+        self.result_edges[row] = edge_index
+
+    def __domroot_of(self, node_index: int) -> int:
+        domroot = self.pg.domroot_for_node(node_index)
+        return -1 if domroot is None else domroot.index()
+
+    def __domroot_for(self, frame_id: FrameId | None) -> int:
+        if frame_id is None:
+            return -1
+        domroot_index = self.pg.frame_index().latest_domroot(frame_id)
+        return -1 if domroot_index is None else domroot_index
+
+    def num_calls(self) -> int:
+        return len(self.call_edges)
+
+    def rows_for_callee(self, node_index: int) -> list[int]:
+        """Returns the rows of the calls to the JS structure node at
+        `node_index`, in id order."""
+        return self.__callee_rows.get(node_index, [])
+
+    def callees_for_method(self, method: str) -> list[int]:
+        """Returns the JS structure nodes whose method name includes
+        `method` (e.g., "cookie" matches "Document.cookie"), in the order
+        of `PageGraph.js_structure_nodes`."""
+        if self.__method_callees is None:
+            self.__method_callees = {}
+            for js_node in self.pg.js_structure_nodes():
+                name = js_node.name()
+                if name not in self.__method_callees:
+                    self.__method_callees[name] = []
+                self.__method_callees[name].append(js_node.index())
+        # There are far fewer distinct method names than JS structure
+        # nodes (let alone calls), so matching every name is cheap.
+        callees = []
+        for name, node_indexes in self.__method_callees.items():
+            if method in name:
+                callees += node_indexes
+        return sorted(callees, key=self.__callee_ranks.__getitem__)
+
+    def rows(self, callee_id: PageGraphNodeId | None = None,
+             method: str | None = None,
+             caller_frame_id: PageGraphNodeId | None = None,
+             cross_frame_only: bool = False, since: int | None = None,
+             until: int | None = None) -> Iterator[int]:
+        """Returns the rows of the calls to the JS structure node with id
+        `callee_id`, to methods including `method`, made from the frame
+        whose DOM root has id `caller_frame_id`, between different frames
+        (if `cross_frame_only`), and with timestamps from `since` to
+        `until` (both inclusive). Rows are returned grouped by the JS
+        structure called (in the order of `PageGraph.js_structure_nodes`),
+        and then in id order."""
+        callees: list[int] | None = None
+        if callee_id:
+            callee_index = self.__node_index(callee_id)
+            callees = []
+            if callee_index in self.__callee_ranks:
+                callees = [callee_index]
+        if method:
+            method_callees = self.callees_for_method(method)
+            if callees is None:
+                callees = method_callees
+            else:
+                callees = [i for i in callees if i in set(method_callees)]
+
+        # The rows of the calls in the time range, found using the
+        # graph's temporal index.
+        in_range: set[int] | None = None
+        if since is not None or until is not None:
+            in_range = self.__rows_between(since, until)
+
+        rows: Iterator[int]
+        if caller_frame_id:
+            rows = self.__rows_for_caller_frame(
+                caller_frame_id, callees, in_range)
+        elif callees is None and in_range is not None:
+            rows = self.__ordered(in_range)
+        else:
+            if callees is None:
+                callees = self.__callee_order
+            rows = chain.from_iterable(
+                self.rows_for_callee(i) for i in callees)
+            if in_range is not None:
+                rows = (row for row in rows if row in in_range)
+
+        for row in rows:
+            if cross_frame_only and not self.is_cross_frame_call(row):
+                continue
+            yield row
+
+    def __rows_between(self, since: int | None,
+                       until: int | None) -> set[int]:
+        if self.__call_edge_rows is None:
+            self.__call_edge_rows = {
+                edge_index: row
+                for row, edge_index in enumerate(self.call_edges)}
+        timeline = self.pg.temporal_index().timeline(Edge.Types.JS_CALL)
+        call_edge_rows = self.__call_edge_rows
+        return set(call_edge_rows[edge_index]
+                   for edge_index in timeline.between(since, until))
+
+    def __rows_for_caller_frame(self, caller_frame_id: PageGraphNodeId,
+                                callees: list[int] | None,
+                                in_range: set[int] | None) -> Iterator[int]:
+        frame_index = self.__node_index(caller_frame_id)
+        rows = []
+        if frame_index is not None:
+            rows += self.__caller_frame_rows.get(frame_index, [])
+        unknown_rows = self.__caller_frame_rows.get(-1, [])
+        if callees is not None:
+            callee_set = set(callees)
+            rows = [row for row in rows if self.callees[row] in callee_set]
+            unknown_rows = [row for row in unknown_rows
+                            if self.callees[row] in callee_set]
+        if in_range is not None:
+            rows = [row for row in rows if row in in_range]
+            unknown_rows = [row for row in unknown_rows if row in in_range]
+        # Calls whose frame couldn't be found are checked one by one, so
+        # that the same error is raised as when the frame is asked for.
+        for row in unknown_rows:
+            if self.call_context(row).id() == caller_frame_id:
+                rows.append(row)
+        return self.__ordered(rows)
+
+    def __ordered(self, rows: Iterable[int]) -> Iterator[int]:
+        ranks = self.__callee_ranks
+        return iter(sorted(
+            rows, key=lambda row: (ranks[self.callees[row]], row)))
+
+    def __node_index(self, node_id: PageGraphNodeId) -> int | None:
+        try:
+            return self.pg.store.node_index(node_id)
+        except ValueError:
+            return None
+
+    def call_result(self, row: int) -> JSCallResult:
+        call_edge = cast("JSCallEdge", self.pg.edge_at(self.call_edges[row]))
+        result_edge = None
+        if self.result_edges[row] != -1:
+            result_edge = cast(
+                "JSResultEdge", self.pg.edge_at(self.result_edges[row]))
+        return JSCallResult(call_edge, result_edge)
+
+    # The below return the same values as the `JSCallResult` methods of
+    # the same name. When a frame couldn't be found, the `JSCallResult`
+    # method is used, so that the same error is raised.
+    def call_context(self, row: int) -> "DOMRootNode":
+        if self.caller_frames[row] < 0:
+            return self.call_result(row).call_context()
+        return cast("DOMRootNode", self.pg.node_at(self.caller_frames[row]))
+
+    def receiver_context(self, row: int) -> "DOMRootNode":
+        if self.receiver_frames[row] < 0:
+            return self.call_result(row).receiver_context()
+        return cast("DOMRootNode",
+                    self.pg.node_at(self.receiver_frames[row]))
+
+    def is_cross_frame_call(self, row: int) -> bool:
+        if self.cross_frame[row] < 0:
+            return self.call_result(row).is_cross_frame_call()
+        return self.cross_frame[row] == 1
@@ -1,18 +1,15 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-from base64 import b64encode
 from dataclasses import dataclass
 from enum import StrEnum
-from functools import lru_cache
-import hashlib
-from itertools import chain
 import sys
 from typing import Any, cast, Type, TYPE_CHECKING, Union
 
 from pagegraph.graph.element import PageGraphElement
 from pagegraph.graph.edge import Edge
 from pagegraph.graph.js import JSCallResult
+from pagegraph.graph.reports import element_report
 from pagegraph.graph.requests import RequestResponse, RequestChain
 from pagegraph.types import BlinkId, EdgeIterator, ChildNode
 from pagegraph.types import PageGraphId, PageGraphNodeId, PageGraphEdgeId
@@ -39,10 +36,12 @@ if TYPE_CHECKING:
 class Node(PageGraphElement):
 
     # Used as class properties
-    incoming_node_types: Union[list["Node.Types"], None] = None
-    outgoing_node_types: Union[list["Node.Types"], None] = None
-    incoming_edge_types: Union[list["Edge.Types"], None] = None
-    outgoing_edge_types: Union[list["Edge.Types"], None] = None
+    incoming_node_types: Union[frozenset["Node.Types"], None] = None
+    outgoing_node_types: Union[frozenset["Node.Types"], None] = None
+    incoming_edge_types: Union[frozenset["Edge.Types"], None] = None
+    outgoing_edge_types: Union[frozenset["Edge.Types"], None] = None
+
+    __slots__ = ()
 
     class Types(StrEnum):
         ADS_SHIELDS = "shieldsAds shield"
@@ -76,69 +75,67 @@ class Node(PageGraphElement):
         TAG = "tag name"
         URL = "url"
 
+    def id(self) -> PageGraphNodeId:
+        return self.pg.store.node_id(self._index)
+
+    def int_id(self) -> int:
+        return self.pg.store.node_ids[self._index]
+
     def type_name(self) -> str:
-        return self.data()[self.RawAttrs.TYPE.value]
+        return self.pg.store.node_type_name(self._index)
 
     def node_type(self) -> "Node.Types":
-        type_name = self.data()[self.RawAttrs.TYPE.value]
-        return self.Types(type_name)
+        return self.pg.node_type_at(self._index)
 
     def child_nodes(self) -> NodeIterator:
-        for nid, _ in self.pg.graph.adj[self._id].items():
-            yield self.pg.node(nid)
+        store = self.pg.store
+        child_indexes: dict[int, None] = {}
+        for edge_index in store.outgoing_edges(self._index):
+            child_indexes[store.edge_target(edge_index)] = None
+        for node_index in child_indexes:
+            yield self.pg.node_at(node_index)
 
     def parent_nodes(self) -> NodeIterator:
-        for nid, _ in self.pg.r_graph.adj[self._id].items():
-            yield self.pg.node(nid)
+        store = self.pg.store
+        parent_indexes: dict[int, None] = {}
+        for edge_index in store.incoming_edges(self._index):
+            parent_indexes[store.edge_source(edge_index)] = None
+        for node_index in parent_indexes:
+            yield self.pg.node_at(node_index)
 
     def outgoing_edges(self) -> EdgeIterator:
-        for _, edge_info in self.pg.graph.adj[self._id].items():
-            for edge_id, _ in edge_info.items():
-                yield self.pg.edge(edge_id)
+        for edge_index in self.pg.store.outgoing_edges(self._index):
+            yield self.pg.edge_at(edge_index)
 
     def incoming_edges(self) -> EdgeIterator:
-        for _, edge_info in self.pg.r_graph.adj[self._id].items():
-            for edge_id, _ in edge_info.items():
-                yield self.pg.edge(edge_id)
+        for edge_index in self.pg.store.incoming_edges(self._index):
+            yield self.pg.edge_at(edge_index)
+
+    def outgoing_edges_of_type(self, *edge_types: Edge.Types) -> list[Edge]:
+        """Returns the node's outgoing edges of any of the given types,
+        without creating objects for the node's other edges."""
+        edge_at = self.pg.edge_at
+        return [edge_at(i) for i in self.pg.store.outgoing_edges_of_type(
+            self._index, *edge_types)]
+
+    def incoming_edges_of_type(self, *edge_types: Edge.Types) -> list[Edge]:
+        """Returns the node's incoming edges of any of the given types,
+        without creating objects for the node's other edges."""
+        edge_at = self.pg.edge_at
+        return [edge_at(i) for i in self.pg.store.incoming_edges_of_type(
+            self._index, *edge_types)]
 
     def to_node_report(
             self, depth: int = 0,
             seen: None | set[Union["Node", "Edge"]] = None) -> NodeReport:
-        if seen is None:
-            seen = set([self])
-
-        incoming_edges: None | list[EdgeReport | BriefEdgeReport | str] = None
-        outgoing_edges: None | list[EdgeReport | BriefEdgeReport | str] = None
-        if depth > 0:
-            incoming_edges = []
-            for edge in self.incoming_edges():
-                if edge in seen:
-                    incoming_edges.append(f"(recursion {edge.id()})")
-                else:
-                    incoming_edges.append(edge.to_edge_report(depth - 1, seen))
-
-            outgoing_edges = []
-            for edge in self.outgoing_edges():
-                if edge in seen:
-                    outgoing_edges.append(f"(recursion {edge.id()})")
-                else:
-                    outgoing_edges.append(edge.to_edge_report(depth - 1, seen))
-        else:
-            incoming_edges = [e.to_brief_report() for e
-                              in self.incoming_edges()]
-            outgoing_edges = [e.to_brief_report() for e
-                              in self.outgoing_edges()]
-
-        return NodeReport(
-            self.id(), self.node_type(), self.summary_fields(),
-            incoming_edges, outgoing_edges)
+        return cast(NodeReport, element_report(self, True, depth, seen))
 
     def to_brief_report(self) -> BriefNodeReport:
         return BriefNodeReport(self.id(), self.node_type(),
                                self.summary_fields())
 
     def is_type(self, node_type: Types) -> bool:
-        return self.data()[self.RawAttrs.TYPE.value] == node_type.value
+        return self.node_type() is node_type
 
     def is_dom_node_type(self) -> bool:
         return (
@@ -214,39 +211,38 @@ class Node(PageGraphElement):
         return False
 
     def is_toplevel_parser(self) -> bool:
-        for incoming_edge in self.incoming_edges():
-            if incoming_edge.is_cross_dom_edge():
-                return False
-        return True
+        return len(self.pg.store.incoming_edges_of_type(
+            self._index, Edge.Types.CROSS_DOM)) == 0
 
     def frame_owner_nodes(self) -> list[FrameOwnerNode]:
-        frame_owner_nodes = []
-        for node in self.pg.nodes():
-            if node.is_frame_owner():
-                frame_owner_nodes.append(cast(FrameOwnerNode, node))
-        return frame_owner_nodes
+        return list(self.pg.frame_owner_nodes())
 
     def data(self) -> dict[str, str]:
-        return cast(dict[str, str], self.pg.graph.nodes[self._id])
+        if self._data is None:
+            self._data = self.pg.store.node_attrs(self._index)
+        return cast(dict[str, str], self._data)
+
+    def payload(self, name: str) -> Any | None:
+        return self.pg.store.node_payload(self._index, name)
 
     def timestamp(self) -> int:
-        return int(self.data()[self.RawAttrs.TIMESTAMP])
+        timestamp = self.pg.store.node_timestamp(self._index)
+        if timestamp is None:
+            raise KeyError(self.RawAttrs.TIMESTAMP.value)
+        return timestamp
 
     def creator_node(self) -> "ScriptNode" | "ParserNode":
         creator_node: Union[None, "ScriptNode", "ParserNode"] = None
-        for edge in self.incoming_edges():
-            if edge.is_create_edge():
-                creator_edge = cast("NodeCreateEdge", edge)
-                node = creator_edge.incoming_node()
-                if self.pg.debug:
-                    if not node.is_script() and not node.is_parser():
-                        self.throw("Unexpected parent creator node")
-                if node.is_script():
-                    creator_node = cast("ScriptNode", node)
-                    break
-                else:
-                    creator_node = cast("ParserNode", node)
-                    break
+        create_edge_index = self.pg.store.create_edge(self._index)
+        if create_edge_index is not None:
+            node = self.pg.edge_at(create_edge_index).incoming_node()
+            if self.pg.debug:
+                if not node.is_script() and not node.is_parser():
+                    self.throw("Unexpected parent creator node")
+            if node.is_script():
+                creator_node = cast("ScriptNode", node)
+            else:
+                creator_node = cast("ParserNode", node)
         if self.pg.debug:
             if not creator_node:
                 self.throw("Could not find a creator for this node")
@@ -255,57 +251,21 @@ class Node(PageGraphElement):
 
     def created_nodes(self) -> list[Node]:
         created_nodes = []
-        for edge in self.outgoing_edges():
-            if edge.is_create_edge():
-                created_nodes.append(edge.outgoing_node())
+        for edge in self.outgoing_edges_of_type(Edge.Types.NODE_CREATE):
+            created_nodes.append(edge.outgoing_node())
         return created_nodes
 
     def domroot(self) -> DOMRootNode | None:
         """In the simplest case, we try and find a DOMRoot by recursively
         looking to see what created our creator, until we get to a parser node,
         and then we just choose the correct DOMRoot from the list of possible
-        candidates (see below for how we do that)."""
-        domroots_for_parser = None
-
-        creator_node = self.creator_node()
-        while creator_node:
-            if creator_node.is_parser():
-                parser_node = cast(ParserNode, creator_node)
-                domroots_for_parser = parser_node.domroots()
-                break
-            c_node = creator_node.creator_node()
-            if c_node is not None:
-                if self.pg.debug:
-                    if not c_node.is_parser() and not c_node.is_script():
-                        self.throw("Unexpected parent creation edge")
-                if c_node.is_parser():
-                    creator_node = cast(ParserNode, c_node)
-                else:
-                    creator_node = cast(ScriptNode, c_node)
-
-        if not domroots_for_parser:
+        candidates (the one created most recently before this node). This is
+        done for all nodes at once, the first time any node is asked (see
+        `pagegraph.graph.domroots`)."""
+        domroot = self.pg.domroot_for_node(self._index)
+        if not domroot:
             self.throw("Unable to find a DOMRoot")
-        domroots_for_parser = cast(list[DOMRootNode], domroots_for_parser)
-
-        # We 'cheat' here by finding the docroot node that has an id
-        # closest to, but not larger than, the this node (since any
-        # document with a higher pg id had to be created after this node,
-        # and so could not contain the given node).
-        domroots_sorted = sorted(domroots_for_parser, key=lambda x: x.id())
-
-        # The list now contains DOMRoots, from last created to earliest
-        # created.
-        domroots_sorted.reverse()
-        owning_domroot = None
-        for a_domroot in domroots_sorted:
-            if a_domroot.int_id() < self.int_id():
-                owning_domroot = a_domroot
-                break
-            break
-
-        if not owning_domroot:
-            self.throw("All DOMRoots for parser are younger than this node")
-        return cast(DOMRootNode, owning_domroot)
+        return domroot
 
     def executed_scripts(self) -> list[ScriptNode]:
         if self.pg.debug:
@@ -319,16 +279,16 @@ class Node(PageGraphElement):
             if not is_executing_script:
                 self.throw("Unexpected node executing a script")
         executed_scripts = []
-        for edge in self.outgoing_edges():
-            if not edge.is_execute_edge():
-                continue
-            execute_edge = cast(ExecuteEdge, edge)
+        for edge in self.outgoing_edges_of_type(
+                Edge.Types.EXECUTE, Edge.Types.EXECUTE_FROM_ATTRIBUTE):
+            execute_edge = cast("ExecuteEdge", edge)
             executed_scripts.append(execute_edge.outgoing_node())
         return executed_scripts
 
     def describe(self) -> str:
         output = f"node nid={self.id()}\n"
-        for attr_name, attr_value in self.data().items():
+        all_attrs = self.pg.store.node_attrs(self._index, True)
+        for attr_name, attr_value in all_attrs.items():
             output += f"- {attr_name}={str(attr_value).replace("\n", "\\n")}\n"
 
         output += "incoming edges:\n"
@@ -376,16 +336,18 @@ class Node(PageGraphElement):
         return True
 
     def creator_edge(self) -> NodeCreateEdge | None:
-        for edge in self.incoming_edges():
-            if edge.is_create_edge():
-                return cast("NodeCreateEdge", edge)
+        create_edge_index = self.pg.store.create_edge(self._index)
+        if create_edge_index is not None:
+            return cast("NodeCreateEdge", self.pg.edge_at(create_edge_index))
         self.throw("Could not find a creation edge for this node")
         return None
 
 
 class ScriptNode(Node, Reportable):
 
-    incoming_edge_types = [
+    __slots__ = ()
+
+    incoming_edge_types = frozenset([
         Edge.Types.EVENT_LISTENER,
         Edge.Types.EXECUTE,
         Edge.Types.EXECUTE_FROM_ATTRIBUTE,
@@ -394,9 +356,9 @@ class ScriptNode(Node, Reportable):
         Edge.Types.REQUEST_ERROR,
         Edge.Types.REQUEST_REDIRECT,
         Edge.Types.STORAGE_READ_RESULT,
-    ]
+    ])
 
-    outgoing_edge_types = [
+    outgoing_edge_types = frozenset([
         Edge.Types.ATTRIBUTE_DELETE,
         Edge.Types.ATTRIBUTE_SET,
         Edge.Types.EXECUTE,
@@ -411,7 +373,7 @@ class ScriptNode(Node, Reportable):
         Edge.Types.STORAGE_SET,
         Edge.Types.EVENT_LISTENER_ADD,
         Edge.Types.EVENT_LISTENER_REMOVE,
-    ]
+    ])
 
     summary_methods = {
         "hash": "hash",
@@ -436,14 +398,6 @@ class ScriptNode(Node, Reportable):
     def is_script(self) -> bool:
         return True
 
-    def created_nodes(self) -> list[Node]:
-        created_nodes = []
-        for edge in self.outgoing_edges():
-            if edge.is_create_edge():
-                create_edge = cast("NodeCreateEdge", edge)
-                created_nodes.append(create_edge.outgoing_node())
-        return created_nodes
-
     def script_type(self) -> "ScriptNode.ScriptType":
         script_type_raw = self.data()[Node.RawAttrs.SCRIPT_TYPE.value]
         try:
@@ -453,10 +407,10 @@ class ScriptNode(Node, Reportable):
 
     def execute_edge(self) -> "ExecuteEdge":
         execute_edge = None
-        for edge in self.incoming_edges():
-            if edge.is_execute_edge():
-                execute_edge = cast("ExecuteEdge", edge)
-                break
+        execute_edge_index = self.pg.store.execute_edge(self._index)
+        if execute_edge_index is not None:
+            execute_edge = cast(
+                "ExecuteEdge", self.pg.edge_at(execute_edge_index))
         if self.pg.debug:
             if not execute_edge:
                 self.throw("Could not find execution edge for script")
@@ -464,19 +418,38 @@ class ScriptNode(Node, Reportable):
         return execute_edge
 
     def creator_node(self) -> Union["ScriptNode", "ParserNode"]:
-        executing_node = self.execute_edge().incoming_node()
-        if executing_node.is_parser():
-            return cast("ParserNode", executing_node)
-        return executing_node.creator_node()
+        # Scripts executed by other scripts (e.g., with eval) are
+        # attributed to whatever created the first script in the chain.
+        script: ScriptNode = self
+        seen = set([self._index])
+        while True:
+            executing_node = script.execute_edge().incoming_node()
+            if executing_node.is_parser():
+                return cast("ParserNode", executing_node)
+            if not executing_node.is_script():
+                return executing_node.creator_node()
+            if executing_node.index() in seen:
+                self.throw("Script is (indirectly) executed by itself")
+            seen.add(executing_node.index())
+            script = cast("ScriptNode", executing_node)
 
     def to_report(self, include_source: bool = False) -> ScriptReport:
-        executor_report: Union[ScriptReport, DOMElementReport, None] = None
+        # Each script's report includes the report of the node that
+        # created it, and so on, so the chain of creators is found first,
+        # and then reported on starting from the end of the chain.
+        scripts: list[ScriptNode] = [self]
+        seen = set([self._index])
         executor_node = self.creator_node()
+        while executor_node.is_script():
+            if executor_node.index() in seen:
+                self.throw("Script is (indirectly) created by itself")
+            seen.add(executor_node.index())
+            scripts.append(cast("ScriptNode", executor_node))
+            executor_node = executor_node.creator_node()
+
+        executor_report: Union[ScriptReport, DOMElementReport, None] = None
         if executor_node.is_parser():
             executor_report = None
-        elif executor_node.is_script():
-            executor_report = cast("ScriptNode", executor_node).to_report(
-                include_source)
         elif executor_node.is_html_elm():
             executor_report = cast("HTMLNode", executor_node).to_report(
                 include_source)
@@ -484,6 +457,14 @@ class ScriptNode(Node, Reportable):
             executor_report = cast("FrameOwnerNode", executor_node).to_report(
                 include_source)
 
+        for script in reversed(scripts):
+            executor_report = script.__report(include_source, executor_report)
+        assert isinstance(executor_report, ScriptReport)
+        return executor_report
+
+    def __report(self, include_source: bool,
+                 executor_report: Union[ScriptReport, DOMElementReport, None]
+                 ) -> ScriptReport:
         url = None
         if self.script_type() == ScriptNode.ScriptType.EXTERNAL:
             url = self.url()
@@ -496,15 +477,11 @@ class ScriptNode(Node, Reportable):
         return report
 
     def source(self) -> str:
-        try:
-            return self.data()[Node.RawAttrs.SOURCE.value]
-        except KeyError:
-            return ""
+        source = self.payload(Node.RawAttrs.SOURCE.value)
+        return "" if source is None else str(source)
 
     def hash(self) -> str:
-        hasher = hashlib.new("sha256")
-        hasher.update(self.source().encode("utf8"))
-        return b64encode(hasher.digest()).decode("utf8")
+        return self.pg.store.script_hash(self._index)
 
     def url(self) -> Url:
         if self.pg.debug:
@@ -518,23 +495,22 @@ class ScriptNode(Node, Reportable):
 
         script_hash = self.hash()
         executing_node = cast("HTMLNode", incoming_node)
+        request_chains = self.pg.request_chains_for_hash(script_hash)
 
+        # Prefer the request made by the element that executed the script.
         matching_request_chain = None
-        for request_chain in executing_node.requests():
-            if request_chain.hash() == script_hash:
-                matching_request_chain = request_chain
-                break
+        if request_chains:
+            for request_chain in executing_node.requests():
+                if request_chain.hash() == script_hash:
+                    matching_request_chain = request_chain
+                    break
 
         # If we still haven't found the relevant request chain, we
         # last ditch check to see if the resource was cached, or otherwise
         # already fetched, and so a request wasn't attributed to the
         # HTML element.
-        if not matching_request_chain:
-            other_requests = self.pg.unattributed_requests()
-            for request_chain in other_requests:
-                if request_chain.hash() == script_hash:
-                    matching_request_chain = request_chain
-                    break
+        if not matching_request_chain and request_chains:
+            matching_request_chain = request_chains[0]
 
         if self.pg.debug:
             if not matching_request_chain:
@@ -545,6 +521,8 @@ class ScriptNode(Node, Reportable):
 
 class DOMElementNode(Node):
 
+    __slots__ = ()
+
     def blink_id(self) -> BlinkId:
         return self.data()[Node.RawAttrs.BLINK_ID.value]
 
@@ -553,15 +531,16 @@ class DOMElementNode(Node):
         raise NotImplementedError()
 
     def insert_edge(self) -> "NodeInsertEdge" | None:
-        insert_edge: None | "NodeInsertEdge" = None
-        for edge in self.incoming_edges():
-            insert_edge = cast("NodeInsertEdge", edge)
-            break
-        return insert_edge
+        insert_edge_index = self.pg.store.insert_edge(self._index)
+        if insert_edge_index is None:
+            return None
+        return cast("NodeInsertEdge", self.pg.edge_at(insert_edge_index))
 
 
 class HTMLNode(DOMElementNode, Reportable):
 
+    __slots__ = ()
+
     summary_methods = {
         "tag name": "tag_name"
     }
@@ -587,17 +566,6 @@ class HTMLNode(DOMElementNode, Reportable):
                 parent_html_nodes.append(insert_edge.inserted_below_node())
         return parent_html_nodes
 
-    def _domroot_from_parent_node_path(self) -> DOMRootNode | None:
-        """Tries to follow all chains of nodes that this node was inserted
-        as a child of. Its possible that we cannot get to a docroot node
-        in this path though (for example, nodes trees created in script
-        but not inserted in a document), in which case, we return None."""
-        for parent_node in self.parent_html_nodes():
-            if parent_node.is_domroot():
-                return cast(DOMRootNode, parent_node)
-            return cast(HTMLNode, parent_node)._domroot_from_parent_node_path()
-        return None
-
     def domroot(self) -> DOMRootNode:
         """First, see if we can figure out what DOMRoot this HTML Element
         existed in by looking at document structure. We do this to
@@ -605,16 +573,12 @@ class HTMLNode(DOMElementNode, Reportable):
         (since, if we checked for frame-ownership by creator, we'd wind
         up with the cross-dom script's frame, and not the frame
         this element was in)"""
-        parent_node_from_structure = self._domroot_from_parent_node_path()
-        if parent_node_from_structure:
-            return parent_node_from_structure
         return cast(DOMRootNode, super().domroot())
 
     def requests(self) -> list[RequestChain]:
         chains: list[RequestChain] = []
-        for outgoing_edge in self.outgoing_edges():
-            if not outgoing_edge.is_request_start_edge():
-                continue
+        for outgoing_edge in self.outgoing_edges_of_type(
+                Edge.Types.REQUEST_START):
             request_start_edge = cast("RequestStartEdge", outgoing_edge)
             request_id = request_start_edge.request_id()
             request_chain = self.pg.request_chain_for_id(request_id)
@@ -624,6 +588,8 @@ class HTMLNode(DOMElementNode, Reportable):
 
 class FrameOwnerNode(DOMElementNode, Reportable):
 
+    __slots__ = ()
+
     def is_frame_owner(self) -> bool:
         return True
 
@@ -652,6 +618,8 @@ class FrameOwnerNode(DOMElementNode, Reportable):
 
 class TextNode(DOMElementNode, Reportable):
 
+    __slots__ = ()
+
     def is_text_elm(self) -> bool:
         return True
 
@@ -664,6 +632,8 @@ class TextNode(DOMElementNode, Reportable):
 
 class DOMRootNode(DOMElementNode, Reportable):
 
+    __slots__ = ()
+
     def is_domroot(self) -> bool:
         return True
 
@@ -701,26 +671,15 @@ class DOMRootNode(DOMElementNode, Reportable):
         return owning_frame.domroot()
 
     def frame_owner_nodes(self) -> list[FrameOwnerNode]:
-        frame_owner_nodes = []
-        seen_set = set()
-        frame_id = self.frame_id()
-        for frame_owner_node in self.pg.frame_owner_nodes():
-            if frame_owner_node in seen_set:
-                continue
-            creator_edge = frame_owner_node.creator_edge()
-            if creator_edge and creator_edge.frame_id() == frame_id:
-                seen_set.add(frame_owner_node)
-                frame_owner_nodes.append(frame_owner_node)
-                continue
-            insert_edge = frame_owner_node.insert_edge()
-            if insert_edge and insert_edge.frame_id() == frame_id:
-                seen_set.add(frame_owner_node)
-                frame_owner_nodes.append(frame_owner_node)
-                continue
-        return frame_owner_nodes
+        """Returns the frame owner nodes created or inserted by this
+        frame."""
+        return self.pg.frame_owner_nodes_for_frame_id(self.frame_id())
 
     def frame_id(self) -> FrameId:
-        return self.data()[self.RawAttrs.FRAME_ID.value]
+        frame_id = self.pg.store.node_frame_id(self._index)
+        if frame_id is None:
+            raise KeyError(self.RawAttrs.FRAME_ID.value)
+        return frame_id
 
     def url(self) -> Url | None:
         try:
@@ -735,7 +694,11 @@ class DOMRootNode(DOMElementNode, Reportable):
 
     def parser(self) -> ParserNode | None:
         parser_node = None
-        for node in self.parent_nodes():
+        # Parsers are connected to the DOM roots they build by create
+        # and structure edges.
+        for edge in self.incoming_edges_of_type(
+                Edge.Types.NODE_CREATE, Edge.Types.STRUCTURE):
+            node = edge.incoming_node()
             if node.is_parser():
                 parser_node = cast(ParserNode, node)
         if self.pg.debug:
@@ -750,76 +713,21 @@ class DOMRootNode(DOMElementNode, Reportable):
     def script_nodes(self) -> set[ScriptNode]:
         return self.summarize_frame().script_nodes
 
-    def _summarize_frame(
-            self, node: Node, frame_summary: FrameSummary,
-            ignore_nodes: set[Node]) -> FrameSummary:
-        if node in ignore_nodes:
-            return frame_summary
-
-        if node.is_parser():
-            ignore_nodes.add(node)
-
-        if node.is_parent_dom_node_type():
-            parent_node = cast(ParentNode, node)
-            child_dom_nodes = self.pg.child_dom_nodes(parent_node)
-            if child_dom_nodes is not None:
-                for a_child_node in child_dom_nodes:
-                    if frame_summary.includes_attached(a_child_node):
-                        continue
-
-                    if a_child_node.is_text_elm():
-                        c_text_node = cast(TextNode, a_child_node)
-                        frame_summary.attached_nodes.add(c_text_node)
-                    elif a_child_node.is_frame_owner():
-                        c_frame_node = cast(FrameOwnerNode, a_child_node)
-                        frame_summary.attached_nodes.add(c_frame_node)
-                    elif a_child_node.is_html_elm():
-                        c_html_node = cast(HTMLNode, a_child_node)
-                        frame_summary.attached_nodes.add(c_html_node)
-                        self._summarize_frame(
-                            c_html_node, frame_summary, ignore_nodes)
-
-        if node.is_script() or node.is_parser():
-            creating_node: ScriptNode | ParserNode
-            if node.is_script():
-                creating_node = cast(ScriptNode, node)
-            else:
-                creating_node = cast(ParserNode, node)
-
-            for a_created_node in creating_node.created_nodes():
-                if frame_summary.includes_created(a_created_node):
-                    continue
-                frame_summary.created_nodes.add(a_created_node)
-                self._summarize_frame(
-                    a_created_node, frame_summary, ignore_nodes)
-
-        for executed_node in node.executed_scripts():
-            assert executed_node.is_script()
-
-            if frame_summary.includes_executed(executed_node):
-                continue
-
-            frame_summary.script_nodes.add(executed_node)
-            self._summarize_frame(executed_node, frame_summary, ignore_nodes)
-
-        return frame_summary
-
-    @lru_cache(maxsize=None)
     def summarize_frame(self) -> FrameSummary:
-        parser = self.parser()
-        assert parser
-        return self._summarize_frame(parser, FrameSummary(), set())
+        return self.pg.frame_summary(self)
 
 
 class ParserNode(Node):
 
-    incoming_node_types = [
+    __slots__ = ()
+
+    incoming_node_types = frozenset([
         Node.Types.FRAME_OWNER,
         # The RESOURCE case is uncommon, but occurs when something is
         # fetched that doesn't have a representation in the graph,
         # most commonly a pre* <meta> instruction.
         Node.Types.RESOURCE
-    ]
+    ])
 
     def is_parser(self) -> bool:
         return True
@@ -839,14 +747,6 @@ class ParserNode(Node):
                 self.throw("Did not find exactly 1 parent frame owner node")
         return frame_owner_nodes[0]
 
-    def created_nodes(self) -> list[Node]:
-        created_nodes = []
-        for edge in self.outgoing_edges():
-            if edge.is_create_edge():
-                create_edge = cast(NodeCreateEdge, edge)
-                created_nodes.append(create_edge.outgoing_node())
-        return created_nodes
-
     def domroots(self) -> list[DOMRootNode]:
         domroots = []
         already_returned = set()
@@ -866,20 +766,20 @@ class ParserNode(Node):
 
 class ResourceNode(Node):
 
-    outgoing_edge_types = [
+    outgoing_edge_types = frozenset([
         Edge.Types.REQUEST_COMPLETE,
         Edge.Types.REQUEST_ERROR,
         Edge.Types.REQUEST_REDIRECT,
-    ]
+    ])
 
-    incoming_edge_types = [
+    incoming_edge_types = frozenset([
         # Incoming redirect edges denote a request that was redirected
         # to this resource, from another resource. In this case,
         # both the incoming and outgoing node for the redirect edge
         # will be `ResourceNode` nodes.
         Edge.Types.REQUEST_REDIRECT,
         Edge.Types.REQUEST_START,
-    ]
+    ])
 
     summary_methods = {
         "url": "url"
@@ -888,9 +788,11 @@ class ResourceNode(Node):
     # Instance properties
     requests_map: dict[RequestId, RequestResponse]
 
-    def __init__(self, graph: "PageGraph", pg_id: PageGraphId):
+    __slots__ = ("requests_map",)
+
+    def __init__(self, graph: "PageGraph", index: int):
         self.requests_map = {}
-        super().__init__(graph, pg_id)
+        super().__init__(graph, index)
 
     def is_resource_node(self) -> bool:
         return True
@@ -945,6 +847,8 @@ class ResourceNode(Node):
 
 
 class JSStructureNode(Node, Reportable):
+    __slots__ = ()
+
     def to_report(self) -> JSStructureReport:
         return JSStructureReport(self.name(), self.type_name())
 
@@ -955,38 +859,9 @@ class JSStructureNode(Node, Reportable):
         return self.data()[self.RawAttrs.METHOD.value]
 
     def call_results(self) -> list["JSCallResult"]:
-        js_calls = self.incoming_edges()
-        js_results = self.outgoing_edges()
-        calls_and_results_unsorted = list(chain(js_calls, js_results))
-        calls_and_results = sorted(
-            calls_and_results_unsorted, key=lambda x: x.int_id())
-
-        if self.pg.debug:
-            num_calls = len(list(js_calls))
-            num_results = len(list(js_results))
-            if num_results > num_calls:
-                self.throw("Found more results than calls to this builtin, "
-                           f"calls={num_calls}, results={num_results}")
-
-            last_edge = calls_and_results[0]
-            for edge in calls_and_results[1:]:
-                if edge.is_js_result_edge():
-                    if last_edge.is_js_result_edge():
-                        self.throw("Found two adjacent result edges: "
-                                   f"{last_edge.id()} and {edge.id()}")
-                last_edge = edge
-
-        call_results: list[JSCallResult] = []
-        for edge in calls_and_results:
-            if edge.is_js_result_edge():
-                js_result_edge = cast("JSResultEdge", edge)
-                last_call_result = call_results[-1]
-                last_call_result.result_edge = js_result_edge
-            else:
-                js_call_edge = cast("JSCallEdge", edge)
-                a_call_result = JSCallResult(js_call_edge, None)
-                call_results.append(a_call_result)
-        return call_results
+        table = self.pg.js_call_table()
+        return [table.call_result(row)
+                for row in table.rows_for_callee(self._index)]
 
     def incoming_edges(self) -> list["JSCallEdge"]:
         return cast(list["JSCallEdge"], super().incoming_edges())
@@ -996,31 +871,31 @@ class JSStructureNode(Node, Reportable):
 
 
 class JSBuiltInNode(JSStructureNode):
-    pass
+    __slots__ = ()
 
 
 class WebAPINode(JSStructureNode):
-    pass
+    __slots__ = ()
 
 
 class StorageNode(Node):
-    pass
+    __slots__ = ()
 
 
 class CookieJarNode(Node):
-    pass
+    __slots__ = ()
 
 
 class LocalStorageNode(Node):
-    pass
+    __slots__ = ()
 
 
 class SessionStorageNode(Node):
-    pass
+    __slots__ = ()
 
 
 class DeprecatedNode(Node):
-    pass
+    __slots__ = ()
 
 
 TYPE_MAPPING: dict[Node.Types, Type[Node]] = dict([
@@ -1048,8 +923,9 @@ TYPE_MAPPING: dict[Node.Types, Type[Node]] = dict([
 
 
 def for_type(node_type: Node.Types, graph: "PageGraph",
-             node_id: PageGraphNodeId) -> Node:
+             node_index: int) -> Node:
     try:
-        return TYPE_MAPPING[node_type](graph, node_id)
+        node_class = TYPE_MAPPING[node_type]
     except KeyError:
         raise ValueError(f"Unexpected node type={node_type.value}")
+    return node_class(graph, node_index)
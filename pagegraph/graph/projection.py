@@ -0,0 +1,68 @@
+"""Projections describe the subset of a recording that a query needs.
+
+Nodes and edges of types outside a projection, and attributes outside
+the projection, are skipped while the recording is read, so they take no
+time to build and no memory to store. Edges that point to or from a
+skipped node are skipped too. A `None` value for any part of a
+projection means nothing of that kind is skipped.
+
+Projections only apply when a recording is parsed. Snapshots (see
+`pagegraph.graph.snapshot`) always hold the full graph."""
+from typing import Iterable
+
+from pagegraph.graph.edge import Edge
+from pagegraph.graph.node import Node
+
+
+class Projection:
+
+    node_types: frozenset[str] | None
+    edge_types: frozenset[str] | None
+    attrs: frozenset[str] | None
+
+    def __init__(self, node_types: Iterable[Node.Types] | None = None,
+                 edge_types: Iterable[Edge.Types] | None = None,
+                 attrs: Iterable[str] | None = None):
+        self.node_types = None
+        self.edge_types = None
+        self.attrs = None
+        if node_types is not None:
+            self.node_types = frozenset(t.value for t in node_types)
+        if edge_types is not None:
+            self.edge_types = frozenset(t.value for t in edge_types)
+        if attrs is not None:
+            # The type of each element is always needed.
+            self.attrs = frozenset(attrs) | frozenset([
+                Node.RawAttrs.TYPE.value, Edge.RawAttrs.TYPE.value])
+
+    def includes_node_type(self, type_name: str) -> bool:
+        return self.node_types is None or type_name in self.node_types
+
+    def includes_edge_type(self, type_name: str) -> bool:
+        return self.edge_types is None or type_name in self.edge_types
+
+    def includes_attr(self, name: str) -> bool:
+        return self.attrs is None or name in self.attrs
+
+
+def union(projections: Iterable[Projection | None]) -> Projection | None:
+    """Returns a projection including everything any of the given
+    projections include (None meaning the full graph), e.g., to load a
+    graph once for several queries."""
+    combined = Projection([], [], [])
+    for projection in projections:
+        if projection is None:
+            return None
+        combined.node_types = _union_part(combined.node_types,
+                                          projection.node_types)
+        combined.edge_types = _union_part(combined.edge_types,
+                                          projection.edge_types)
+        combined.attrs = _union_part(combined.attrs, projection.attrs)
+    return combined
+
+
+def _union_part(part: frozenset[str] | None,
+                other_part: frozenset[str] | None) -> frozenset[str] | None:
+    if part is None or other_part is None:
+        return None
+    return part | other_part
@@ -0,0 +1,108 @@
+"""Builds the nested reports of nodes and edges (see `Node.to_node_report`
+and `Edge.to_edge_report`) without recursion, so that reports can be as
+deep as the graph is, regardless of Python's recursion limit.
+
+Reports still to be built are kept on an explicit stack, along with
+where each report goes once built (a position in its parent's list of
+edge reports, or a field of its parent's edge report). Every report's
+children are filled in by position, so the finished report is the same
+whatever order the stack is worked through in."""
+from operator import setitem
+from typing import Any, Callable, cast, Iterable, TYPE_CHECKING, Union
+
+from pagegraph.serialize import EdgeReport, NodeReport
+
+if TYPE_CHECKING:
+    from pagegraph.graph.edge import Edge
+    from pagegraph.graph.node import Node
+
+
+Seen = Union[None, set[Union["Node", "Edge"]]]
+
+# A report still to be built: whether it's a node's report, the element,
+# the depth to build it to, the elements to report as recursion, and
+# where to store the report (passed to `store` with the report).
+Pending = tuple[bool, Union["Node", "Edge"], int, Seen,
+                Callable[[Any, Any, Any], None], Any, Any]
+
+
+def element_report(element: Union["Node", "Edge"], is_node: bool,
+                   depth: int, seen: Seen) -> NodeReport | EdgeReport:
+    result: list[NodeReport | EdgeReport | None] = [None]
+    stack: list[Pending] = [(is_node, element, depth, seen,
+                             setitem, result, 0)]
+    while stack:
+        is_node, element, depth, seen, store, target, key = stack.pop()
+        if is_node:
+            report: NodeReport | EdgeReport = _node_report(
+                cast("Node", element), depth, seen, stack)
+        else:
+            report = _edge_report(cast("Edge", element), depth, seen, stack)
+        store(target, key, report)
+    assert result[0] is not None
+    return result[0]
+
+
+def _node_report(node: "Node", depth: int, seen: Seen,
+                 stack: list[Pending]) -> NodeReport:
+    if seen is None:
+        seen = set([node])
+
+    if depth > 0:
+        incoming_edges = _edge_reports(
+            node.incoming_edges(), depth - 1, seen, stack)
+        outgoing_edges = _edge_reports(
+            node.outgoing_edges(), depth - 1, seen, stack)
+    else:
+        incoming_edges = [e.to_brief_report() for e in node.incoming_edges()]
+        outgoing_edges = [e.to_brief_report() for e in node.outgoing_edges()]
+
+    return NodeReport(
+        node.id(), node.node_type(), node.summary_fields(),
+        incoming_edges, outgoing_edges)
+
+
+def _edge_reports(edges: Iterable["Edge"], depth: int,
+                  seen: set[Union["Node", "Edge"]],
+                  stack: list[Pending]) -> list[Any]:
+    reports: list[Any] = []
+    for edge in edges:
+        if edge in seen:
+            reports.append(f"(recursion {edge.id()})")
+        else:
+            # Filled in once the edge's report is built.
+            reports.append(None)
+            stack.append((False, edge, depth, seen,
+                          setitem, reports, len(reports) - 1))
+    return reports
+
+
+def _edge_report(edge: "Edge", depth: int, seen: Seen,
+                 stack: list[Pending]) -> EdgeReport:
+    if seen is None:
+        seen = set([edge])
+
+    report = EdgeReport(edge.id(), edge.edge_type(), edge.summary_fields(),
+                        None, None)
+
+    incoming_node = edge.incoming_node()
+    if incoming_node:
+        if incoming_node in seen:
+            report.incoming_node = f"(recursion {incoming_node.id()})"
+        elif depth > 0:
+            stack.append((True, incoming_node, depth - 1, None,
+                          setattr, report, "incoming_node"))
+        else:
+            report.incoming_node = incoming_node.to_brief_report()
+
+    outgoing_node = edge.outgoing_node()
+    if outgoing_node:
+        if outgoing_node in seen:
+            report.outgoing_node = f"(recursion {outgoing_node.id()})"
+        if depth > 0:
+            stack.append((True, outgoing_node, depth - 1, None,
+                          setattr, report, "outgoing_node"))
+        else:
+            report.outgoing_node = outgoing_node.to_brief_report()
+
+    return report
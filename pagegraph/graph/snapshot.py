@@ -0,0 +1,187 @@
+"""Binary snapshots of a parsed recording, so that later commands run on the
+same recording don't need to parse the GraphML again.
+
+A snapshot is written next to the recording it was built from (at
+`snapshot_path(input_path)`), and records the size and modification time
+of that recording, so that stale snapshots can be detected.
+
+The file layout is:
+
+    8 bytes     magic value (`MAGIC`)
+    8 bytes     offset of the header
+    8 bytes     length of the header
+    ...         each column of the `GraphStore`, the string table, and
+                the digest of each script's source, each aligned to 8
+                bytes
+    ...         the header, a JSON object describing the snapshot and
+                where each column is stored
+
+Attribute values stored as `SourceSpan`s still point into the recording
+(which is why a snapshot is only used while the recording is unchanged).
+
+Columns are stored in native byte order, and snapshots are read by memory
+mapping the file and casting each column to a `memoryview`, so opening a
+snapshot costs little more than reading the header."""
+from array import array
+import json
+import mmap
+import os
+import struct
+from typing import Any, BinaryIO
+
+from pagegraph.graph.store import AttrKind, COLUMNS, Column, GraphStore
+
+
+# Changed whenever the layout changes, so that snapshots written by older
+# versions are rebuilt, rather than misread.
+MAGIC = b"PGSNAP06"
+SNAPSHOT_SUFFIX = ".snapshot"
+PREAMBLE = struct.Struct("<8sQQ")
+
+
+def snapshot_path(input_path: str) -> str:
+    return input_path + SNAPSHOT_SUFFIX
+
+
+def _source_fingerprint(input_path: str) -> dict[str, int]:
+    stat = os.stat(input_path)
+    return {"source size": stat.st_size, "source mtime": stat.st_mtime_ns}
+
+
+class SnapshotWriter:
+
+    handle: BinaryIO
+    sections: dict[str, tuple[int, int, str]]
+
+    def __init__(self, handle: BinaryIO):
+        self.handle = handle
+        self.sections = {}
+
+    def align(self) -> None:
+        padding = -self.handle.tell() % 8
+        self.handle.write(b"\0" * padding)
+
+    def write_column(self, name: str, typecode: str, column: Column) -> None:
+        self.align()
+        offset = self.handle.tell()
+        if isinstance(column, (bytes, memoryview)):
+            self.handle.write(column)
+        else:
+            self.handle.write(array(typecode, column).tobytes())
+        self.sections[name] = (offset, self.handle.tell() - offset, typecode)
+
+    def write_strings(self, store: GraphStore) -> None:
+        self.align()
+        offset = self.handle.tell()
+        string_offsets = array("q", [0])
+        for index in range(store.num_strings()):
+            data = store.string(index).encode("utf8")
+            self.handle.write(data)
+            string_offsets.append(string_offsets[-1] + len(data))
+        self.sections["string_data"] = (
+            offset, self.handle.tell() - offset, "B")
+        self.write_column("string_offsets", "q", string_offsets)
+
+    def write(self, store: GraphStore, metadata: dict[str, Any]) -> None:
+        self.handle.write(PREAMBLE.pack(MAGIC, 0, 0))
+        for name, typecode in COLUMNS.items():
+            self.write_column(name, typecode, store.columns()[name])
+        self.write_strings(store)
+        # Written so that scripts are never hashed again for this
+        # recording.
+        self.write_column("script_digests", "B", store.script_digests())
+
+        header = {
+            **metadata,
+            "version": store.version,
+            "attr keys": [[name, int(kind)] for name, kind
+                          in store.attr_keys],
+            "node types": store.node_type_names,
+            "edge types": store.edge_type_names,
+            "sections": self.sections,
+        }
+        self.align()
+        header_offset = self.handle.tell()
+        header_data = json.dumps(header).encode("utf8")
+        self.handle.write(header_data)
+        self.handle.seek(0)
+        self.handle.write(PREAMBLE.pack(MAGIC, header_offset,
+                                        len(header_data)))
+
+
+def write_snapshot(store: GraphStore, input_path: str) -> str:
+    """Writes a snapshot of `store`, which was built from the recording at
+    `input_path`, and returns the path the snapshot was written to."""
+    output_path = snapshot_path(input_path)
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as handle:
+            SnapshotWriter(handle).write(store,
+                                         _source_fingerprint(input_path))
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return output_path
+
+
+def _read_header(input_path: str, mapped: mmap.mmap) -> dict[str, Any] | None:
+    """Returns the header of the snapshot, or None if the snapshot was
+    written by another version, the recording has changed since, or the
+    snapshot is truncated or corrupt."""
+    try:
+        if len(mapped) < PREAMBLE.size:
+            return None
+        magic, header_offset, header_length = PREAMBLE.unpack_from(mapped)
+        if magic != MAGIC or header_offset + header_length > len(mapped):
+            return None
+        header = json.loads(mapped[header_offset:
+                                   header_offset + header_length])
+        for key, value in _source_fingerprint(input_path).items():
+            if header[key] != value:
+                return None
+        for name in (*COLUMNS, "string_offsets", "string_data",
+                     "script_digests"):
+            offset, length, typecode = header["sections"][name]
+            if (offset < 0 or length < 0 or offset + length > len(mapped) or
+                    length % struct.calcsize(typecode)):
+                return None
+        for _, kind in header["attr keys"]:
+            AttrKind(kind)
+        if any(key not in header
+               for key in ("version", "node types", "edge types")):
+            return None
+    except (struct.error, ValueError, KeyError, TypeError):
+        return None
+    return dict(header)
+
+
+def read_snapshot(input_path: str) -> GraphStore | None:
+    """Returns the `GraphStore` from the snapshot for the recording at
+    `input_path`, or None if there is no snapshot for the recording, if
+    the recording has changed since the snapshot was written, or if the
+    snapshot can't be read (in which case `from_path` rebuilds it)."""
+    path = snapshot_path(input_path)
+    try:
+        with open(path, "rb") as handle:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    header = _read_header(input_path, mapped)
+    if header is None:
+        mapped.close()
+        return None
+
+    def section(name: str) -> memoryview:
+        offset, length, typecode = header["sections"][name]
+        with memoryview(mapped) as buffer:
+            return buffer[offset:offset + length].cast(typecode)
+
+    attr_keys = [(name, AttrKind(kind)) for name, kind
+                 in header["attr keys"]]
+    columns: dict[str, Column] = {name: section(name) for name in COLUMNS}
+    return GraphStore(header["version"], attr_keys, header["node types"],
+                      header["edge types"], columns, None,
+                      section("string_offsets"), section("string_data"),
+                      input_path, mapped, section("script_digests"))
@@ -0,0 +1,877 @@
+"""Compact, integer indexed storage for the nodes and edges of a graph.
+
+Each node and edge is identified by its index (its position in the
+recording), and its data is held in typed columns, instead of in a
+dict per element. Attribute values are stored as integers, with strings
+stored once in a shared string table. Adjacency is stored in CSR form
+(for each node, the indexes of its outgoing and incoming edges are stored
+contiguously, with an offsets column giving where each node's edges
+begin), as are the lists of nodes and edges of each type.
+
+A `GraphStore` is either built in memory (through `GraphStoreBuilder`, as
+a recording is parsed), or read from a snapshot file, in which case
+each column is a `memoryview` into the memory mapped snapshot (see
+`pagegraph.graph.snapshot`).
+
+Large attribute values (see `PAYLOAD_ATTRS`) can be stored as a
+`SourceSpan`, the location of the value in an uncompressed recording,
+rather than as a string. These values are only decoded, from a memory
+mapping of the recording, when they're asked for, and are not included
+in the dicts returned by `node_attrs` and `edge_attrs` (use
+`node_payload` and `edge_payload` instead).
+
+The hash of each script's source is computed once per store, for every
+script at once (see `script_hash`), and is saved in snapshots."""
+from array import array
+from base64 import b64encode
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Sequence
+from xml.parsers import expat
+
+from pagegraph.graph.edge import Edge
+from pagegraph.graph.node import Node
+from pagegraph.graph.projection import Projection
+from pagegraph.types import PageGraphNodeId, PageGraphEdgeId
+
+
+# Either an `array.array` (for stores built in memory), or a `memoryview`
+# (for stores read from a snapshot).
+Column = Sequence[int]
+
+
+class AttrKind(IntEnum):
+    STRING = 0
+    INT = 1
+    BOOL = 2
+    FLOAT = 3
+    # Index into the `span_offsets` and `span_lengths` columns.
+    SPAN = 4
+
+
+# Attributes that can hold large values (script source, response headers,
+# and the arguments and results of JS calls), which are only read from the
+# recording when needed.
+PAYLOAD_ATTRS = frozenset([
+    Node.RawAttrs.SOURCE.value,
+    Edge.RawAttrs.HEADERS.value,
+    Edge.RawAttrs.ARGS.value,
+    Edge.RawAttrs.VALUE.value,
+])
+
+
+# Strings shorter than this are only stored once in the string table.
+# Longer strings (e.g., script source) are very rarely repeated, and so
+# aren't worth the cost of tracking.
+MAX_INTERNED_STRING_LENGTH = 128
+
+# The name and `array` typecode of each column in a `GraphStore`.
+COLUMNS: dict[str, str] = {
+    # Numeric part of each node's id (i.e., 5 for "n5").
+    "node_ids": "q",
+    # Index into `node_type_names`.
+    "node_types": "B",
+    # For each node, the range of attribute entries that belong to it.
+    "node_attr_offsets": "q",
+    # Index into `attr_keys`, and encoded value, of each attribute entry.
+    "node_attr_keys": "H",
+    "node_attr_values": "q",
+    # Node indexes, sorted by node id, for looking up nodes by id.
+    "node_order": "i",
+    # Node indexes, grouped by type (CSR, indexed by type code).
+    "node_type_offsets": "q",
+    "node_type_index": "i",
+
+    "edge_ids": "q",
+    "edge_types": "B",
+    "edge_sources": "i",
+    "edge_targets": "i",
+    "edge_attr_offsets": "q",
+    "edge_attr_keys": "H",
+    "edge_attr_values": "q",
+    "edge_order": "i",
+    # Edge indexes, grouped by type, in graph order (see
+    # `GraphStore.edges_in_order`).
+    "edge_type_offsets": "q",
+    "edge_type_index": "i",
+
+    # Edge indexes, grouped by the node they leave (CSR, indexed by
+    # node index).
+    "out_offsets": "q",
+    "out_edges": "i",
+    # Edge indexes, grouped by the node they point to.
+    "in_offsets": "q",
+    "in_edges": "i",
+    # For each node, the index of its first incoming edge of the types
+    # in `FIRST_INCOMING_EDGE_TYPES`, or -1.
+    "node_create_edges": "i",
+    "node_execute_edges": "i",
+    "node_insert_edges": "i",
+
+    # Byte offset (of the `<data>` element) and length of each attribute
+    # value stored as a `SourceSpan`.
+    "span_offsets": "q",
+    "span_lengths": "q",
+
+    # Frequently read attributes, also stored in a column of their own
+    # (see `NODE_TYPED_ATTRS` and `EDGE_TYPED_ATTRS`).
+    "node_timestamps": "q",
+    "node_frame_ids": "q",
+    "edge_timestamps": "q",
+    "edge_request_ids": "q",
+    "edge_frame_ids": "q",
+}
+
+# Most nodes are asked for the edge that created them, executed them (for
+# scripts) or inserted them into the document (for DOM elements), so each
+# node's first incoming edge of these types is found when the store is
+# built, and stored in the named column.
+FIRST_INCOMING_EDGE_TYPES: dict[str, tuple[str, ...]] = {
+    "node_create_edges": (Edge.Types.NODE_CREATE.value,),
+    "node_execute_edges": (Edge.Types.EXECUTE.value,
+                           Edge.Types.EXECUTE_FROM_ATTRIBUTE.value),
+    "node_insert_edges": (Edge.Types.NODE_INSERT.value,),
+}
+
+# Size of the SHA-256 digest of each script's source.
+SCRIPT_DIGEST_SIZE = 32
+
+# Script sources are hashed in a thread pool (hashlib releases the GIL
+# while hashing large buffers) when there are at least this many scripts,
+# using up to this many threads.
+MIN_PARALLEL_SCRIPTS = 1024
+MAX_HASH_THREADS = 8
+
+# Value of a typed attribute column for elements without the attribute.
+MISSING = -(1 << 63)
+
+# Attributes that are read often enough (e.g., timestamps, when ordering
+# elements) that they're also decoded, when the store is built, into a
+# column with one entry per element, so they can be read without decoding
+# the element's other attributes. For each attribute, the name of its
+# column, and how values are stored: either as the value itself (INT), or
+# as an index into the string table (STRING).
+NODE_TYPED_ATTRS: dict[str, tuple[str, AttrKind]] = {
+    Node.RawAttrs.TIMESTAMP.value: ("node_timestamps", AttrKind.INT),
+    Node.RawAttrs.FRAME_ID.value: ("node_frame_ids", AttrKind.STRING),
+}
+EDGE_TYPED_ATTRS: dict[str, tuple[str, AttrKind]] = {
+    Edge.RawAttrs.TIMESTAMP.value: ("edge_timestamps", AttrKind.INT),
+    Edge.RawAttrs.REQUEST_ID.value: ("edge_request_ids", AttrKind.INT),
+    Edge.RawAttrs.FRAME_ID.value: ("edge_frame_ids", AttrKind.STRING),
+}
+
+
+class SourceSpan:
+    """The location of a `<data>` element in a recording, from the start
+    of the opening tag up to the start of the closing tag."""
+
+    offset: int
+    length: int
+
+    def __init__(self, offset: int, length: int):
+        self.offset = offset
+        self.length = length
+
+
+def _decode_span(data: bytes) -> str:
+    # Values holding only plain text (no markup, entity references, CDATA
+    # sections or carriage returns, which the parser would normalize) can
+    # be decoded without a parser.
+    start = data.find(b">") + 1
+    if data.count(b'"', 0, start) == 2:
+        value = data[start:]
+        if b"<" not in value and b"&" not in value and b"\r" not in value:
+            return value.decode("utf8")
+    text: list[str] = []
+    parser = expat.ParserCreate("utf-8")
+    parser.buffer_text = True
+    parser.CharacterDataHandler = text.append
+    parser.Parse(data + b"</data>", True)
+    return "".join(text)
+
+
+def _float_to_int(value: float) -> int:
+    return int(struct.unpack("<q", struct.pack("<d", value))[0])
+
+
+def _int_to_float(value: int) -> float:
+    return float(struct.unpack("<d", struct.pack("<q", value))[0])
+
+
+def _parse_id(element_id: str, prefix: str) -> int:
+    try:
+        int_id = int(element_id[1:])
+    except ValueError:
+        int_id = -1
+    if element_id[:1] != prefix or f"{prefix}{int_id}" != element_id:
+        raise ValueError(f"Unexpected element id: {element_id}")
+    return int_id
+
+
+def _group(keys: Sequence[int], num_groups: int,
+           order: Sequence[int] | None = None
+           ) -> tuple["array[int]", "array[int]"]:
+    """Stable counting sort of the indexes of `keys` (taken in the given
+    `order`, or in index order), by key. Returns the offset each group
+    begins at (CSR style), and the sorted indexes."""
+    offsets = array("q", bytes(8 * (num_groups + 1)))
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(num_groups):
+        offsets[i + 1] += offsets[i]
+    positions = array("q", offsets[:-1])
+    grouped = array("i", bytes(4 * len(keys)))
+    for index in range(len(keys)) if order is None else order:
+        key = keys[index]
+        grouped[positions[key]] = index
+        positions[key] += 1
+    return offsets, grouped
+
+
+def _group_by_neighbor(sources: Sequence[int], targets: Sequence[int],
+                       num_nodes: int) -> dict[str, "array[int]"]:
+    """Groups the edges by source and by target (see `_group`), listing
+    each node's edges in the order networkx lists them: grouped by the
+    node at the edge's other end, in the order those nodes are first
+    seen."""
+    pair_firsts: dict[tuple[int, int], int] = {}
+    pair_first_edges = array("i", (
+        pair_firsts.setdefault(pair, edge_index)
+        for edge_index, pair in enumerate(zip(sources, targets))))
+    pair_firsts.clear()
+    _, by_pair = _group(pair_first_edges, len(pair_first_edges))
+    out_offsets, out_edges = _group(sources, num_nodes, by_pair)
+    in_offsets, in_edges = _group(targets, num_nodes, by_pair)
+    return {"out_offsets": out_offsets, "out_edges": out_edges,
+            "in_offsets": in_offsets, "in_edges": in_edges}
+
+
+def _first_edges(targets: Sequence[int], type_offsets: Sequence[int],
+                 type_index: Sequence[int], codes: list[int],
+                 num_nodes: int) -> "array[int]":
+    """For each node, the lowest index of the edges (of the types with
+    the given codes) that point to it, or -1, using the edges grouped by
+    type (see `_group`)."""
+    first_edges = array("i", [-1]) * num_nodes
+    for code in codes:
+        for edge_index in type_index[type_offsets[code]:
+                                     type_offsets[code + 1]]:
+            node_index = targets[edge_index]
+            current = first_edges[node_index]
+            if current == -1 or edge_index < current:
+                first_edges[node_index] = edge_index
+    return first_edges
+
+
+class GraphStore:
+
+    # The version of PageGraph that wrote the recording.
+    version: str | None
+    # The name and kind of each distinct attribute.
+    attr_keys: list[tuple[str, AttrKind]]
+    node_type_names: list[str]
+    edge_type_names: list[str]
+
+    node_ids: Column
+    node_types: Column
+    node_attr_offsets: Column
+    node_attr_keys: Column
+    node_attr_values: Column
+    node_order: Column
+    node_type_offsets: Column
+    node_type_index: Column
+
+    edge_ids: Column
+    edge_types: Column
+    edge_sources: Column
+    edge_targets: Column
+    edge_attr_offsets: Column
+    edge_attr_keys: Column
+    edge_attr_values: Column
+    edge_order: Column
+    edge_type_offsets: Column
+    edge_type_index: Column
+
+    out_offsets: Column
+    out_edges: Column
+    in_offsets: Column
+    in_edges: Column
+    node_create_edges: Column
+    node_execute_edges: Column
+    node_insert_edges: Column
+
+    span_offsets: Column
+    span_lengths: Column
+
+    node_timestamps: Column
+    node_frame_ids: Column
+    edge_timestamps: Column
+    edge_request_ids: Column
+    edge_frame_ids: Column
+
+    # The SHA-256 digest of each script node's source, in the order of
+    # `nodes_of_type(Node.Types.SCRIPT)`, or None until first needed.
+    __script_digests: bytes | memoryview | None
+
+    # The uncompressed recording that `SourceSpan` values point into.
+    source_path: str | None
+    __source: mmap.mmap | None
+    # The memory mapped snapshot the columns are views into, if any.
+    __mapping: mmap.mmap | None
+
+    # The string table is either a list of strings (when built in memory),
+    # or utf8 data and the offset of each string in that data (when
+    # read from a snapshot).
+    strings: list[str] | None
+    string_offsets: Column | None
+    string_data: memoryview | None
+    __decoded_strings: dict[int, str]
+
+    __node_type_codes: dict[str, int]
+    __edge_type_codes: dict[str, int]
+
+    def __init__(self, version: str | None,
+                 attr_keys: list[tuple[str, AttrKind]],
+                 node_type_names: list[str], edge_type_names: list[str],
+                 columns: dict[str, Column], strings: list[str] | None,
+                 string_offsets: Column | None = None,
+                 string_data: memoryview | None = None,
+                 source_path: str | None = None,
+                 mapping: mmap.mmap | None = None,
+                 script_digests: memoryview | None = None):
+        self.version = version
+        self.attr_keys = attr_keys
+        self.node_type_names = node_type_names
+        self.edge_type_names = edge_type_names
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+        self.strings = strings
+        self.string_offsets = string_offsets
+        self.string_data = string_data
+        self.__decoded_strings = {}
+        self.__script_digests = script_digests
+        self.source_path = source_path
+        self.__source = None
+        self.__mapping = mapping
+        self.__node_type_codes = {
+            name: code for code, name in enumerate(node_type_names)}
+        self.__edge_type_codes = {
+            name: code for code, name in enumerate(edge_type_names)}
+
+    def close(self) -> None:
+        """Releases the store's columns, and unmaps any files they were
+        read from. The store can't be used after it's closed."""
+        for name in COLUMNS:
+            column = getattr(self, name)
+            if isinstance(column, memoryview):
+                column.release()
+            setattr(self, name, [])
+        for view in (self.string_offsets, self.string_data,
+                     self.__script_digests):
+            if isinstance(view, memoryview):
+                view.release()
+        self.strings = []
+        self.string_offsets = None
+        self.string_data = None
+        self.__decoded_strings = {}
+        self.__script_digests = None
+        for mapped in (self.__source, self.__mapping):
+            if mapped is None:
+                continue
+            try:
+                mapped.close()
+            except BufferError:
+                # Some caller still holds a view into the mapping, which
+                # will be unmapped once that view is released.
+                pass
+        self.__source = None
+        self.__mapping = None
+
+    def columns(self) -> dict[str, Column]:
+        return {name: getattr(self, name) for name in COLUMNS}
+
+    def memory_size(self) -> int:
+        """Returns an estimate of the memory held by the store's columns
+        and string table (including the strings decoded so far), in
+        bytes. Columns read from a snapshot are counted too, though the OS
+        can page them out."""
+        size = 0
+        for column in (*self.columns().values(), self.string_offsets):
+            if isinstance(column, (array, memoryview)):
+                size += column.itemsize * len(column)
+        if self.string_data is not None:
+            size += self.string_data.nbytes
+        if self.strings is not None:
+            size += sum(sys.getsizeof(string) for string in self.strings)
+        size += sys.getsizeof(self.__decoded_strings)
+        size += sum(sys.getsizeof(string)
+                    for string in self.__decoded_strings.values())
+        return size
+
+    def string(self, string_index: int) -> str:
+        if self.strings is not None:
+            return self.strings[string_index]
+        try:
+            return self.__decoded_strings[string_index]
+        except KeyError:
+            pass
+        assert self.string_offsets is not None
+        assert self.string_data is not None
+        start = self.string_offsets[string_index]
+        end = self.string_offsets[string_index + 1]
+        value = str(self.string_data[start:end], "utf8")
+        if end - start < MAX_INTERNED_STRING_LENGTH:
+            self.__decoded_strings[string_index] = value
+        return value
+
+    def span(self, span_index: int) -> str:
+        source = self.__source_mapping()
+        start = self.span_offsets[span_index]
+        end = start + self.span_lengths[span_index]
+        return _decode_span(source[start:end])
+
+    def __source_mapping(self) -> mmap.mmap:
+        if self.__source is None:
+            if self.source_path is None:
+                raise Exception("Graph has no recording to read values from")
+            with open(self.source_path, "rb") as handle:
+                self.__source = mmap.mmap(handle.fileno(), 0,
+                                          access=mmap.ACCESS_READ)
+        return self.__source
+
+    def num_strings(self) -> int:
+        if self.strings is not None:
+            return len(self.strings)
+        assert self.string_offsets is not None
+        return len(self.string_offsets) - 1
+
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    def num_edges(self) -> int:
+        return len(self.edge_ids)
+
+    def node_id(self, node_index: int) -> PageGraphNodeId:
+        return f"n{self.node_ids[node_index]}"
+
+    def edge_id(self, edge_index: int) -> PageGraphEdgeId:
+        return f"e{self.edge_ids[edge_index]}"
+
+    def node_index(self, node_id: PageGraphNodeId) -> int | None:
+        return self.__find(_parse_id(node_id, "n"), self.node_order,
+                           self.node_ids)
+
+    def edge_index(self, edge_id: PageGraphEdgeId) -> int | None:
+        return self.__find(_parse_id(edge_id, "e"), self.edge_order,
+                           self.edge_ids)
+
+    @staticmethod
+    def __find(int_id: int, order: Column, ids: Column) -> int | None:
+        position = bisect_left(order, int_id, key=ids.__getitem__)
+        if position < len(order) and ids[order[position]] == int_id:
+            return order[position]
+        return None
+
+    def node_type_name(self, node_index: int) -> str:
+        return self.node_type_names[self.node_types[node_index]]
+
+    def edge_type_name(self, edge_index: int) -> str:
+        return self.edge_type_names[self.edge_types[edge_index]]
+
+    def nodes_of_type(self, type_name: str) -> Column:
+        code = self.__node_type_codes.get(type_name)
+        if code is None:
+            return []
+        start = self.node_type_offsets[code]
+        end = self.node_type_offsets[code + 1]
+        return self.node_type_index[start:end]
+
+    def edges_in_order(self) -> Column:
+        """Returns the index of every edge, in the order networkx lists a
+        graph's edges: grouped by the node they leave, in node order, and
+        then as in `outgoing_edges`."""
+        return self.out_edges
+
+    def edges_of_type(self, type_name: str) -> Column:
+        code = self.__edge_type_codes.get(type_name)
+        if code is None:
+            return []
+        start = self.edge_type_offsets[code]
+        end = self.edge_type_offsets[code + 1]
+        return self.edge_type_index[start:end]
+
+    def outgoing_edges(self, node_index: int) -> Column:
+        start = self.out_offsets[node_index]
+        end = self.out_offsets[node_index + 1]
+        return self.out_edges[start:end]
+
+    def incoming_edges(self, node_index: int) -> Column:
+        start = self.in_offsets[node_index]
+        end = self.in_offsets[node_index + 1]
+        return self.in_edges[start:end]
+
+    def outgoing_edges_of_type(self, node_index: int,
+                               *type_names: str) -> list[int]:
+        """Returns the indexes of the node's outgoing edges of any of the
+        given types."""
+        return self.__edges_of_type(self.outgoing_edges(node_index),
+                                    type_names)
+
+    def incoming_edges_of_type(self, node_index: int,
+                               *type_names: str) -> list[int]:
+        """Returns the indexes of the node's incoming edges of any of the
+        given types."""
+        return self.__edges_of_type(self.incoming_edges(node_index),
+                                    type_names)
+
+    def __edges_of_type(self, edge_indexes: Column,
+                        type_names: tuple[str, ...]) -> list[int]:
+        codes = [self.__edge_type_codes.get(name) for name in type_names]
+        edge_types = self.edge_types
+        return [i for i in edge_indexes if edge_types[i] in codes]
+
+    def create_edge(self, node_index: int) -> int | None:
+        """Returns the index of the node's first incoming create edge."""
+        return self.__first_edge(self.node_create_edges[node_index])
+
+    def execute_edge(self, node_index: int) -> int | None:
+        """Returns the index of the node's first incoming execute (or
+        execute from attribute) edge."""
+        return self.__first_edge(self.node_execute_edges[node_index])
+
+    def insert_edge(self, node_index: int) -> int | None:
+        """Returns the index of the node's first incoming insert edge."""
+        return self.__first_edge(self.node_insert_edges[node_index])
+
+    @staticmethod
+    def __first_edge(edge_index: int) -> int | None:
+        return None if edge_index < 0 else edge_index
+
+    def edge_source(self, edge_index: int) -> int:
+        return self.edge_sources[edge_index]
+
+    def edge_target(self, edge_index: int) -> int:
+        return self.edge_targets[edge_index]
+
+    def node_timestamp(self, node_index: int) -> int | None:
+        return self.__typed_int(self.node_timestamps[node_index])
+
+    def node_frame_id(self, node_index: int) -> str | None:
+        return self.__typed_string(self.node_frame_ids[node_index])
+
+    def edge_timestamp(self, edge_index: int) -> int | None:
+        return self.__typed_int(self.edge_timestamps[edge_index])
+
+    def edge_request_id(self, edge_index: int) -> int | None:
+        return self.__typed_int(self.edge_request_ids[edge_index])
+
+    def edge_frame_id(self, edge_index: int) -> str | None:
+        return self.__typed_string(self.edge_frame_ids[edge_index])
+
+    @staticmethod
+    def __typed_int(value: int) -> int | None:
+        return None if value == MISSING else value
+
+    def __typed_string(self, value: int) -> str | None:
+        return None if value == MISSING else self.string(value)
+
+    def node_attrs(self, node_index: int,
+                   include_payloads: bool = False) -> dict[str, Any]:
+        return self.__attrs(self.node_attr_offsets[node_index],
+                            self.node_attr_offsets[node_index + 1],
+                            self.node_attr_keys, self.node_attr_values,
+                            include_payloads)
+
+    def edge_attrs(self, edge_index: int,
+                   include_payloads: bool = False) -> dict[str, Any]:
+        return self.__attrs(self.edge_attr_offsets[edge_index],
+                            self.edge_attr_offsets[edge_index + 1],
+                            self.edge_attr_keys, self.edge_attr_values,
+                            include_payloads)
+
+    def node_payload(self, node_index: int, name: str) -> Any | None:
+        return self.__payload(self.node_attr_offsets[node_index],
+                              self.node_attr_offsets[node_index + 1],
+                              self.node_attr_keys, self.node_attr_values,
+                              name)
+
+    def edge_payload(self, edge_index: int, name: str) -> Any | None:
+        return self.__payload(self.edge_attr_offsets[edge_index],
+                              self.edge_attr_offsets[edge_index + 1],
+                              self.edge_attr_keys, self.edge_attr_values,
+                              name)
+
+    def script_hash(self, node_index: int) -> str:
+        """Returns the hash of the source of the script node at
+        `node_index`, as the base64 encoded SHA-256 digest (the format
+        PageGraph records for response bodies)."""
+        code = self.__node_type_codes.get(Node.Types.SCRIPT.value)
+        position = -1
+        if code is not None:
+            start = self.node_type_offsets[code]
+            end = self.node_type_offsets[code + 1]
+            position = bisect_left(self.node_type_index, node_index,
+                                   start, end)
+            if (position == end or
+                    self.node_type_index[position] != node_index):
+                position = -1
+            else:
+                position -= start
+        if position < 0:
+            raise ValueError(f"Node {node_index} is not a script node")
+        start = position * SCRIPT_DIGEST_SIZE
+        digest = self.script_digests()[start:start + SCRIPT_DIGEST_SIZE]
+        return b64encode(digest).decode("utf8")
+
+    def script_digests(self) -> bytes | memoryview:
+        """Returns the SHA-256 digest of every script node's source, in the
+        order of `nodes_of_type(Node.Types.SCRIPT)`, hashing the sources
+        the first time this is called."""
+        if self.__script_digests is None:
+            self.__script_digests = self.__hash_scripts()
+        return self.__script_digests
+
+    def __hash_scripts(self) -> bytes:
+        script_indexes = self.nodes_of_type(Node.Types.SCRIPT.value)
+        num_threads = min(os.cpu_count() or 1, MAX_HASH_THREADS)
+        if num_threads < 2 or len(script_indexes) < MIN_PARALLEL_SCRIPTS:
+            return self.__hash_script_batch(script_indexes)
+
+        if len(self.span_offsets) > 0:
+            # Opened here, so that threads don't race to open it.
+            self.__source_mapping()
+        batch_size = -(-len(script_indexes) // num_threads)
+        batches = [script_indexes[i:i + batch_size]
+                   for i in range(0, len(script_indexes), batch_size)]
+        with ThreadPoolExecutor(num_threads) as executor:
+            return b"".join(executor.map(self.__hash_script_batch, batches))
+
+    def __hash_script_batch(self, node_indexes: Column) -> bytes:
+        digests = []
+        for node_index in node_indexes:
+            source = self.node_payload(node_index, Node.RawAttrs.SOURCE.value)
+            source_text = "" if source is None else str(source)
+            digests.append(
+                hashlib.sha256(source_text.encode("utf8")).digest())
+        return b"".join(digests)
+
+    def __decode(self, kind: AttrKind, value: int) -> Any:
+        if kind == AttrKind.STRING:
+            return self.string(value)
+        elif kind == AttrKind.INT:
+            return value
+        elif kind == AttrKind.BOOL:
+            return bool(value)
+        elif kind == AttrKind.FLOAT:
+            return _int_to_float(value)
+        else:
+            return self.span(value)
+
+    def __attrs(self, start: int, end: int, keys: Column, values: Column,
+                include_payloads: bool) -> dict[str, Any]:
+        attrs: dict[str, Any] = {}
+        for position in range(start, end):
+            name, kind = self.attr_keys[keys[position]]
+            if not include_payloads and name in PAYLOAD_ATTRS:
+                continue
+            attrs[name] = self.__decode(kind, values[position])
+        return attrs
+
+    def __payload(self, start: int, end: int, keys: Column, values: Column,
+                  name: str) -> Any | None:
+        for position in range(start, end):
+            attr_name, kind = self.attr_keys[keys[position]]
+            if attr_name == name:
+                return self.__decode(kind, values[position])
+        return None
+
+
+class GraphStoreBuilder:
+    """Accumulates nodes and edges, in the order they appear in a
+    recording, and then builds a `GraphStore` from them. If a
+    `Projection` is given, nodes, edges and attributes outside it are
+    dropped as they're added."""
+
+    version: str | None
+    source_path: str | None
+    projection: Projection | None
+
+    __attr_keys: list[tuple[str, AttrKind]]
+    __attr_key_index: dict[tuple[str, AttrKind], int]
+    __strings: list[str]
+    __string_index: dict[str, int]
+    __node_type_names: list[str]
+    __node_type_codes: dict[str, int]
+    __edge_type_names: list[str]
+    __edge_type_codes: dict[str, int]
+    __node_indexes: dict[PageGraphNodeId, int]
+    __skipped_node_ids: set[PageGraphNodeId]
+    __columns: dict[str, "array[int]"]
+
+    def __init__(self, projection: Projection | None = None) -> None:
+        self.version = None
+        self.source_path = None
+        self.projection = projection
+        self.__attr_keys = []
+        self.__attr_key_index = {}
+        self.__strings = []
+        self.__string_index = {}
+        self.__node_type_names = []
+        self.__node_type_codes = {}
+        self.__edge_type_names = []
+        self.__edge_type_codes = {}
+        self.__node_indexes = {}
+        self.__skipped_node_ids = set()
+        self.__columns = {
+            name: array(typecode) for name, typecode in COLUMNS.items()}
+        self.__columns["node_attr_offsets"].append(0)
+        self.__columns["edge_attr_offsets"].append(0)
+
+    def __intern(self, value: str) -> int:
+        if len(value) >= MAX_INTERNED_STRING_LENGTH:
+            self.__strings.append(value)
+            return len(self.__strings) - 1
+        try:
+            return self.__string_index[value]
+        except KeyError:
+            self.__strings.append(value)
+            index = len(self.__strings) - 1
+            self.__string_index[value] = index
+            return index
+
+    def __attr_key(self, name: str, kind: AttrKind) -> int:
+        try:
+            return self.__attr_key_index[(name, kind)]
+        except KeyError:
+            self.__attr_keys.append((name, kind))
+            index = len(self.__attr_keys) - 1
+            self.__attr_key_index[(name, kind)] = index
+            return index
+
+    def __add_attrs(self, attrs: dict[str, Any], prefix: str,
+                    typed_attrs: dict[str, tuple[str, AttrKind]]) -> None:
+        keys = self.__columns[f"{prefix}_attr_keys"]
+        values = self.__columns[f"{prefix}_attr_values"]
+        projection = self.projection
+        typed_values = {column: MISSING for column, _ in typed_attrs.values()}
+        for name, value in attrs.items():
+            if projection and not projection.includes_attr(name):
+                continue
+            if name in typed_attrs:
+                column, typed_kind = typed_attrs[name]
+                if typed_kind == AttrKind.INT:
+                    typed_values[column] = int(value)
+                else:
+                    typed_values[column] = self.__intern(str(value))
+            if isinstance(value, bool):
+                keys.append(self.__attr_key(name, AttrKind.BOOL))
+                values.append(int(value))
+            elif isinstance(value, int):
+                keys.append(self.__attr_key(name, AttrKind.INT))
+                values.append(value)
+            elif isinstance(value, float):
+                keys.append(self.__attr_key(name, AttrKind.FLOAT))
+                values.append(_float_to_int(value))
+            elif isinstance(value, SourceSpan):
+                keys.append(self.__attr_key(name, AttrKind.SPAN))
+                values.append(len(self.__columns["span_offsets"]))
+                self.__columns["span_offsets"].append(value.offset)
+                self.__columns["span_lengths"].append(value.length)
+            else:
+                keys.append(self.__attr_key(name, AttrKind.STRING))
+                values.append(self.__intern(str(value)))
+        self.__columns[f"{prefix}_attr_offsets"].append(len(keys))
+        for column, typed_value in typed_values.items():
+            self.__columns[column].append(typed_value)
+
+    @staticmethod
+    def __type_code(type_name: str, names: list[str],
+                    codes: dict[str, int]) -> int:
+        try:
+            return codes[type_name]
+        except KeyError:
+            if len(names) > 255:
+                raise ValueError("Too many distinct element types")
+            names.append(type_name)
+            codes[type_name] = len(names) - 1
+            return codes[type_name]
+
+    def add_node(self, node_id: PageGraphNodeId,
+                 attrs: dict[str, Any]) -> None:
+        if (node_id in self.__node_indexes or
+                node_id in self.__skipped_node_ids):
+            raise ValueError(f"Duplicate node id: {node_id}")
+        type_name = str(attrs.get(Node.RawAttrs.TYPE.value, ""))
+        if self.projection and not self.projection.includes_node_type(
+                type_name):
+            self.__skipped_node_ids.add(node_id)
+            return
+        self.__node_indexes[node_id] = len(self.__columns["node_ids"])
+        self.__columns["node_ids"].append(_parse_id(node_id, "n"))
+        self.__columns["node_types"].append(self.__type_code(
+            type_name, self.__node_type_names, self.__node_type_codes))
+        self.__add_attrs(attrs, "node", NODE_TYPED_ATTRS)
+
+    def add_edge(self, edge_id: PageGraphEdgeId,
+                 parent_id: PageGraphNodeId, child_id: PageGraphNodeId,
+                 attrs: dict[str, Any]) -> None:
+        type_name = str(attrs.get(Edge.RawAttrs.TYPE.value, ""))
+        if self.projection and not self.projection.includes_edge_type(
+                type_name):
+            return
+        try:
+            source = self.__node_indexes[parent_id]
+            target = self.__node_indexes[child_id]
+        except KeyError as e:
+            if (parent_id in self.__skipped_node_ids or
+                    child_id in self.__skipped_node_ids):
+                return
+            raise ValueError(f"Edge {edge_id} refers to unknown node {e}")
+        self.__columns["edge_ids"].append(_parse_id(edge_id, "e"))
+        self.__columns["edge_sources"].append(source)
+        self.__columns["edge_targets"].append(target)
+        self.__columns["edge_types"].append(self.__type_code(
+            type_name, self.__edge_type_names, self.__edge_type_codes))
+        self.__add_attrs(attrs, "edge", EDGE_TYPED_ATTRS)
+
+    def build(self) -> GraphStore:
+        columns = self.__columns
+        num_nodes = len(columns["node_ids"])
+        node_ids = columns["node_ids"]
+        edge_ids = columns["edge_ids"]
+
+        columns["node_order"] = array(
+            "i", sorted(range(num_nodes), key=node_ids.__getitem__))
+        columns["edge_order"] = array(
+            "i", sorted(range(len(edge_ids)), key=edge_ids.__getitem__))
+        columns["node_type_offsets"], columns["node_type_index"] = _group(
+            columns["node_types"], len(self.__node_type_names))
+        columns.update(_group_by_neighbor(
+            columns["edge_sources"], columns["edge_targets"], num_nodes))
+        # Edges of each type are listed in graph order (see
+        # `GraphStore.edges_in_order`).
+        columns["edge_type_offsets"], columns["edge_type_index"] = _group(
+            columns["edge_types"], len(self.__edge_type_names),
+            columns["out_edges"])
+        for column, type_names in FIRST_INCOMING_EDGE_TYPES.items():
+            codes = [self.__edge_type_codes[name] for name in type_names
+                     if name in self.__edge_type_codes]
+            columns[column] = _first_edges(
+                columns["edge_targets"], columns["edge_type_offsets"],
+                columns["edge_type_index"], codes, num_nodes)
+
+        # The id lookup table isn't needed once the store is built.
+        self.__node_indexes = {}
+        self.__skipped_node_ids = set()
+        self.__string_index = {}
+        return GraphStore(self.version, self.__attr_keys,
+                          self.__node_type_names, self.__edge_type_names,
+                          dict(columns), self.__strings,
+                          source_path=self.source_path)
@@ -0,0 +1,118 @@
+"""Indexes the graph's edges by timestamp, so that "what happened between
+t1 and t2" (or "what happened last before t") can be answered without
+reading every edge.
+
+Edges are sorted by timestamp (and then by id) once, in a single pass
+over the store's columns, and split into timelines: one for every edge,
+one for each edge type, one for each frame id, and one for each edge
+type in each frame. Each timeline is a pair of columns (timestamps and
+edge indexes), searched with bisection. Edges without a timestamp aren't
+in any timeline."""
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import TYPE_CHECKING
+
+from pagegraph.graph.store import MISSING
+from pagegraph.types import FrameId
+
+if TYPE_CHECKING:
+    from pagegraph.graph import PageGraph
+    from pagegraph.graph.edge import Edge
+
+
+class Timeline:
+
+    timestamps: "array[int]"
+    edge_indexes: "array[int]"
+
+    def __init__(self) -> None:
+        self.timestamps = array("q")
+        self.edge_indexes = array("i")
+
+    def append(self, timestamp: int, edge_index: int) -> None:
+        self.timestamps.append(timestamp)
+        self.edge_indexes.append(edge_index)
+
+    def between(self, since: int | None,
+                until: int | None) -> "array[int]":
+        """Returns the indexes of the edges with timestamps from `since` to
+        `until` (both inclusive, and either unbounded if None), in time
+        order."""
+        start = 0
+        if since is not None:
+            start = bisect_left(self.timestamps, since)
+        end = len(self.timestamps)
+        if until is not None:
+            end = bisect_right(self.timestamps, until)
+        return self.edge_indexes[start:end]
+
+    def latest_at(self, timestamp: int) -> int | None:
+        """Returns the index of the last edge with a timestamp at or
+        before `timestamp`, or None if there isn't one."""
+        position = bisect_right(self.timestamps, timestamp)
+        if position == 0:
+            return None
+        return self.edge_indexes[position - 1]
+
+
+class TemporalIndex:
+
+    pg: "PageGraph"
+
+    __all: Timeline
+    # Timelines by edge type code, by frame id, and by both.
+    __by_type: dict[int, Timeline]
+    __by_frame: dict[FrameId, Timeline]
+    __by_type_and_frame: dict[tuple[int, FrameId], Timeline]
+
+    def __init__(self, pg: "PageGraph"):
+        self.pg = pg
+        self.__all = Timeline()
+        self.__by_type = {}
+        self.__by_frame = {}
+        self.__by_type_and_frame = {}
+
+        store = pg.store
+        timestamps = store.edge_timestamps
+        edge_types = store.edge_types
+        edge_indexes = sorted(
+            (i for i in range(store.num_edges()) if timestamps[i] != MISSING),
+            key=lambda i: (timestamps[i], store.edge_ids[i]))
+        for edge_index in edge_indexes:
+            timestamp = timestamps[edge_index]
+            type_code = edge_types[edge_index]
+            frame_id = store.edge_frame_id(edge_index)
+            self.__all.append(timestamp, edge_index)
+            if type_code not in self.__by_type:
+                self.__by_type[type_code] = Timeline()
+            self.__by_type[type_code].append(timestamp, edge_index)
+            if frame_id is None:
+                continue
+            if frame_id not in self.__by_frame:
+                self.__by_frame[frame_id] = Timeline()
+            self.__by_frame[frame_id].append(timestamp, edge_index)
+            key = (type_code, frame_id)
+            if key not in self.__by_type_and_frame:
+                self.__by_type_and_frame[key] = Timeline()
+            self.__by_type_and_frame[key].append(timestamp, edge_index)
+
+    def timeline(self, edge_type: "Edge.Types | None" = None,
+                 frame_id: FrameId | None = None) -> Timeline:
+        """Returns the timeline of the edges of the given type, in the
+        given frame (or of any type, or in any frame, if None)."""
+        if edge_type is None and frame_id is None:
+            return self.__all
+        if edge_type is None:
+            assert frame_id is not None
+            return self.__by_frame.get(frame_id, EMPTY_TIMELINE)
+        try:
+            type_code = self.pg.store.edge_type_names.index(edge_type.value)
+        except ValueError:
+            return EMPTY_TIMELINE
+        if frame_id is None:
+            return self.__by_type.get(type_code, EMPTY_TIMELINE)
+        return self.__by_type_and_frame.get(
+            (type_code, frame_id), EMPTY_TIMELINE)
+
+
+EMPTY_TIMELINE = Timeline()
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, fields
-from typing import Any, cast, Union
+import json
+from typing import Any, Callable, cast, Union
 
 from pagegraph.types import BlinkId, PageGraphId, Url, RequestId
 
@@ -105,6 +106,8 @@ class EdgeReport(ElementReport):
 
 
 class Reportable:
+    __slots__ = ()
+
     def to_report(self) -> Report:
         raise NotImplementedError()
 
@@ -114,27 +117,103 @@ def report_field_name(field_name: str) -> str:
 
 
 def to_jsonable(data: JSONAble) -> Any:
-    if isinstance(data, list):
-        return [to_jsonable(x) for x in data if x is not None]
-
-    if isinstance(data, dict):
-        jsonable_dict: dict[str, JSONAble] = {}
-        for k, v in data.items():
-            if v is None:
-                continue
-            report_key = report_field_name(k)
-            jsonable_dict[report_key] = to_jsonable(v)
-        return jsonable_dict
-
-    if isinstance(data, Report):
-        jsonable_map = {}
-        for field in fields(data):
-            field_name = field.name
-            value = getattr(data, field_name)
-            if value is None:
-                continue
-            report_name = report_field_name(field_name)
-            jsonable_map[report_name] = to_jsonable(value)
-        return jsonable_map
+    """Converts reports (and lists and dicts of them) to values that can
+    be passed to `json.dumps`: reports become dicts keyed by their field
+    names (with spaces instead of underscores), and None values are left
+    out."""
+    converter = _CONVERTERS.get(type(data))
+    if converter is None:
+        converter = _converter_for(type(data))
+    return converter(data)
+
+
+def dumps(data: JSONAble, fast: bool = False) -> str:
+    """Returns the JSON text of `data` (see `to_jsonable`). If `fast`, the
+    text is written with the `orjson` package, which is much faster, but
+    writes compact JSON, and non-ASCII characters unescaped."""
+    if not fast:
+        return json.dumps(to_jsonable(data))
+    try:
+        import orjson  # type: ignore
+    except ImportError:
+        raise Exception("Unable to write fast JSON: install the orjson "
+                        "package to use this option.")
+    return cast(str, orjson.dumps(to_jsonable(data)).decode("utf8"))
+
+
+Converter = Callable[[Any], Any]
 
+# Values of these types are already JSONable (and are never None).
+_SCALAR_TYPES = frozenset([str, int, float, bool])
+
+
+def _identity(data: Any) -> Any:
     return data
+
+
+# Converts values of each type seen so far to JSONable values. Each
+# report class's converter is generated the first time one is converted
+# (see `_compile_report_converter`).
+_CONVERTERS: dict[type, Converter] = {
+    scalar_type: _identity for scalar_type in (*_SCALAR_TYPES, type(None))}
+
+
+def _list_to_jsonable(data: list[Any]) -> list[Any]:
+    return [x if type(x) in _SCALAR_TYPES else to_jsonable(x)
+            for x in data if x is not None]
+
+
+def _dict_to_jsonable(data: dict[str, Any]) -> dict[str, Any]:
+    jsonable_dict: dict[str, Any] = {}
+    for k, v in data.items():
+        if v is None:
+            continue
+        report_key = report_field_name(k)
+        jsonable_dict[report_key] = (
+            v if type(v) in _SCALAR_TYPES else to_jsonable(v))
+    return jsonable_dict
+
+
+def _converter_for(data_type: type) -> Converter:
+    converter: Converter
+    if issubclass(data_type, list):
+        converter = _list_to_jsonable
+    elif issubclass(data_type, dict):
+        converter = _dict_to_jsonable
+    elif issubclass(data_type, Report):
+        converter = _compile_report_converter(data_type)
+    else:
+        converter = _identity
+    _CONVERTERS[data_type] = converter
+    return converter
+
+
+def _compile_report_converter(report_type: type[Report]) -> Converter:
+    # The converter is generated as straight-line code, with one block
+    # per field, and each field's report name written in as a constant,
+    # e.g., for a report with fields `id` and `blink_id`:
+    #
+    #     def convert(data):
+    #         jsonable_map = {}
+    #         value = data.id
+    #         if value is not None:
+    #             jsonable_map['id'] = (value if type(value) in scalars
+    #                                   else to_jsonable(value))
+    #         value = data.blink_id
+    #         ...
+    #         return jsonable_map
+    lines = ["def convert(data):", "    jsonable_map = {}"]
+    for field in fields(report_type):
+        report_name = report_field_name(field.name)
+        lines += [
+            f"    value = data.{field.name}",
+            "    if value is not None:",
+            f"        jsonable_map[{report_name!r}] = (",
+            "            value if type(value) in scalars",
+            "            else to_jsonable(value))",
+        ]
+    lines.append("    return jsonable_map")
+    namespace: dict[str, Any] = {
+        "scalars": _SCALAR_TYPES, "to_jsonable": to_jsonable}
+    exec("\n".join(lines), namespace)
+    return cast(Converter, namespace["convert"])
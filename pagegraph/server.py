@@ -0,0 +1,192 @@
+"""A long-running local query server, which keeps recently used graphs
+loaded, so that repeated queries on the same recording don't each pay to
+parse it.
+
+The server listens on a Unix socket. Each connection sends one request,
+as a line of JSON, and receives one response line: `{"result": ...}`, or
+`{"error": "..."}`. What requests contain, and how they're answered, is
+up to the handler the server is created with (see `run.py serve`, which
+answers the same commands as `run.py`).
+
+Graphs are kept in a `GraphCache`, which evicts the least recently used
+graphs once the graphs loaded take more than its memory budget (as
+estimated by `PageGraph.memory_size`), and reloads a recording if it
+has changed since it was loaded. Since graphs grow as they're queried
+(building indexes, and caching nodes and edges), the graphs used by
+each request are measured again once it's answered. Requests are
+answered one at a time, since graphs aren't safe to share between
+threads.
+
+`LocalClient` sends requests to a server object in the same process,
+without a socket, e.g., for testing handlers."""
+from collections import OrderedDict
+import json
+import os
+import socket
+import socketserver
+from typing import Any, Callable
+
+import pagegraph.graph
+from pagegraph.graph import PageGraph
+
+
+Request = dict[str, Any]
+Response = dict[str, Any]
+
+
+class GraphCache:
+
+    memory_budget: int
+    debug: bool
+
+    # The loaded graphs, least recently used first, by the real path of
+    # their recording, along with the recording's modification time
+    # when loaded, and the graph's estimated size when last measured.
+    __graphs: OrderedDict[str, tuple[PageGraph, float, int]]
+    # The paths of the graphs used since they were last measured.
+    __used: set[str]
+
+    def __init__(self, memory_budget: int, debug: bool = False):
+        self.memory_budget = memory_budget
+        self.debug = debug
+        self.__graphs = OrderedDict()
+        self.__used = set()
+
+    def get(self, input_path: str) -> PageGraph:
+        """Returns the graph of the recording at `input_path`, loading it
+        if it isn't loaded, or has changed since it was loaded."""
+        path = os.path.realpath(input_path)
+        mtime = os.stat(path).st_mtime
+        if path in self.__graphs:
+            pg, loaded_mtime, _ = self.__graphs[path]
+            if loaded_mtime == mtime:
+                self.__graphs.move_to_end(path)
+                self.__used.add(path)
+                return pg
+            self.__evict(path)
+
+        pg = pagegraph.graph.from_path(path, self.debug)
+        self.__graphs[path] = (pg, mtime, pg.memory_size())
+        self.__used.add(path)
+        self.__trim()
+        return pg
+
+    def update(self) -> None:
+        """Measures again the graphs used since they were last measured,
+        and evicts graphs until the cache is within its budget."""
+        for path in self.__used:
+            if path in self.__graphs:
+                pg, mtime, _ = self.__graphs[path]
+                self.__graphs[path] = (pg, mtime, pg.memory_size())
+        self.__used.clear()
+        self.__trim()
+
+    def __trim(self) -> None:
+        # The most recently used graph is kept, even if it alone is over
+        # budget.
+        while len(self.__graphs) > 1 and self.size() > self.memory_budget:
+            self.__evict(next(iter(self.__graphs)))
+
+    def __evict(self, path: str) -> None:
+        pg, _, _ = self.__graphs.pop(path)
+        self.__used.discard(path)
+        pg.close()
+
+    def paths(self) -> list[str]:
+        """Returns the paths of the loaded recordings, least recently used
+        first."""
+        return list(self.__graphs)
+
+    def size(self) -> int:
+        return sum(size for _, _, size in self.__graphs.values())
+
+    def close(self) -> None:
+        while self.__graphs:
+            self.__evict(next(iter(self.__graphs)))
+
+
+Handler = Callable[[GraphCache, Request], Any]
+
+
+class QueryServer:
+
+    handler: Handler
+    cache: GraphCache
+
+    def __init__(self, handler: Handler, cache: GraphCache):
+        self.handler = handler
+        self.cache = cache
+
+    def handle(self, request: Request) -> Response:
+        try:
+            return {"result": self.handler(self.cache, request)}
+        # Handlers that parse command lines may exit (e.g., on argparse
+        # errors), which must not stop the server.
+        except (Exception, SystemExit) as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            self.cache.update()
+
+    def serve(self, socket_path: str) -> None:
+        """Answers requests on a Unix socket at `socket_path` until
+        interrupted."""
+        query_server = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                try:
+                    request = json.loads(self.rfile.readline())
+                except ValueError as e:
+                    response = {"error": f"Invalid request: {e}"}
+                else:
+                    response = query_server.handle(request)
+                self.wfile.write(json.dumps(response).encode("utf8") + b"\n")
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        with socketserver.UnixStreamServer(socket_path,
+                                           RequestHandler) as server:
+            try:
+                server.serve_forever()
+            finally:
+                os.unlink(socket_path)
+                self.cache.close()
+
+
+class LocalClient:
+    """Sends requests to a server in the same process."""
+
+    server: QueryServer
+
+    def __init__(self, server: QueryServer):
+        self.server = server
+
+    def send(self, request: Request) -> Response:
+        # Requests and responses go through JSON, as over a socket.
+        response = self.server.handle(json.loads(json.dumps(request)))
+        return dict(json.loads(json.dumps(response)))
+
+
+class SocketClient:
+    """Sends requests to a server listening on a Unix socket."""
+
+    socket_path: str
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+
+    def send(self, request: Request) -> Response:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.socket_path)
+            sock.sendall(json.dumps(request).encode("utf8") + b"\n")
+            with sock.makefile("rb") as response_file:
+                return dict(json.loads(response_file.readline()))
+
+
+def query(client: LocalClient | SocketClient, request: Request) -> Any:
+    """Sends the request, returning the result, or raising the error the
+    server responded with."""
+    response = client.send(request)
+    if "error" in response:
+        raise Exception(response["error"])
+    return response["result"]
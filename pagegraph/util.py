@@ -1,3 +1,4 @@
+from enum import StrEnum
 import re
 import sys
 from urllib.parse import urlparse
@@ -8,23 +9,27 @@ from pagegraph.types import Url
 from pagegraph import VERSION
 
 
-def check_pagegraph_version(input_path: str) -> bool:
-    pattern = r"<version>(\d+\.\d+\.\d+)<\/version>"
+class VersionPolicy(StrEnum):
+    """What to do when a recording was written by a different major or
+    minor version of PageGraph than this library supports."""
+    WARN = "warn"
+    ERROR = "error"
 
-    graph_version = None
-    with open(input_path) as f:
-        for line in f:
-            match = re.search(pattern, line, re.ASCII)
-            if match:
-                graph_version = parse(match.group(1))
-                break
-    if not graph_version:
+
+def check_pagegraph_version(
+        graph_version_str: str | None,
+        policy: VersionPolicy = VersionPolicy.WARN) -> bool:
+    if not graph_version_str or not re.fullmatch(
+            r"\d+\.\d+\.\d+", graph_version_str, re.ASCII):
         raise Exception("Unable to determine version of PageGraph file")
+    graph_version = parse(graph_version_str)
     graph_major, graph_minor, _ = graph_version.release
     if graph_major != VERSION.major or graph_minor != VERSION.minor:
-        print(f"Major and minor versions of this library ({VERSION}) and " +
-              f"PageGraph files ({graph_version}) do not match. " +
-              "Results may be incorrect.", file=sys.stderr)
+        message = (f"Major and minor versions of this library ({VERSION}) " +
+                   f"and PageGraph files ({graph_version}) do not match.")
+        if policy == VersionPolicy.ERROR:
+            raise Exception(message)
+        print(f"{message} Results may be incorrect.", file=sys.stderr)
         return False
     return True
 
@@ -1,11 +1,21 @@
 #!/usr/bin/env python3
 import argparse
+from collections.abc import Iterator
+import glob
+import importlib.util
 import json
+import multiprocessing
 import os
+import queue
+import shlex
+import signal
 import sys
 
 import pagegraph.commands
+import pagegraph.graph
+import pagegraph.graph.projection
 import pagegraph.serialize
+import pagegraph.server
 from pagegraph import VERSION
 
 
@@ -14,17 +24,278 @@ def subframes_cmd(args):
 
 
 def request_cmd(args):
-    return pagegraph.commands.requests(args.input, args.frame, args.debug)
+    return pagegraph.commands.requests(args.input, args.frame, args.debug,
+                                       args.since, args.until)
 
 
 def js_calls_cmd(args):
     return pagegraph.commands.js_calls(args.input, args.frame, args.cross,
-                                       args.method, args.id, args.debug)
+                                       args.method, args.id, args.debug,
+                                       args.since, args.until)
 
 
 def scripts_cmd(args):
     return pagegraph.commands.scripts(args.input, args.frame, args.id,
-                                      args.source, args.debug)
+                                      args.source, args.debug, args.since,
+                                      args.until)
+
+
+def is_literal_input(pattern):
+    """Returns whether the input names a recording itself, rather than a
+    glob pattern. Paths that exist are taken literally, even if they
+    contain glob characters."""
+    return os.path.exists(pattern) or glob.escape(pattern) == pattern
+
+
+def expand_inputs(patterns):
+    paths = []
+    for pattern in patterns:
+        if is_literal_input(pattern):
+            paths.append(pattern)
+            continue
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            raise ValueError(f"No recordings match '{pattern}'.")
+        paths += matches
+    return paths
+
+
+def result_lines(result, args, tag=None):
+    """Yields the lines of JSON to print for a command's result: the whole
+    result as one line, or with `--format ndjson`, each report in it as
+    its own line, as soon as it's produced. With a `tag` (e.g., the
+    recording's path), each line is the tag, plus the result (or report)
+    under "result"."""
+    streaming = isinstance(result, (list, Iterator))
+    if args.format == "ndjson" and streaming:
+        items = result
+    else:
+        items = [list(result) if streaming else result]
+    for item in items:
+        if tag is not None:
+            item = {**tag, "result": item}
+        yield pagegraph.serialize.dumps(item, args.fast_json)
+
+
+def print_result(result, args, tag=None):
+    for line in result_lines(result, args, tag):
+        print(line, flush=True)
+
+
+def input_lines(args, input_path):
+    """Runs the command on one recording, yielding its result's lines,
+    tagged with the recording's path, and then the error the command
+    raised (if any) as a line."""
+    args = argparse.Namespace(**vars(args))
+    args.input = input_path
+    tag = {"input": input_path}
+    try:
+        yield from result_lines(args.command(args), args, tag)
+    except Exception as e:
+        yield json.dumps({**tag, "error": f"{type(e).__name__}: {e}"})
+
+
+# Output is sent from worker processes to the main process to be printed
+# in chunks of lines, through a bounded queue, so that workers producing
+# lines faster than they're printed wait, rather than the lines piling
+# up in memory.
+OUTPUT_CHUNK_SIZE = 64
+OUTPUT_QUEUE_SIZE = 16
+OUTPUT_QUEUE = None
+
+
+def init_worker(output_queue):
+    global OUTPUT_QUEUE
+    OUTPUT_QUEUE = output_queue
+
+
+def run_input(task):
+    """Runs the command on one recording (in a worker process), sending
+    its output to the main process in chunks of lines as it's produced,
+    followed by None."""
+    args, input_path = task
+    chunk = []
+    for line in input_lines(args, input_path):
+        chunk.append(line)
+        if len(chunk) == OUTPUT_CHUNK_SIZE:
+            OUTPUT_QUEUE.put(chunk)
+            chunk = []
+    if chunk:
+        OUTPUT_QUEUE.put(chunk)
+    OUTPUT_QUEUE.put(None)
+
+
+def inputs_cmd(args):
+    """Runs the command on the given recordings. A single recording is
+    reported as before. Otherwise each recording's result is printed as
+    it's ready (see `result_lines`), with recordings spread over
+    `args.jobs` worker processes, each loading one recording at a
+    time. With more than one worker, the lines of different recordings
+    may be interleaved."""
+    single_input = (len(args.input) == 1 and
+                    is_literal_input(args.input[0]))
+    input_paths = expand_inputs(args.input)
+    if single_input:
+        args.input = input_paths[0]
+        return args.command(args)
+
+    tasks = [(args, input_path) for input_path in input_paths]
+    if args.jobs <= 1:
+        for input_path in input_paths:
+            for line in input_lines(args, input_path):
+                print(line, flush=True)
+        return None
+    output_queue = multiprocessing.Queue(OUTPUT_QUEUE_SIZE)
+    with multiprocessing.Pool(min(args.jobs, len(tasks)), init_worker,
+                              (output_queue,)) as pool:
+        results = pool.map_async(run_input, tasks, chunksize=1)
+        running = len(tasks)
+        while running:
+            try:
+                chunk = output_queue.get(timeout=1)
+            except queue.Empty:
+                # A worker that failed outside of the command won't send
+                # the None that ends its output.
+                if results.ready() and not results.successful():
+                    results.get()
+                continue
+            if chunk is None:
+                running -= 1
+            else:
+                print("\n".join(chunk), flush=True)
+    return None
+
+
+def subframes_query(pg, args):
+    return pagegraph.commands.subframes_for_graph(pg, args.local)
+
+
+def request_query(pg, args):
+    return pagegraph.commands.requests_for_graph(pg, args.frame, args.since,
+                                                 args.until)
+
+
+def js_calls_query(pg, args):
+    return pagegraph.commands.js_calls_for_graph(
+        pg, args.frame, args.cross, args.method, args.id, args.since,
+        args.until)
+
+
+def scripts_query(pg, args):
+    return pagegraph.commands.scripts_for_graph(
+        pg, args.frame, args.id, args.source, args.since, args.until)
+
+
+def element_query_query(pg, args):
+    return pagegraph.commands.element_query_for_graph(pg, args.id,
+                                                      args.depth)
+
+
+def batch_queries(args):
+    """Returns the parsed arguments of each query in the batch, and the
+    path to write its result to (or None, for stdout)."""
+    entries = [{"query": query} for query in args.query]
+    if args.spec:
+        with open(args.spec, encoding="utf8") as spec_handle:
+            spec = json.load(spec_handle)
+        if not isinstance(spec, list):
+            raise ValueError("Batch spec must be a JSON list of queries.")
+        for entry in spec:
+            entries.append({"query": entry} if isinstance(entry, str)
+                           else entry)
+
+    queries = []
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict) or "query" not in entry:
+            raise ValueError(f"Batch query without a query: {entry}")
+        argv = shlex.split(entry["query"])
+        if not argv:
+            raise ValueError("Empty batch query.")
+        # Each query is parsed as if it were its own command line, run
+        # on the batch's recording.
+        query_args = PARSER.parse_args([argv[0], args.input, *argv[1:]])
+        if not hasattr(query_args, "run_query"):
+            raise ValueError(f"Can't run '{argv[0]}' in a batch.")
+        if len(query_args.input) != 1:
+            raise ValueError("Batch queries run on the batch's recording, "
+                             f"and can't name others: {entry['query']}")
+        output = entry.get("output")
+        if output is None and args.output_dir:
+            output = os.path.join(args.output_dir,
+                                  f"{position}-{argv[0]}.json")
+        queries.append((query_args, output))
+    return queries
+
+
+def batch_cmd(args):
+    queries = batch_queries(args)
+    projection = pagegraph.graph.projection.union(
+        query_args.projection for query_args, _ in queries)
+    with pagegraph.graph.from_path(args.input, args.debug,
+                                   projection=projection) as pg:
+        for position, (query_args, output) in enumerate(queries):
+            result = query_args.run_query(pg, query_args)
+            if output is None:
+                # Streamed reports are tagged with their query's position,
+                # since they're no longer one line per query.
+                tag = {"query": position} if args.format == "ndjson" else None
+                print_result(result, args, tag)
+                continue
+            with open(output, "w", encoding="utf8") as output_handle:
+                for line in result_lines(result, args):
+                    output_handle.write(line + "\n")
+    return None
+
+
+def serve_query(cache, request):
+    """Answers a request from `server_query` with a graph from the
+    server's cache."""
+    args = PARSER.parse_args(request["argv"])
+    if not hasattr(args, "run_query"):
+        raise ValueError("Command can't be run by the server.")
+    # The client's directory is escaped, so that only the paths given
+    # can be patterns.
+    patterns = [os.path.join(glob.escape(request["cwd"]), path)
+                for path in args.input]
+    input_paths = expand_inputs(patterns)
+    if len(input_paths) != 1:
+        raise ValueError("Server queries must name a single recording.")
+    pg = cache.get(input_paths[0])
+    result = args.run_query(pg, args)
+    if isinstance(result, Iterator):
+        result = list(result)
+    return pagegraph.serialize.to_jsonable(result)
+
+
+def server_query(args):
+    """Sends this command line to the server at `args.server`, and prints
+    the result it responds with."""
+    client = pagegraph.server.SocketClient(args.server)
+    request = {"argv": sys.argv[1:], "cwd": os.getcwd()}
+    try:
+        result = pagegraph.server.query(client, request)
+    except Exception as e:
+        print(f"Server error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print_result(result, args)
+
+
+def serve_cmd(args):
+    cache = pagegraph.server.GraphCache(
+        args.memory_budget * 1024 * 1024, args.debug)
+    server = pagegraph.server.QueryServer(serve_query, cache)
+    print(f"Serving queries on {args.socket}", file=sys.stderr)
+    # Exiting (rather than being killed) lets the server remove its socket.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve(args.socket)
+    except KeyboardInterrupt:
+        pass
+    return None
+
+
+def snapshot_build_cmd(args):
+    return pagegraph.commands.snapshot_build(args.input, args.debug)
 
 
 def element_query_cmd(args):
@@ -32,6 +303,34 @@ def element_query_cmd(args):
                                             args.debug)
 
 
+def add_input_arguments(parser):
+    parser.add_argument(
+        "input",
+        nargs="+",
+        help="Path to PageGraph recording. If more than one path (or a glob "
+             "pattern) is given, the result for each recording is printed "
+             "as its own line of JSON, tagged with the recording's path.")
+    parser.add_argument(
+        "-j", "--jobs",
+        default=1,
+        type=int,
+        help="Number of processes to run the command on recordings with, "
+             "when given more than one. Defaults to 1.")
+
+
+def add_time_range_arguments(parser, description):
+    parser.add_argument(
+        "--since",
+        default=None,
+        type=int,
+        help=f"Only include {description} at or after this timestamp.")
+    parser.add_argument(
+        "--until",
+        default=None,
+        type=int,
+        help=f"Only include {description} at or before this timestamp.")
+
+
 PARSER = argparse.ArgumentParser(
         prog="PageGraph Query",
         description="Extracts information about a Web page's execution from "
@@ -42,41 +341,63 @@ PARSER.add_argument(
     action="version",
     version=f"%(prog)s {VERSION}")
 PARSER.add_argument("--debug", action="store_true", default=False)
+PARSER.add_argument(
+    "--fast-json",
+    action="store_true",
+    default=False,
+    help="Write JSON with the orjson package (which must be installed). "
+         "This is much faster for large results, but the JSON is written "
+         "compactly, and with non-ASCII characters unescaped.")
+PARSER.add_argument(
+    "--format",
+    choices=["json", "ndjson"],
+    default="json",
+    help="How to print results. \"json\" (the default) prints each result "
+         "as one JSON document, once it's complete. \"ndjson\" prints each "
+         "report in a result as its own line of JSON, as soon as it's "
+         "produced, so large results are never held in memory, and readers "
+         "can stop early.")
+PARSER.add_argument(
+    "--server",
+    default=None,
+    help="Path to the socket of a query server (see the serve command) to "
+         "run the query with, instead of loading the recording in this "
+         "process. Only single recording queries (not batch or snapshot "
+         "commands) are sent to the server.")
 
 SUBPARSERS = PARSER.add_subparsers(required=True)
 
 SUBFRAMES_PARSER = SUBPARSERS.add_parser(
     "subframes",
     help="Print information about subframes created and loaded by page.")
-SUBFRAMES_PARSER.add_argument(
-    "input",
-    help="Path to PageGraph recording.")
+add_input_arguments(SUBFRAMES_PARSER)
 SUBFRAMES_PARSER.add_argument(
     "-l", "--local",
     action="store_true",
     help="Only print information about about frames that are local to"
          " the top level frame at serialization time.")
-SUBFRAMES_PARSER.set_defaults(func=subframes_cmd)
+SUBFRAMES_PARSER.set_defaults(
+    func=inputs_cmd, command=subframes_cmd, run_query=subframes_query,
+    projection=pagegraph.commands.SUBFRAMES_PROJECTION)
 
 REQUEST_PARSER = SUBPARSERS.add_parser(
     "requests",
     help="Print information about requests made during page execution.")
-REQUEST_PARSER.add_argument(
-    "input",
-    help="Path to PageGraph recording.")
+add_input_arguments(REQUEST_PARSER)
 REQUEST_PARSER.add_argument(
     "-f", "--frame",
     default=None,
     help="Only print information about requests made in a specific frame "
          "(as described by PageGraph node ids, in the format 'n##').")
-REQUEST_PARSER.set_defaults(func=request_cmd)
+add_time_range_arguments(REQUEST_PARSER, "requests started")
+REQUEST_PARSER.set_defaults(
+    func=inputs_cmd, command=request_cmd, run_query=request_query,
+    projection=pagegraph.commands.REQUESTS_PROJECTION)
 
 SCRIPTS_PARSER = SUBPARSERS.add_parser(
     "scripts",
     help="Print information about JS units executed during page execution.")
-SCRIPTS_PARSER.add_argument(
-    "input",
-    help="Path to PageGraph recording.")
+add_input_arguments(SCRIPTS_PARSER)
 SCRIPTS_PARSER.add_argument(
     "-i", "--id",
     default=None,
@@ -95,14 +416,15 @@ SCRIPTS_PARSER.add_argument(
          "Note that this filters on the calling frame context, not the "
          "receiving frame context, which will differ in some cases, such as "
          "same-origin cross-frame calls.")
-SCRIPTS_PARSER.set_defaults(func=scripts_cmd)
+add_time_range_arguments(SCRIPTS_PARSER, "JS units executed")
+SCRIPTS_PARSER.set_defaults(
+    func=inputs_cmd, command=scripts_cmd, run_query=scripts_query,
+    projection=pagegraph.commands.SCRIPTS_PROJECTION)
 
 JS_CALLS_PARSER = SUBPARSERS.add_parser(
     "js-calls",
     help="Print information about JS calls made during page execution.")
-JS_CALLS_PARSER.add_argument(
-    "input",
-    help="Path to PageGraph recording.")
+add_input_arguments(JS_CALLS_PARSER)
 JS_CALLS_PARSER.add_argument(
     "-f", "--frame",
     default=None,
@@ -128,14 +450,15 @@ JS_CALLS_PARSER.add_argument(
     help="If provided, only print information about JS calls made by the "
          "JS code with the give ID "
          "(as described by PageGraph node ids, in the format 'n##').")
-JS_CALLS_PARSER.set_defaults(func=js_calls_cmd)
+add_time_range_arguments(JS_CALLS_PARSER, "JS calls made")
+JS_CALLS_PARSER.set_defaults(
+    func=inputs_cmd, command=js_calls_cmd, run_query=js_calls_query,
+    projection=pagegraph.commands.JS_CALLS_PROJECTION)
 
 ELEMENT_QUERY_PARSER = SUBPARSERS.add_parser(
     "elm",
     help="Print information about a node or edge in the graph.")
-ELEMENT_QUERY_PARSER.add_argument(
-    "input",
-    help="Path to PageGraph recording.")
+add_input_arguments(ELEMENT_QUERY_PARSER)
 ELEMENT_QUERY_PARSER.add_argument(
     "id",
     help="The id of the node to print information about "
@@ -146,14 +469,88 @@ ELEMENT_QUERY_PARSER.add_argument(
     type=int,
     help="Depth of the recursion to summarize in the graph. Defaults to 0 "
          "(only print detailed information about target element).")
-ELEMENT_QUERY_PARSER.set_defaults(func=element_query_cmd)
+ELEMENT_QUERY_PARSER.set_defaults(
+    func=inputs_cmd, command=element_query_cmd,
+    run_query=element_query_query, projection=None)
+
+BATCH_PARSER = SUBPARSERS.add_parser(
+    "batch",
+    help="Run several queries against a recording, loading it only once. "
+         "Each result is printed as its own line of JSON, in query order, "
+         "unless written to a file.")
+BATCH_PARSER.add_argument(
+    "input",
+    help="Path to PageGraph recording.")
+BATCH_PARSER.add_argument(
+    "-q", "--query",
+    default=[],
+    action="append",
+    help="A query to run, written as the command line for it without the "
+         "recording path (e.g., \"js-calls -m cookie\"). Can be repeated.")
+BATCH_PARSER.add_argument(
+    "-s", "--spec",
+    default=None,
+    help="Path to a JSON file listing queries to run (after any given with "
+         "--query), each either a query string, or an object with a "
+         "\"query\" string and an \"output\" path to write its result to.")
+BATCH_PARSER.add_argument(
+    "-o", "--output-dir",
+    default=None,
+    help="Write each result without an output path to its own file in this "
+         "directory, named after the query's position and command (e.g., "
+         "\"0-requests.json\").")
+BATCH_PARSER.set_defaults(func=batch_cmd)
+
+SERVE_PARSER = SUBPARSERS.add_parser(
+    "serve",
+    help="Run a query server, which keeps recently used recordings loaded "
+         "between queries sent to it with --server.")
+SERVE_PARSER.add_argument(
+    "socket",
+    help="Path of the Unix socket to listen on.")
+SERVE_PARSER.add_argument(
+    "-m", "--memory-budget",
+    default=4096,
+    type=int,
+    help="Memory (in MB) loaded recordings can take before the least "
+         "recently used are unloaded. Defaults to 4096.")
+SERVE_PARSER.set_defaults(func=serve_cmd)
+
+SNAPSHOT_PARSER = SUBPARSERS.add_parser(
+    "snapshot",
+    help="Manage binary snapshots of PageGraph recordings, which are much "
+         "faster to load than the GraphML recording itself.")
+SNAPSHOT_SUBPARSERS = SNAPSHOT_PARSER.add_subparsers(required=True)
+SNAPSHOT_BUILD_PARSER = SNAPSHOT_SUBPARSERS.add_parser(
+    "build",
+    help="Parse a recording and write a snapshot of it next to the "
+         "recording. Later commands run on the recording will read the "
+         "snapshot instead, and rebuild it if the recording changes.")
+SNAPSHOT_BUILD_PARSER.add_argument(
+    "input",
+    help="Path to PageGraph recording.")
+SNAPSHOT_BUILD_PARSER.set_defaults(func=snapshot_build_cmd)
 
 
-try:
-    ARGS = PARSER.parse_args()
-    RESULT = ARGS.func(ARGS)
-    REPORT = pagegraph.serialize.to_jsonable(RESULT)
-    print(json.dumps(REPORT))
-except ValueError as e:
-    print(f"Invalid argument: {e}", file=sys.stderr)
-    sys.exit(1)
+# Worker processes (see `inputs_cmd`) may import this module, so the
+# command line is only run when this is the main module.
+if __name__ == "__main__":
+    try:
+        ARGS = PARSER.parse_args()
+        if ARGS.fast_json and importlib.util.find_spec("orjson") is None:
+            raise ValueError("--fast-json needs the orjson package.")
+        if ARGS.server and hasattr(ARGS, "run_query"):
+            server_query(ARGS)
+            sys.exit(0)
+        RESULT = ARGS.func(ARGS)
+        # Commands that write their own output (e.g., batch) return None.
+        if RESULT is not None:
+            print_result(RESULT, ARGS)
+    except ValueError as e:
+        print(f"Invalid argument: {e}", file=sys.stderr)
+        sys.exit(1)
+    except BrokenPipeError:
+        # The reader stopped early (e.g., `| head`). Python would otherwise
+        # fail flushing stdout again on exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)